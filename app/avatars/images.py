@@ -0,0 +1,74 @@
+"""
+Модуль `images.py`
+
+Локальна підготовка аватарів перед завантаженням у сховище (Pillow):
+
+- перевірка, що файл справді є зображенням підтримуваного формату
+  та не надто великим (захист від «декомпресійних бомб»);
+- поворот за EXIF-орієнтацією і квадратне кадрування по центру;
+- зменшення до фіксованих розмірів `AVATAR_SIZES` і кодування у WebP.
+
+Функції модуля виконуються у пулі процесів (`app.avatars.pipeline`),
+тому приймають і повертають лише байти. Pillow імпортується під час першої
+обробки, а не при старті застосунку.
+"""
+
+import io
+from typing import Dict, Iterable
+
+#: Розміри (сторона квадрата в пікселях) копій аватара, від більшої до меншої.
+AVATAR_SIZES = (256, 128, 64)
+
+#: Формати, які приймаються на вході.
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+
+#: Максимальна кількість пікселів вхідного зображення.
+MAX_PIXELS = 40_000_000
+
+#: Формат і MIME-тип підготовлених копій.
+OUTPUT_FORMAT = "WEBP"
+OUTPUT_CONTENT_TYPE = "image/webp"
+OUTPUT_EXTENSION = "webp"
+
+#: Профіль обробки; входить у хеш вмісту, тож зміна розмірів чи формату
+#: не призводить до повторного використання копій, зроблених по-старому.
+PROFILE = f"{OUTPUT_FORMAT}:{','.join(map(str, AVATAR_SIZES))}".encode()
+
+
+def prepare_avatar(data: bytes, sizes: Iterable[int] = AVATAR_SIZES) -> Dict[int, bytes]:
+    """
+    Перевіряє зображення та готує його зменшені квадратні копії.
+
+    Args:
+        data (bytes): Вміст завантаженого файлу.
+        sizes (Iterable[int]): Розміри копій у пікселях.
+
+    Returns:
+        Dict[int, bytes]: Розмір -> закодована у WebP копія.
+
+    Raises:
+        ValueError: Якщо файл не є зображенням підтримуваного формату
+            або має забагато пікселів.
+    """
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    sizes = sorted(sizes, reverse=True)
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if img.format not in ALLOWED_FORMATS:
+                raise ValueError(f"Unsupported image format: {img.format}")
+            if img.width * img.height > MAX_PIXELS:
+                raise ValueError("Image is too large")
+            img = ImageOps.exif_transpose(img)
+            img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+            square = ImageOps.fit(img, (sizes[0], sizes[0]), Image.Resampling.LANCZOS)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise ValueError(f"Invalid image: {exc}") from exc
+
+    result = {}
+    for size in sizes:
+        copy = square if size == sizes[0] else square.resize((size, size), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        copy.save(out, OUTPUT_FORMAT, quality=85, method=4)
+        result[size] = out.getvalue()
+    return result
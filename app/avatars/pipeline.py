@@ -0,0 +1,235 @@
+"""
+Модуль `pipeline.py`
+
+Конвеєр завантаження аватарів:
+
+1. у запиті файл потоково хешується (`digest`, SHA-256 порціями по
+   `HASH_CHUNK_SIZE`); якщо такий вміст уже є в індексі `AvatarBlob`,
+   наступні кроки пропускаються і завдання лише посилається на наявні копії;
+2. інакше зображення перевіряється та зменшується до `AVATAR_SIZES`
+   у пулі процесів (`prepare`) — CPU-робота Pillow не блокує цикл подій
+   і не займає GIL воркера;
+3. маршрут створює `AvatarJob` і повертає 202 з ідентифікатором завдання;
+4. у фоновому завданні (`upload`) копії паралельно вивантажуються
+   у сховище за ключами з хешу вмісту, після чого оновлюються
+   `User.avatar_url`, лічильники посилань і стан завдання.
+
+Оригінальне зображення не передається мережею — у сховище потрапляють
+лише зменшені копії. Копії, на які більше не посилається жоден
+користувач довше `AVATAR_GC_GRACE_SECONDS`, видаляє `collect_garbage`.
+"""
+
+import asyncio
+import hashlib
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.avatars import images
+from app.avatars.storage import AvatarStorage, get_storage
+from app.config.config import AVATAR_GC_GRACE_SECONDS, IMAGE_POOL_KIND, IMAGE_POOL_SIZE
+from app.crud import crud
+from app.database.database import SessionLocal
+from app.models import models
+from app.redis_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+#: Розмір порції при хешуванні завантаженого файлу.
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def blob_key(digest: str, size: int) -> str:
+    """
+    Формує ключ копії аватара у сховищі.
+
+    Args:
+        digest (str): Хеш вмісту.
+        size (int): Розмір копії у пікселях.
+
+    Returns:
+        str: Ключ виду ``avatars/<sha256>_<size>.webp``.
+    """
+    return f"avatars/{digest}_{size}.{images.OUTPUT_EXTENSION}"
+
+
+class AvatarPipeline:
+    """
+    Підготовка та фонове вивантаження аватарів.
+
+    Attributes:
+        storage (AvatarStorage): Сховище копій; None — згідно з `AVATAR_STORAGE`.
+        session_factory (Callable[[], Session]): Фабрика синхронних сесій БД.
+        pool_size (int): Кількість воркерів пулу обробки зображень.
+        pool_kind (str): "process" або "thread".
+    """
+
+    def __init__(
+        self,
+        storage: Optional[AvatarStorage] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        pool_size: int = IMAGE_POOL_SIZE,
+        pool_kind: str = IMAGE_POOL_KIND,
+    ):
+        self._storage = storage
+        self.session_factory = session_factory
+        self.pool_size = pool_size
+        self.pool_kind = pool_kind
+        self._executor: Optional[Executor] = None
+
+    @property
+    def storage(self) -> AvatarStorage:
+        """Сховище аватарів; створюється при першому зверненні."""
+        if self._storage is None:
+            self._storage = get_storage()
+        return self._storage
+
+    @property
+    def executor(self) -> Executor:
+        """Executor пулу обробки зображень; створюється при першій операції."""
+        if self._executor is None:
+            if self.pool_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.pool_size)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="image")
+        return self._executor
+
+    async def digest(self, file: UploadFile, max_bytes: int) -> Tuple[str, int]:
+        """
+        Потоково обчислює SHA-256 завантаженого файлу.
+
+        Файл читається порціями, тож у пам’яті не тримається цілком;
+        читання припиняється, щойно розмір перевищує `max_bytes`.
+
+        Args:
+            file (UploadFile): Завантажений файл.
+            max_bytes (int): Максимально допустимий розмір файлу.
+
+        Returns:
+            Tuple[str, int]: Хеш (hex) та прочитаний розмір; розмір понад
+            `max_bytes` означає, що файл завеликий.
+        """
+        hasher = hashlib.sha256(images.PROFILE + b"\0")
+        size = 0
+        while size <= max_bytes:
+            chunk = await file.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+            size += len(chunk)
+        await file.seek(0)
+        return hasher.hexdigest(), size
+
+    async def prepare(self, data: bytes) -> Dict[int, bytes]:
+        """
+        Перевіряє зображення та готує копії аватара у пулі.
+
+        Args:
+            data (bytes): Вміст завантаженого файлу.
+
+        Returns:
+            Dict[int, bytes]: Розмір -> закодована копія.
+
+        Raises:
+            ValueError: Якщо файл не є допустимим зображенням.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, images.prepare_avatar, data)
+
+    def _finish(self, job_id: str, digest: Optional[str], urls: Optional[dict] = None, error: Optional[str] = None) -> Optional[models.User]:
+        db = self.session_factory()
+        try:
+            try:
+                return crud.finish_avatar_job(db, job_id, digest, urls=urls, error=error)
+            except IntegrityError:
+                # Той самий вміст щойно проіндексувало паралельне завдання — посилаємося на нього
+                db.rollback()
+                return crud.finish_avatar_job(db, job_id, digest, error=error)
+        finally:
+            db.close()
+
+    async def finish(self, job_id: str, digest: Optional[str], urls: Optional[dict] = None, error: Optional[str] = None) -> None:
+        """
+        Завершує завдання та скидає кеш користувача з новим аватаром.
+
+        Без `urls` завдання повторно використовує вже проіндексовані копії
+        з хешем `digest` (нічого не вивантажуючи).
+
+        Args:
+            job_id (str): Ідентифікатор `AvatarJob`.
+            digest (Optional[str]): Хеш вмісту аватара.
+            urls (Optional[dict]): Розмір -> URL щойно вивантажених копій.
+            error (Optional[str]): Текст помилки, якщо завдання невдале.
+        """
+        user = await run_in_threadpool(self._finish, job_id, digest, urls, error)
+        if user is not None:
+            await user_cache.invalidate_user(user)
+
+    async def upload(self, job_id: str, digest: str, copies: Dict[int, bytes]) -> None:
+        """
+        Вивантажує копії аватара у сховище та завершує завдання.
+
+        Викликається як фонове завдання після відповіді 202; помилки
+        не поширюються далі, а записуються у стан завдання.
+
+        Args:
+            job_id (str): Ідентифікатор `AvatarJob`.
+            digest (str): Хеш вмісту з `digest`.
+            copies (Dict[int, bytes]): Результат `prepare`.
+        """
+        try:
+            urls = await asyncio.gather(*(
+                run_in_threadpool(self.storage.save, blob_key(digest, size), data, images.OUTPUT_CONTENT_TYPE)
+                for size, data in copies.items()
+            ))
+            await self.finish(job_id, digest, dict(zip(copies, urls)))
+        except Exception as exc:
+            logger.exception("Avatar job %s failed", job_id)
+            await self.finish(job_id, None, error=str(exc) or type(exc).__name__)
+            return
+        await self.collect_garbage()
+
+    def _collect_garbage(self, grace_seconds: int) -> int:
+        db = self.session_factory()
+        try:
+            deleted = crud.delete_orphan_avatar_blobs(db, datetime.utcnow() - timedelta(seconds=grace_seconds))
+        finally:
+            db.close()
+        for digest, urls in deleted:
+            for size in urls:
+                try:
+                    self.storage.delete(blob_key(digest, int(size)))
+                except Exception:
+                    logger.exception("Failed to delete avatar copy %s_%s", digest, size)
+        return len(deleted)
+
+    async def collect_garbage(self, grace_seconds: int = AVATAR_GC_GRACE_SECONDS) -> int:
+        """
+        Видаляє копії аватарів, на які ніхто не посилається.
+
+        Запис спершу видаляється з індексу (тож новий запит його вже не
+        знайде), а потім його файли — зі сховища. Пауза `grace_seconds`
+        не дає прибрати копії, щойно звільнені та знову потрібні.
+
+        Args:
+            grace_seconds (int): Скільки секунд запис має бути без посилань.
+
+        Returns:
+            int: Кількість видалених записів.
+        """
+        return await run_in_threadpool(self._collect_garbage, grace_seconds)
+
+    def shutdown(self) -> None:
+        """Зупиняє пул обробки зображень."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+#: Конвеєр аватарів застосунку.
+avatar_pipeline = AvatarPipeline()
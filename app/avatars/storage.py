@@ -0,0 +1,97 @@
+"""
+Модуль `storage.py`
+
+Сховища для готових копій аватарів.
+
+- `CloudinaryStorage` — хмарне сховище Cloudinary (робоче середовище);
+- `LocalStorage` — файли на локальному диску, що віддаються застосунком
+  за префіксом `AVATAR_LOCAL_URL` (розробка та тести).
+
+Сховище обирається змінною `AVATAR_STORAGE`; методи синхронні
+й викликаються з threadpool.
+"""
+
+import os
+
+from app.cloudinary_utils.cloudinary_utils import delete_image, upload_image
+from app.config.config import AVATAR_LOCAL_DIR, AVATAR_LOCAL_URL, AVATAR_STORAGE
+from app.metrics.metrics import EXTERNAL_CALL_SECONDS, timer
+
+
+class AvatarStorage:
+    """Базовий клас сховища аватарів."""
+
+    def save(self, key: str, data: bytes, content_type: str) -> str:
+        """
+        Зберігає файл і повертає його публічну URL-адресу.
+
+        Args:
+            key (str): Шлях файлу у сховищі, наприклад ``avatars/<sha256>_256.webp``.
+            data (bytes): Вміст файлу.
+            content_type (str): MIME-тип файлу.
+
+        Returns:
+            str: Публічне посилання на файл.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """
+        Видаляє файл зі сховища; відсутній файл не є помилкою.
+
+        Args:
+            key (str): Шлях файлу у сховищі.
+        """
+        raise NotImplementedError
+
+
+class LocalStorage(AvatarStorage):
+    """
+    Сховище у локальній директорії.
+
+    Attributes:
+        root (str): Коренева директорія файлів.
+        base_url (str): URL-префікс, за яким директорія доступна клієнтам.
+    """
+
+    def __init__(self, root: str = AVATAR_LOCAL_DIR, base_url: str = AVATAR_LOCAL_URL):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def save(self, key: str, data: bytes, content_type: str) -> str:
+        path = os.path.join(self.root, *key.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Запис через тимчасовий файл, щоб клієнт не побачив недописаний файл
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return f"{self.base_url}/{key}"
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(os.path.join(self.root, *key.split("/")))
+        except FileNotFoundError:
+            pass
+
+
+class CloudinaryStorage(AvatarStorage):
+    """Сховище у Cloudinary (`app.cloudinary_utils.cloudinary_utils`)."""
+
+    def save(self, key: str, data: bytes, content_type: str) -> str:
+        with timer(EXTERNAL_CALL_SECONDS.labels("cloudinary", "upload")):
+            return upload_image(data, public_id=key.rsplit(".", 1)[0])
+
+    def delete(self, key: str) -> None:
+        with timer(EXTERNAL_CALL_SECONDS.labels("cloudinary", "delete")):
+            delete_image(key.rsplit(".", 1)[0])
+
+
+def get_storage() -> AvatarStorage:
+    """
+    Створює сховище аватарів згідно з `AVATAR_STORAGE`.
+
+    Returns:
+        AvatarStorage: `LocalStorage` для ``local``, інакше `CloudinaryStorage`.
+    """
+    return LocalStorage() if AVATAR_STORAGE == "local" else CloudinaryStorage()
@@ -12,42 +12,61 @@ Cloudinary використовується для безпечного збер
 - `CLOUDINARY_CLOUD_NAME`
 - `CLOUDINARY_API_KEY`
 - `CLOUDINARY_API_SECRET`
+
+Пакет ``cloudinary`` імпортується і конфігурується при першому
+завантаженні чи видаленні, а не під час старту застосунку.
 """
 
-import os
-import cloudinary
-import cloudinary.uploader
+import io
+from functools import lru_cache
+
+from app.config.config import CLOUDINARY_API_KEY, CLOUDINARY_API_SECRET, CLOUDINARY_CLOUD_NAME
 
 # ---------- Конфігурація Cloudinary ----------
 
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
-    secure=True
-)
+@lru_cache(maxsize=None)
+def uploader():
+    """
+    Імпортує та конфігурує Cloudinary (один раз на процес).
+
+    Returns:
+        module: ``cloudinary.uploader``.
+    """
+    import cloudinary
+    import cloudinary.uploader
+
+    cloudinary.config(
+        cloud_name=CLOUDINARY_CLOUD_NAME or None,
+        api_key=CLOUDINARY_API_KEY or None,
+        api_secret=CLOUDINARY_API_SECRET or None,
+        secure=True
+    )
+    return cloudinary.uploader
 
-def upload_avatar_file(file) -> str:
+def upload_image(data: bytes, public_id: str) -> str:
     """
-    Завантажує аватар користувача у Cloudinary та повертає посилання.
+    Завантажує підготовлене зображення у Cloudinary та повертає посилання.
 
     Args:
-        file: Об’єкт файлу (наприклад, `UploadFile.file` із FastAPI),
-              який потрібно завантажити.
+        data (bytes): Вміст зображення (копія аватара з `app.avatars.images`).
+        public_id (str): Шлях зображення у Cloudinary без розширення,
+            наприклад ``avatars/<sha256>_256``.
 
     Returns:
         str: Безпечне (`https`) публічне посилання на завантажене зображення.
 
-    Example:
-        >>> with open("avatar.png", "rb") as f:
-        ...     url = upload_avatar_file(f)
-        ...     print(url)
-        'https://res.cloudinary.com/.../avatar.png'
-
     Notes:
-        - Файли зберігаються у папці **avatars**.
-        - Якщо файл уже існує, він буде **перезаписаний** (`overwrite=True`).
+        - Шляхи адресуються хешем вмісту, тож перезапис (`overwrite=True`)
+          можливий лише тим самим зображенням.
+    """
+    result = uploader().upload(io.BytesIO(data), public_id=public_id, overwrite=True)
+    return result.get("secure_url")
+
+def delete_image(public_id: str) -> None:
+    """
+    Видаляє зображення з Cloudinary.
+
+    Args:
+        public_id (str): Шлях зображення у Cloudinary без розширення.
     """
-    # file is a SpooledTemporaryFile or file-like (fastapi UploadFile)
-    result = cloudinary.uploader.upload(file, folder="avatars", overwrite=True)
-    return result.get("secure_url")
\ No newline at end of file
+    uploader().destroy(public_id, invalidate=True)
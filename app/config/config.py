@@ -1,41 +1,208 @@
+"""
+Модуль `config.py`
+
+Налаштування застосунку зі змінних середовища (та файлу ``.env``,
+у тестах — ``.env.test``).
+
+Середовище читається один раз — при першому зверненні до `get_settings()`;
+результат (`Settings`) кешується. Назви полів збігаються зі змінними
+середовища, а модуль віддає їх як атрибути, тож звичний імпорт
+``from app.config.config import SECRET_KEY`` повертає ``get_settings().SECRET_KEY``.
+"""
+
 import os
+import typing
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Mapping, Tuple
+
 from dotenv import load_dotenv
 
-# завантажуємо .env.test
-ENV_FILE = ".env.test" if os.getenv("PYTEST_CURRENT_TEST") else ".env"
-load_dotenv(ENV_FILE)
-
-# JWT
-SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret_key")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
-REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 7))
-
-# Database (Postgres)
-POSTGRES_USER = os.getenv("POSTGRES_USER", "postgres")
-POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "postgres")
-POSTGRES_DB = os.getenv("POSTGRES_DB", "postgres")
-POSTGRES_HOST = os.getenv("POSTGRES_HOST", "db")
-POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
-
-DATABASE_URL = os.getenv(
-    "DATABASE_URL",
-    f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
-)
-
-# Redis
-REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
-
-# Email (Mailhog для dev)
-SMTP_HOST = os.getenv("SMTP_HOST", "mailhog")
-SMTP_PORT = int(os.getenv("SMTP_PORT", 1025))
-SMTP_USER = os.getenv("SMTP_USER", "")
-SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
-
-# Cloudinary
-CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME", "")
-CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY", "")
-CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET", "")
-
-# Rate limit
-RATE_LIMIT_PER_MINUTE = int(os.getenv("RATE_LIMIT_PER_MINUTE", 10))
+#: Значення булевих змінних, що вважаються увімкненими.
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def parse_value(kind, raw: str):
+    """
+    Перетворює рядок зі змінної середовища на тип поля `Settings`.
+
+    Args:
+        kind: Анотація поля (``str``, ``int``, ``float``, ``bool`` або ``Tuple[str, ...]``).
+        raw (str): Значення змінної середовища.
+
+    Returns:
+        Значення потрібного типу; кортеж — елементи рядка через кому без порожніх.
+    """
+    if kind is bool:
+        return raw.strip().lower() in TRUE_VALUES
+    if typing.get_origin(kind) is tuple:
+        return tuple(item.strip() for item in raw.split(",") if item.strip())
+    return kind(raw)
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Усі налаштування застосунку; поле — змінна середовища з тією ж назвою.
+    """
+
+    # JWT
+    SECRET_KEY: str = "dev_secret_key"
+    ALGORITHM: str = "HS256"
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Асиметричні алгоритми (RS256 | ES256 | EdDSA): PEM ключа або шлях до файлу; публічний ключ виводиться з приватного
+    JWT_PRIVATE_KEY: str = ""
+    JWT_PUBLIC_KEY: str = ""
+    JWT_KEY_ID: str = ""
+    # Кеш перевірених токенів (запис живе не довше за exp токена)
+    TOKEN_CACHE_MAXSIZE: int = 10000
+    TOKEN_CACHE_TTL: int = 300
+    # Відкликані токени: локальний фільтр Блума (місткість і частка хибних спрацьовувань)
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+
+    # Database (Postgres)
+    POSTGRES_USER: str = "postgres"
+    POSTGRES_PASSWORD: str = "postgres"
+    POSTGRES_DB: str = "postgres"
+    POSTGRES_HOST: str = "db"
+    POSTGRES_PORT: str = "5432"
+    # Порожній — збирається з POSTGRES_*
+    DATABASE_URL: str = ""
+    # Асинхронний шлях (AsyncSession) у залежності `get_db`; URL порожній — виводиться з DATABASE_URL
+    USE_ASYNC_DB: bool = True
+    ASYNC_DATABASE_URL: str = ""
+
+    # Пул з’єднань з БД (pre-ping вимкнено: розірвані з’єднання інвалідуються при помилці)
+    DB_POOL_SIZE: int = 10
+    DB_POOL_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 10
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    # Скільки з’єднань пулу відкривати при запуску воркера (0 — не прогрівати)
+    DB_POOL_WARMUP: int = 5
+
+    # Репліки для читання: URL через кому (порожньо — усі запити йдуть на основну БД)
+    DATABASE_REPLICA_URLS: Tuple[str, ...] = ()
+    # Репліка з більшим відставанням (секунд) не отримує запитів до наступної перевірки
+    REPLICA_MAX_LAG: float = 5
+    REPLICA_CHECK_INTERVAL: float = 5
+    # Скільки секунд після власної зміни користувач читає з основної БД (read-your-writes)
+    REPLICA_PIN_SECONDS: float = 15
+
+    # Метрики Prometheus: спільна директорія знімків воркерів (порожня — один процес)
+    METRICS_MULTIPROC_DIR: str = ""
+    METRICS_FLUSH_INTERVAL: float = 5
+
+    # Профілювання запитів: частка випадкової вибірки (0 — лише за заголовком X-Profile) та розмір буфера звітів
+    PROFILE_SAMPLE_RATE: float = 0
+    PROFILE_BUFFER_SIZE: int = 50
+
+    # Токен для службових ендпоінтів /admin (порожній — ендпоінти вимкнено)
+    ADMIN_TOKEN: str = ""
+
+    # Redis
+    REDIS_URL: str = "redis://redis:6379/0"
+
+    # Email (Mailhog для dev); APP_HOST — базова адреса бекенду для посилань у листах
+    SMTP_HOST: str = "mailhog"
+    SMTP_PORT: int = 1025
+    SMTP_USER: str = ""
+    SMTP_PASSWORD: str = ""
+    FROM_EMAIL: str = "no-reply@example.com"
+    APP_HOST: str = "http://localhost:8000"
+
+    # Cloudinary
+    CLOUDINARY_CLOUD_NAME: str = ""
+    CLOUDINARY_API_KEY: str = ""
+    CLOUDINARY_API_SECRET: str = ""
+
+    # Rate limit (ліміт на користувача за хвилину; перевизначення: "contacts:bulk=5,contacts:create=20")
+    RATE_LIMIT_PER_MINUTE: int = 10
+    RATE_LIMIT_ROUTES: str = "contacts:bulk=5"
+    RATE_LIMIT_STORAGE: str = "redis"  # redis | memory
+
+    # Кеш автентифікованих користувачів (get_current_user); стара назва TTL — REDIS_TTL
+    USER_CACHE_TTL: int = field(default=3600, metadata={"env": ("USER_CACHE_TTL", "REDIS_TTL")})
+    USER_CACHE_LOCAL_TTL: int = 30
+    USER_CACHE_LOCAL_MAXSIZE: int = 10000
+
+    # Пул для хешування та перевірки паролів (bcrypt); черга 0 — чотири операції на воркера
+    PASSWORD_POOL_KIND: str = "thread"  # thread | process
+    PASSWORD_POOL_SIZE: int = field(default_factory=lambda: os.cpu_count() or 2)
+    PASSWORD_POOL_MAX_QUEUE: int = 0
+
+    # Черга вихідних листів (email outbox); забраний воркером лист інші воркери
+    # не беруть MAIL_LEASE_SECONDS секунд (після падіння воркера лист буде надіслано повторно)
+    MAIL_WORKER_ENABLED: bool = True
+    MAIL_BATCH_SIZE: int = 50
+    MAIL_POLL_INTERVAL: float = 2
+    MAIL_MAX_ATTEMPTS: int = 8
+    MAIL_RETRY_BASE_SECONDS: float = 5
+    MAIL_LEASE_SECONDS: float = 600
+
+    # Аватари: сховище (cloudinary | local) та пул обробки зображень
+    AVATAR_STORAGE: str = "cloudinary"
+    AVATAR_LOCAL_DIR: str = "media"
+    AVATAR_LOCAL_URL: str = "/media"
+    AVATAR_MAX_BYTES: int = 5 * 1024 * 1024
+    IMAGE_POOL_KIND: str = "process"  # process | thread
+    IMAGE_POOL_SIZE: int = 2
+    AVATAR_GC_GRACE_SECONDS: int = 3600
+
+    # Сервер (`python -m app.server`): адреса, кількість воркерів (0 — за кількістю CPU)
+    # та час на завершення поточних запитів після SIGTERM, секунд
+    HOST: str = "0.0.0.0"
+    PORT: int = 8000
+    WEB_CONCURRENCY: int = 0
+    GRACEFUL_TIMEOUT: float = 30
+
+    def __post_init__(self):
+        if not self.DATABASE_URL:
+            object.__setattr__(self, "DATABASE_URL", (
+                f"postgresql+psycopg2://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+                f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+            ))
+        if not self.PASSWORD_POOL_MAX_QUEUE:
+            object.__setattr__(self, "PASSWORD_POOL_MAX_QUEUE", self.PASSWORD_POOL_SIZE * 4)
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, str]) -> "Settings":
+        """
+        Збирає налаштування зі змінних середовища; відсутні беруться за замовчуванням.
+
+        Args:
+            environ (Mapping[str, str]): Змінні середовища (зазвичай ``os.environ``).
+
+        Returns:
+            Settings: Налаштування.
+        """
+        values = {}
+        for item in fields(cls):
+            for name in item.metadata.get("env", (item.name,)):
+                if name in environ:
+                    values[item.name] = parse_value(item.type, environ[name])
+                    break
+        return cls(**values)
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    Завантажує ``.env`` (у тестах — ``.env.test``) і читає налаштування; лише один раз.
+
+    Returns:
+        Settings: Спільні налаштування процесу.
+    """
+    load_dotenv(".env.test" if os.getenv("PYTEST_CURRENT_TEST") else ".env")
+    return Settings.from_env(os.environ)
+
+
+_SETTING_NAMES = frozenset(item.name for item in fields(Settings))
+
+
+def __getattr__(name: str):
+    if name in _SETTING_NAMES:
+        return getattr(get_settings(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
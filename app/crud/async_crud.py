@@ -0,0 +1,183 @@
+"""
+Асинхронні версії CRUD-операцій з модуля `crud`.
+
+Кожна функція приймає або `AsyncSession`, або звичайну `Session`:
+
+- з `AsyncSession` синхронна функція з `crud` виконується через
+  `AsyncSession.run_sync`, тобто в greenlet поверх асинхронного драйвера
+  (asyncpg/aiosqlite) — без блокування циклу подій і без потоків;
+- зі звичайною `Session` (``USE_ASYNC_DB=0`` або тестова БД) функція
+  виконується у threadpool Starlette, як це робив би синхронний маршрут.
+
+Завдяки цьому логіка запитів описана один раз у `crud`, а маршрути
+однаково працюють на обох шляхах.
+"""
+
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud import crud
+from app.models import models
+from app.schemas import schemas
+from app.utils.password_pool import password_pool
+
+
+async def run_sync(db, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+    """
+    Виконує синхронну функцію `fn(session, ...)` без блокування циклу подій.
+
+    Args:
+        db (AsyncSession | Session): Сесія бази даних.
+        fn (Callable): Функція, першим аргументом якої є синхронна `Session`.
+        *args: Позиційні аргументи для `fn`.
+        **kwargs: Іменовані аргументи для `fn`.
+
+    Returns:
+        Any: Результат `fn`.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: fn(session, *args, **kwargs))
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+# ---------- Users ----------
+
+async def get_user_by_email(db, email: str) -> Optional[models.User]:
+    """Асинхронна версія `crud.get_user_by_email`."""
+    return await run_sync(db, crud.get_user_by_email, email)
+
+async def get_user_by_id(db, user_id: int) -> Optional[models.User]:
+    """Асинхронна версія `crud.get_user_by_id`."""
+    return await run_sync(db, crud.get_user_by_id, user_id)
+
+async def get_password_hash(password: str) -> str:
+    """Асинхронна версія `crud.get_password_hash` (хешування у `password_pool`)."""
+    return await password_pool.hash(password)
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Асинхронна версія `crud.verify_password` (перевірка у `password_pool`)."""
+    return await password_pool.verify(plain_password, hashed_password)
+
+async def create_user(db, email: str, hashed_password: str, username: Optional[str] = None) -> models.User:
+    """Асинхронна версія `crud.create_user`."""
+    return await run_sync(db, crud.create_user, email, hashed_password, username)
+
+async def register_user(db, email: str, hashed_password: str, verify_token: str) -> models.User:
+    """Асинхронна версія `crud.register_user`."""
+    return await run_sync(db, crud.register_user, email, hashed_password, verify_token)
+
+async def request_password_reset(db, email: str, reset_token: str) -> models.EmailOutbox:
+    """Асинхронна версія `crud.request_password_reset`."""
+    return await run_sync(db, crud.request_password_reset, email, reset_token)
+
+async def update_user_password(db, user: models.User, new_password: str) -> models.User:
+    """Асинхронна версія `crud.update_user_password`; пароль хешується у `password_pool`."""
+    return await set_user_password(db, user, await get_password_hash(new_password))
+
+async def set_user_password(db, user: models.User, hashed_password: str) -> models.User:
+    """Асинхронна версія `crud.set_user_password`."""
+    return await run_sync(db, crud.set_user_password, user, hashed_password)
+
+async def update_user_avatar(db, user: models.User, avatar_url: str) -> models.User:
+    """Асинхронна версія `crud.update_user_avatar`."""
+    return await run_sync(db, crud.update_user_avatar, user, avatar_url)
+
+async def verify_user_email(db, user: models.User) -> models.User:
+    """Асинхронна версія `crud.verify_user_email`."""
+    return await run_sync(db, crud.verify_user_email, user)
+
+# ---------- Avatar jobs ----------
+
+async def create_avatar_job(db, user_id: int) -> models.AvatarJob:
+    """Асинхронна версія `crud.create_avatar_job`."""
+    return await run_sync(db, crud.create_avatar_job, user_id)
+
+async def get_avatar_job(db, job_id: str, user_id: int) -> Optional[models.AvatarJob]:
+    """Асинхронна версія `crud.get_avatar_job`."""
+    return await run_sync(db, crud.get_avatar_job, job_id, user_id)
+
+async def get_avatar_blob(db, digest: str) -> Optional[models.AvatarBlob]:
+    """Асинхронна версія `crud.get_avatar_blob`."""
+    return await run_sync(db, crud.get_avatar_blob, digest)
+
+# ---------- Contacts ----------
+
+async def get_contacts_version(db, user_id: int) -> int:
+    """Асинхронна версія `crud.get_contacts_version`."""
+    return await run_sync(db, crud.get_contacts_version, user_id)
+
+async def create_contact(db, contact_in: schemas.ContactCreate, user_id: int) -> models.Contact:
+    """Асинхронна версія `crud.create_contact`."""
+    return await run_sync(db, crud.create_contact, contact_in, user_id)
+
+async def bulk_create_contacts(db, rows: List[dict], user_id: int) -> int:
+    """Асинхронна версія `crud.bulk_create_contacts`."""
+    return await run_sync(db, crud.bulk_create_contacts, rows, user_id)
+
+async def get_contacts(db, user_id: int) -> List[models.Contact]:
+    """Асинхронна версія `crud.get_contacts`."""
+    return await run_sync(db, crud.get_contacts, user_id)
+
+async def get_contacts_page(db, user_id: int, **kwargs: Any) -> Tuple[List[models.Contact], Optional[str]]:
+    """Асинхронна версія `crud.get_contacts_page`."""
+    return await run_sync(db, crud.get_contacts_page, user_id, **kwargs)
+
+async def get_contact_rows_page(db, user_id: int, **kwargs: Any) -> Tuple[List[Row], Optional[str]]:
+    """Асинхронна версія `crud.get_contact_rows_page`."""
+    return await run_sync(db, crud.get_contact_rows_page, user_id, **kwargs)
+
+async def stream_contact_rows(db, user_id: int, batch_size: int = 1000, **kwargs: Any) -> AsyncIterator[List[Row]]:
+    """
+    Потоково віддає контакти користувача пакетами кортежів колонок.
+
+    З `AsyncSession` використовується `AsyncSession.stream` (серверний
+    курсор асинхронного драйвера), зі звичайною `Session` —
+    `crud.iter_contact_rows`, кожен крок якого виконується у threadpool.
+
+    Args:
+        db (AsyncSession | Session): Сесія бази даних.
+        user_id (int): Ідентифікатор користувача.
+        batch_size (int): Розмір пакета.
+        **kwargs: `sort`, `after` та фільтри — див. `crud.contacts_select`.
+
+    Yields:
+        List[Row]: Пакети рядків `crud.CONTACT_COLUMNS`.
+
+    Raises:
+        ValueError: Якщо курсор недійсний (до початку читання).
+    """
+    stmt = crud.contacts_select(crud.CONTACT_COLUMNS, user_id, **kwargs)
+    if isinstance(db, AsyncSession):
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+    else:
+        async for partition in iterate_in_threadpool(crud.iter_contact_rows(db, stmt, batch_size)):
+            yield partition
+
+async def search_contacts(db, user_id: int, q: str, limit: int = 20) -> List[models.Contact]:
+    """Асинхронна версія `crud.search_contacts`."""
+    return await run_sync(db, crud.search_contacts, user_id, q, limit=limit)
+
+async def get_contact(db, contact_id: int, user_id: int) -> Optional[models.Contact]:
+    """Асинхронна версія `crud.get_contact`."""
+    return await run_sync(db, crud.get_contact, contact_id, user_id)
+
+async def update_contact(db, contact: models.Contact, updates: schemas.ContactUpdate) -> models.Contact:
+    """Асинхронна версія `crud.update_contact`."""
+    return await run_sync(db, crud.update_contact, contact, updates)
+
+async def delete_contact(db, contact: models.Contact) -> None:
+    """Асинхронна версія `crud.delete_contact`."""
+    return await run_sync(db, crud.delete_contact, contact)
+
+async def apply_contact_batch(db, user_id: int, operations: List[schemas.BatchOperation], atomic: bool = False) -> Tuple[List[dict], bool]:
+    """Асинхронна версія `crud.apply_contact_batch`."""
+    return await run_sync(db, crud.apply_contact_batch, user_id, operations, atomic)
+
+async def get_contact_changes(db, user_id: int, since: Optional[str] = None, limit: int = 500) -> Tuple[List[models.Contact], str, bool]:
+    """Асинхронна версія `crud.get_contact_changes`."""
+    return await run_sync(db, crud.get_contact_changes, user_id, since=since, limit=limit)
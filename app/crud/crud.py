@@ -5,16 +5,34 @@
 даних у базі даних через SQLAlchemy ORM.
 
 Також містить допоміжні функції для хешування паролів і перевірки автентичності.
+
+Операції запису виконуються одним оператором `INSERT/UPDATE ... RETURNING`:
+згенеровані БД значення (id, часові мітки, версії) повертаються тим самим
+запитом, тож після коміту не потрібен `db.refresh` (другий SELECT).
+Сесії створюються з ``expire_on_commit=False``, тому повернені об’єкти
+лишаються завантаженими і після коміту.
 """
 
+import base64
+import json
+import uuid
+from datetime import datetime
+from sqlalchemy import Row, Select, and_, case, delete, func, insert, or_, select, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from passlib.context import CryptContext
+from typing import Iterator, List, Optional, Tuple
+from functools import lru_cache
+from app.crud import queries
+from app.mailer import mailer
 from app.models import models
 from app.schemas import schemas
 
-# Контекст для хешування паролів
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Контекст для хешування паролів: passlib імпортується, а бекенд bcrypt
+# перевіряється під час першого хешування, а не при старті застосунку
+@lru_cache(maxsize=None)
+def pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # ---------- Users ----------
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
@@ -28,12 +46,15 @@ def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
     Returns:
         Optional[User]: Об’єкт користувача або None, якщо не знайдено.
     """
-    return db.query(models.User).filter(models.User.email == email).first()
+    return db.scalar(queries.user_by_email(email))
 
 def get_user_by_id(db: Session, user_id: int) -> Optional[models.User]:
     """
     Отримати користувача за ID.
 
+    Пошук за первинним ключем через `Session.get`: якщо користувач уже
+    завантажений у цій сесії, запит до БД не виконується.
+
     Args:
         db (Session): Сесія бази даних SQLAlchemy.
         user_id (int): Ідентифікатор користувача.
@@ -41,7 +62,7 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[models.User]:
     Returns:
         Optional[User]: Об’єкт користувача або None, якщо не знайдено.
     """
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    return db.get(models.User, user_id)
 
 def get_password_hash(password: str) -> str:
     """
@@ -53,7 +74,7 @@ def get_password_hash(password: str) -> str:
     Returns:
         str: Хешований пароль.
     """
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -66,7 +87,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: True, якщо пароль вірний, інакше False.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 def create_user(db: Session, email: str, hashed_password: str, username: Optional[str] = None) -> models.User:
     """
@@ -81,12 +102,54 @@ def create_user(db: Session, email: str, hashed_password: str, username: Optiona
     Returns:
         User: Створений об’єкт користувача.
     """
-    db_user = models.User(email=email, password=hashed_password[:72], username=username)
-    db.add(db_user)
+    db_user = _insert_user(db, email, hashed_password, username)
     db.commit()
-    db.refresh(db_user)
     return db_user
 
+def _insert_user(db: Session, email: str, hashed_password: str, username: Optional[str]) -> models.User:
+    return db.scalar(
+        insert(models.User)
+        .values(email=email, password=hashed_password[:72], username=username)
+        .returning(models.User)
+    )
+
+def register_user(db: Session, email: str, hashed_password: str, verify_token: str) -> models.User:
+    """
+    Створює користувача й ставить у чергу лист підтвердження в одній транзакції.
+
+    Якщо транзакція не зафіксується, не буде ні облікового запису, ні листа;
+    обліковий запис без листа підтвердження неможливий.
+
+    Args:
+        db (Session): Сесія бази даних.
+        email (str): Електронна пошта користувача.
+        hashed_password (str): Хешований пароль.
+        verify_token (str): Токен підтвердження для посилання в листі.
+
+    Returns:
+        User: Створений об’єкт користувача.
+    """
+    db_user = _insert_user(db, email, hashed_password, None)
+    mailer.queue_verification_email(db, email, verify_token)
+    db.commit()
+    return db_user
+
+def request_password_reset(db: Session, email: str, reset_token: str) -> models.EmailOutbox:
+    """
+    Ставить у чергу лист із посиланням для скидання пароля і фіксує його.
+
+    Args:
+        db (Session): Сесія бази даних.
+        email (str): Електронна пошта користувача.
+        reset_token (str): Токен скидання пароля для посилання в листі.
+
+    Returns:
+        EmailOutbox: Запис черги листів.
+    """
+    message = mailer.queue_reset_email(db, email, reset_token)
+    db.commit()
+    return message
+
 def update_user_password(db: Session, user: models.User, new_password: str) -> models.User:
     """
     Оновлює пароль користувача.
@@ -99,10 +162,24 @@ def update_user_password(db: Session, user: models.User, new_password: str) -> m
     Returns:
         User: Оновлений користувач.
     """
-    user.password = get_password_hash(new_password)
-    db.commit()
-    db.refresh(user)
-    return user
+    return set_user_password(db, user, get_password_hash(new_password))
+
+def set_user_password(db: Session, user: models.User, hashed_password: str) -> models.User:
+    """
+    Зберігає вже захешований пароль користувача.
+
+    Використовується, коли хешування виконано заздалегідь
+    (наприклад, у пулі `app.utils.password_pool`).
+
+    Args:
+        db (Session): Сесія бази даних.
+        user (User): Об’єкт користувача.
+        hashed_password (str): Хеш нового пароля.
+
+    Returns:
+        User: Оновлений користувач.
+    """
+    return _update_user(db, user, password=hashed_password)
 
 def update_user_avatar(db: Session, user: models.User, avatar_url: str) -> models.User:
     """
@@ -116,10 +193,7 @@ def update_user_avatar(db: Session, user: models.User, avatar_url: str) -> model
     Returns:
         User: Оновлений користувач.
     """
-    user.avatar_url = avatar_url
-    db.commit()
-    db.refresh(user)
-    return user
+    return _update_user(db, user, avatar_url=avatar_url)
 
 def verify_user_email(db: Session, user: models.User) -> models.User:
     """
@@ -132,13 +206,187 @@ def verify_user_email(db: Session, user: models.User) -> models.User:
     Returns:
         User: Оновлений користувач зі статусом `is_verified=True`.
     """
-    user.is_verified = True
+    return _update_user(db, user, is_verified=True)
+
+def _update_user(db: Session, user: models.User, **values) -> models.User:
+    """Оновлює поля користувача одним `UPDATE ... RETURNING` і фіксує транзакцію."""
+    updated = db.scalar(
+        update(models.User).where(models.User.id == user.id).values(**values).returning(models.User)
+    )
+    db.commit()
+    return updated
+
+# ---------- Avatar jobs ----------
+
+def create_avatar_job(db: Session, user_id: int) -> models.AvatarJob:
+    """
+    Створює завдання завантаження аватара.
+
+    Args:
+        db (Session): Сесія бази даних.
+        user_id (int): Ідентифікатор користувача.
+
+    Returns:
+        AvatarJob: Нове завдання зі статусом "pending".
+    """
+    job = db.scalar(
+        insert(models.AvatarJob)
+        .values(id=uuid.uuid4().hex, user_id=user_id, status="pending")
+        .returning(models.AvatarJob)
+    )
+    db.commit()
+    return job
+
+def get_avatar_job(db: Session, job_id: str, user_id: int) -> Optional[models.AvatarJob]:
+    """
+    Отримує завдання завантаження аватара користувача.
+
+    Args:
+        db (Session): Сесія бази даних.
+        job_id (str): Ідентифікатор завдання.
+        user_id (int): Ідентифікатор власника.
+
+    Returns:
+        Optional[AvatarJob]: Завдання або None, якщо його не існує чи воно чуже.
+    """
+    job = db.get(models.AvatarJob, job_id)
+    return job if job is not None and job.user_id == user_id else None
+
+def get_avatar_blob(db: Session, digest: str) -> Optional[models.AvatarBlob]:
+    """
+    Шукає вже завантажений аватар за хешем вмісту.
+
+    Args:
+        db (Session): Сесія бази даних.
+        digest (str): SHA-256 вмісту (hex).
+
+    Returns:
+        Optional[AvatarBlob]: Запис індексу або None.
+    """
+    return db.get(models.AvatarBlob, digest)
+
+def finish_avatar_job(
+    db: Session,
+    job_id: str,
+    digest: Optional[str] = None,
+    urls: Optional[dict] = None,
+    error: Optional[str] = None,
+) -> Optional[models.User]:
+    """
+    Завершує завдання аватара і, якщо воно успішне, оновлює аватар користувача.
+
+    Якщо вміст з хешем `digest` ще не індексовано, створюється `AvatarBlob`
+    з переданими `urls`. Лічильник посилань нового запису збільшується,
+    а попереднього аватара користувача — зменшується (рядок користувача
+    заблоковано ``FOR UPDATE``). Аватаром стає найбільша з копій.
+
+    Args:
+        db (Session): Сесія бази даних.
+        job_id (str): Ідентифікатор завдання.
+        digest (Optional[str]): Хеш вмісту аватара (для успіху).
+        urls (Optional[dict]): Розмір -> URL щойно вивантажених копій; None — повторне використання.
+        error (Optional[str]): Текст помилки (для невдачі).
+
+    Returns:
+        Optional[User]: Користувач із новим аватаром або None, якщо завдання невдале.
+
+    Raises:
+        IntegrityError: Якщо той самий вміст паралельно проіндексовано іншим завданням.
+    """
+    job = db.get(models.AvatarJob, job_id)
+    job.finished_at = datetime.utcnow()
+    blob = db.get(models.AvatarBlob, digest) if error is None else None
+    if blob is None and urls is not None:
+        blob = models.AvatarBlob(hash=digest, urls={str(size): url for size, url in urls.items()}, refcount=0)
+        db.add(blob)
+        db.flush()
+    if blob is None:
+        job.status, job.error = "failed", (error or "Avatar is no longer available, upload it again")[:255]
+        db.commit()
+        return None
+    # Рядок користувача блокується до зміни лічильників: паралельне завдання
+    # того ж користувача чекає і бачить уже новий `avatar_hash`, а не той,
+    # що обидва прочитали б без блокування (і двічі зменшили б його лічильник)
+    user = db.get(models.User, job.user_id, with_for_update=True, populate_existing=True)
+    if user.avatar_hash != digest:
+        for blob_hash, delta in ((digest, 1), (user.avatar_hash, -1)):
+            if blob_hash is not None:
+                db.execute(
+                    update(models.AvatarBlob)
+                    .where(models.AvatarBlob.hash == blob_hash)
+                    .values(refcount=models.AvatarBlob.refcount + delta)
+                )
+    user.avatar_hash = digest
+    user.avatar_url = blob.urls[str(max(int(size) for size in blob.urls))]
+    job.status, job.urls = "done", blob.urls
     db.commit()
-    db.refresh(user)
     return user
 
+def delete_orphan_avatar_blobs(db: Session, older_than: datetime, limit: int = 100) -> List[Row]:
+    """
+    Видаляє з індексу аватари, на які більше ніхто не посилається.
+
+    Args:
+        db (Session): Сесія бази даних.
+        older_than (datetime): Видаляються лише записи, не змінені після цього часу.
+        limit (int): Максимальна кількість записів за один виклик.
+
+    Returns:
+        List[Row]: Видалені записи `(hash, urls)` — їхні файли слід прибрати зі сховища.
+    """
+    orphan = and_(models.AvatarBlob.refcount <= 0, models.AvatarBlob.updated_at < older_than)
+    hashes = db.scalars(select(models.AvatarBlob.hash).where(orphan).limit(limit)).all()
+    if not hashes:
+        return []
+    deleted = db.execute(
+        delete(models.AvatarBlob)
+        .where(models.AvatarBlob.hash.in_(hashes), orphan)
+        .returning(models.AvatarBlob.hash, models.AvatarBlob.urls)
+    ).all()
+    db.commit()
+    return deleted
+
 # ---------- Contacts ----------
 
+def bump_contacts_version(db: Session, user_id: int) -> int:
+    """
+    Збільшує версію колекції контактів користувача в поточній транзакції.
+
+    Викликається кожною операцією, що змінює контакти, до коміту —
+    тож нова версія стає видимою разом зі змінами. Повернене значення
+    записується в `Contact.change_seq` змінених контактів і слугує
+    монотонним номером зміни для `get_contact_changes`.
+
+    Args:
+        db (Session): Сесія бази даних.
+        user_id (int): Ідентифікатор власника контактів.
+
+    Returns:
+        int: Нова версія колекції.
+    """
+    return db.execute(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(contacts_version=models.User.contacts_version + 1)
+        .returning(models.User.contacts_version)
+    ).scalar_one()
+
+def get_contacts_version(db: Session, user_id: int) -> int:
+    """
+    Повертає поточну версію колекції контактів користувача.
+
+    Це дешевий запит за первинним ключем, який дозволяє відповісти
+    304 Not Modified, не виконуючи запит списку контактів.
+
+    Args:
+        db (Session): Сесія бази даних.
+        user_id (int): Ідентифікатор користувача.
+
+    Returns:
+        int: Версія колекції (0, якщо контакти ще не змінювались).
+    """
+    return db.scalar(select(models.User.contacts_version).where(models.User.id == user_id)) or 0
+
 def create_contact(db: Session, contact_in: schemas.ContactCreate, user_id: int) -> models.Contact:
     """
     Створює новий контакт для користувача.
@@ -151,12 +399,38 @@ def create_contact(db: Session, contact_in: schemas.ContactCreate, user_id: int)
     Returns:
         Contact: Створений контакт.
     """
-    db_contact = models.Contact(**contact_in.dict(), owner_id=user_id)
-    db.add(db_contact)
+    change_seq = bump_contacts_version(db, user_id)
+    db_contact = db.scalar(
+        insert(models.Contact)
+        .values(**contact_in.model_dump(), owner_id=user_id, change_seq=change_seq)
+        .returning(models.Contact)
+    )
     db.commit()
-    db.refresh(db_contact)
     return db_contact
 
+def bulk_create_contacts(db: Session, rows: List[dict], user_id: int) -> int:
+    """
+    Масово створює контакти користувача одним пакетом.
+
+    Рядки вставляються одним `INSERT` у режимі executemany (SQLAlchemy
+    групує їх у багаторядкові `VALUES`) та фіксуються однією транзакцією,
+    без `refresh` кожного об’єкта.
+
+    Args:
+        db (Session): Сесія бази даних.
+        rows (List[dict]): Провалідовані дані контактів (поля `ContactCreate`).
+        user_id (int): Ідентифікатор власника контактів.
+
+    Returns:
+        int: Кількість вставлених контактів.
+    """
+    if not rows:
+        return 0
+    change_seq = bump_contacts_version(db, user_id)
+    db.execute(insert(models.Contact), [{**row, "owner_id": user_id, "change_seq": change_seq} for row in rows])
+    db.commit()
+    return len(rows)
+
 def get_contacts(db: Session, user_id: int) -> List[models.Contact]:
     """
     Отримує всі контакти користувача.
@@ -168,12 +442,246 @@ def get_contacts(db: Session, user_id: int) -> List[models.Contact]:
     Returns:
         List[Contact]: Список контактів.
     """
-    return db.query(models.Contact).filter(models.Contact.owner_id == user_id).all()
+    return list(db.scalars(queries.contacts_of(user_id)))
+
+def encode_cursor(sort: str, key: list) -> str:
+    """
+    Кодує позицію keyset-пагінації у непрозорий токен.
+
+    Args:
+        sort (str): Режим, для якого створено курсор ("id", "name" або "changes").
+        key (list): Значення ключа сортування останнього рядка сторінки.
+
+    Returns:
+        str: URL-безпечний токен курсора.
+    """
+    raw = json.dumps({"s": sort, "k": key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str, sort: str) -> list:
+    """
+    Розкодовує токен курсора, створений `encode_cursor`.
+
+    Args:
+        token (str): Токен курсора з параметра `after`.
+        sort (str): Поточний режим сортування.
+
+    Returns:
+        list: Значення ключа сортування.
+
+    Raises:
+        ValueError: Якщо токен пошкоджений або створений для іншого сортування.
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        key = data["k"]
+        valid = data["s"] == sort and isinstance(key, list) and len(key) == (1 if sort == "id" else 2)
+    except (ValueError, TypeError, KeyError):
+        valid = False
+    if not valid:
+        raise ValueError("Invalid cursor")
+    return key
+
+def _contains(value: str) -> str:
+    """Будує шаблон LIKE «містить», екрануючи службові символи."""
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+#: Колонки контакту, які повертає «швидкий» режим списку (без ORM-об’єктів).
+CONTACT_COLUMNS = (
+    models.Contact.id,
+    models.Contact.name,
+    models.Contact.email,
+    models.Contact.phone,
+    models.Contact.address,
+    models.Contact.owner_id,
+)
+
+def contacts_select(
+    entities,
+    user_id: int,
+    after: Optional[str] = None,
+    sort: str = "id",
+    name: Optional[str] = None,
+    email: Optional[str] = None,
+    phone: Optional[str] = None,
+) -> Select:
+    """
+    Будує запит контактів користувача з фільтрами та keyset-умовою.
+
+    Замість OFFSET використовується умова «після останнього ключа»
+    по `(owner_id, id)` або `(owner_id, name, id)`, тож вартість запиту
+    не залежить від номера сторінки.
+
+    Args:
+        entities: Що вибирати — `models.Contact` або колонки (`CONTACT_COLUMNS`).
+        user_id (int): Ідентифікатор користувача.
+        after (Optional[str]): Токен курсора з попередньої сторінки.
+        sort (str): Сортування: "id" (за замовчуванням) або "name".
+        name (Optional[str]): Фільтр — ім’я містить рядок (без урахування регістру).
+        email (Optional[str]): Фільтр — email містить рядок.
+        phone (Optional[str]): Фільтр — телефон містить рядок.
+
+    Returns:
+        Select: Запит, упорядкований за ключем сортування.
+
+    Raises:
+        ValueError: Якщо курсор недійсний.
+    """
+    if not isinstance(entities, (tuple, list)):
+        entities = (entities,)
+    stmt = select(*entities).where(models.Contact.owner_id == user_id, models.Contact.deleted_at.is_(None))
+    if name:
+        stmt = stmt.where(models.Contact.name.ilike(_contains(name), escape="\\"))
+    if email:
+        stmt = stmt.where(models.Contact.email.ilike(_contains(email), escape="\\"))
+    if phone:
+        stmt = stmt.where(models.Contact.phone.ilike(_contains(phone), escape="\\"))
+
+    if sort == "name":
+        if after:
+            last_name, last_id = decode_cursor(after, sort)
+            stmt = stmt.where(or_(
+                models.Contact.name > last_name,
+                (models.Contact.name == last_name) & (models.Contact.id > last_id),
+            ))
+        return stmt.order_by(models.Contact.name, models.Contact.id)
+    if after:
+        (last_id,) = decode_cursor(after, sort)
+        stmt = stmt.where(models.Contact.id > last_id)
+    return stmt.order_by(models.Contact.id)
+
+def _page(rows: list, limit: int, sort: str) -> Tuple[list, Optional[str]]:
+    """Відрізає зайвий рядок сторінки та будує курсор наступної сторінки."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    key = [last.name, last.id] if sort == "name" else [last.id]
+    return rows, encode_cursor(sort, key)
+
+def get_contacts_page(
+    db: Session,
+    user_id: int,
+    limit: int = 50,
+    sort: str = "id",
+    **filters,
+) -> Tuple[List[models.Contact], Optional[str]]:
+    """
+    Отримує одну сторінку контактів користувача з keyset-пагінацією.
+
+    Args:
+        db (Session): Сесія бази даних.
+        user_id (int): Ідентифікатор користувача.
+        limit (int): Максимальна кількість контактів на сторінці.
+        sort (str): Сортування: "id" (за замовчуванням) або "name".
+        **filters: `after`, `name`, `email`, `phone` — див. `contacts_select`.
+
+    Returns:
+        Tuple[List[Contact], Optional[str]]: Контакти сторінки та токен
+        наступної сторінки (None, якщо це остання сторінка).
+
+    Raises:
+        ValueError: Якщо курсор недійсний.
+    """
+    # Беремо на один рядок більше, щоб дізнатися, чи є наступна сторінка
+    stmt = contacts_select(models.Contact, user_id, sort=sort, **filters).limit(limit + 1)
+    return _page(list(db.scalars(stmt)), limit, sort)
+
+def get_contact_rows_page(
+    db: Session,
+    user_id: int,
+    limit: int = 50,
+    sort: str = "id",
+    **filters,
+) -> Tuple[List[Row], Optional[str]]:
+    """
+    Те саме, що `get_contacts_page`, але повертає кортежі колонок.
+
+    Рядки не проходять через identity map та створення ORM-об’єктів,
+    що суттєво дешевше для великих сторінок.
+
+    Returns:
+        Tuple[List[Row], Optional[str]]: Рядки `CONTACT_COLUMNS` та курсор наступної сторінки.
+    """
+    stmt = contacts_select(CONTACT_COLUMNS, user_id, sort=sort, **filters).limit(limit + 1)
+    return _page(list(db.execute(stmt)), limit, sort)
+
+def iter_contact_rows(db: Session, stmt: Select, batch_size: int = 1000) -> Iterator[List[Row]]:
+    """
+    Потоково читає рядки запиту пакетами через серверний курсор.
+
+    Args:
+        db (Session): Сесія бази даних.
+        stmt (Select): Запит (зазвичай `contacts_select(CONTACT_COLUMNS, ...)`).
+        batch_size (int): Розмір пакета (`yield_per`).
+
+    Yields:
+        List[Row]: Черговий пакет рядків.
+    """
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    try:
+        for partition in result.partitions():
+            yield partition
+    finally:
+        result.close()
+
+def search_contacts(db: Session, user_id: int, q: str, limit: int = 20) -> List[models.Contact]:
+    """
+    Шукає контакти користувача за частиною імені або email.
+
+    У PostgreSQL запит використовує GIN-індекси `pg_trgm`: збіг за
+    підрядком (``ILIKE``) або за схожістю (оператор ``%``), результати
+    впорядковано за схожістю. В інших СУБД (SQLite у тестах) виконується
+    лише пошук за підрядком, а збіги за префіксом імені йдуть першими.
+
+    Args:
+        db (Session): Сесія бази даних.
+        user_id (int): Ідентифікатор користувача.
+        q (str): Рядок пошуку.
+        limit (int): Максимальна кількість результатів.
+
+    Returns:
+        List[Contact]: Знайдені контакти.
+    """
+    q = q.strip()
+    pattern = _contains(q)
+    match = or_(
+        models.Contact.name.ilike(pattern, escape="\\"),
+        models.Contact.email.ilike(pattern, escape="\\"),
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        match = or_(match, models.Contact.name.op("%")(q), models.Contact.email.op("%")(q))
+        order = (
+            func.greatest(
+                func.similarity(models.Contact.name, q),
+                func.similarity(models.Contact.email, q),
+            ).desc(),
+            models.Contact.id,
+        )
+    else:
+        prefix = pattern[1:]
+        order = (
+            case((models.Contact.name.ilike(prefix, escape="\\"), 0), else_=1),
+            models.Contact.name,
+            models.Contact.id,
+        )
+    stmt = (
+        select(models.Contact)
+        .where(models.Contact.owner_id == user_id, models.Contact.deleted_at.is_(None), match)
+        .order_by(*order)
+        .limit(limit)
+    )
+    return list(db.scalars(stmt))
 
 def get_contact(db: Session, contact_id: int, user_id: int) -> Optional[models.Contact]:
     """
     Отримує один контакт користувача за ID.
 
+    Контакт шукається за первинним ключем через `Session.get` (без запиту,
+    якщо він уже є в identity map сесії), а належність і видалення
+    перевіряються на завантаженому об’єкті.
+
     Args:
         db (Session): Сесія бази даних.
         contact_id (int): Ідентифікатор контакту.
@@ -182,10 +690,10 @@ def get_contact(db: Session, contact_id: int, user_id: int) -> Optional[models.C
     Returns:
         Optional[Contact]: Об’єкт контакту або None, якщо не знайдено.
     """
-    return db.query(models.Contact).filter(
-        models.Contact.id == contact_id,
-        models.Contact.owner_id == user_id
-    ).first()
+    contact = db.get(models.Contact, contact_id)
+    if contact is None or contact.owner_id != user_id or contact.deleted_at is not None:
+        return None
+    return contact
 
 def update_contact(db: Session, contact: models.Contact, updates: schemas.ContactUpdate) -> models.Contact:
     """
@@ -199,15 +707,22 @@ def update_contact(db: Session, contact: models.Contact, updates: schemas.Contac
     Returns:
         Contact: Оновлений контакт.
     """
-    for k, v in updates.dict(exclude_unset=True).items():
-        setattr(contact, k, v)
+    updated = db.scalar(
+        update(models.Contact)
+        .where(models.Contact.id == contact.id)
+        .values(**updates.model_dump(exclude_unset=True), change_seq=bump_contacts_version(db, contact.owner_id))
+        .returning(models.Contact)
+    )
     db.commit()
-    db.refresh(contact)
-    return contact
+    return updated
 
 def delete_contact(db: Session, contact: models.Contact) -> None:
     """
-    Видаляє контакт із бази даних.
+    Видаляє контакт (м’яке видалення).
+
+    Рядок лишається в таблиці як «надгробок» з `deleted_at` та новим
+    `change_seq`, щоб клієнти дізналися про видалення через
+    `get_contact_changes`. Усі запити читання такі рядки пропускають.
 
     Args:
         db (Session): Сесія бази даних.
@@ -216,5 +731,160 @@ def delete_contact(db: Session, contact: models.Contact) -> None:
     Returns:
         None
     """
-    db.delete(contact)
-    db.commit()
\ No newline at end of file
+    contact.deleted_at = datetime.utcnow()
+    contact.change_seq = bump_contacts_version(db, contact.owner_id)
+    db.commit()
+
+def apply_contact_batch(
+    db: Session,
+    user_id: int,
+    operations: List[schemas.BatchOperation],
+    atomic: bool = False,
+) -> Tuple[List[dict], bool]:
+    """
+    Виконує пакет операцій над контактами користувача однією транзакцією.
+
+    Замість SELECT + UPDATE + refresh на кожен контакт:
+
+    - належність контактів перевіряється одним запитом ``id IN (...)``;
+    - усі створення — один `INSERT ... RETURNING` (executemany);
+    - усі оновлення — один `UPDATE ... WHERE id IN (...) RETURNING`, де
+      значення кожної колонки обирається через ``CASE id``;
+    - усі видалення — один `UPDATE` (м’яке видалення) з ``id IN (...)``.
+
+    Усі змінені контакти отримують один `change_seq`. Стан контактів
+    у результатах знімається з RETURNING до коміту, тож після коміту
+    не потрібні додаткові SELECT.
+
+    Args:
+        db (Session): Сесія бази даних.
+        user_id (int): Ідентифікатор власника контактів.
+        operations (List[BatchOperation]): Операції пакета.
+        atomic (bool): True — не виконувати жодної операції, якщо хоча б одна невиконувана.
+
+    Returns:
+        Tuple[List[dict], bool]: Результати в порядку операцій (поля
+        `schemas.BatchOperationResult`) та ознака, що зміни зафіксовано.
+    """
+    results = [{"index": i, "op": op.op, "status": 0, "id": getattr(op, "id", None)} for i, op in enumerate(operations)]
+    ids = [op.id for op in operations if op.op != "create"]
+    owned = set(db.scalars(
+        select(models.Contact.id).where(
+            models.Contact.id.in_(ids),
+            models.Contact.owner_id == user_id,
+            models.Contact.deleted_at.is_(None),
+        )
+    )) if ids else set()
+
+    seen = set()
+    for op, result in zip(operations, results):
+        if op.op == "create":
+            continue
+        if op.id in seen:
+            result.update(status=409, error="Contact appears more than once in the batch")
+        elif op.id not in owned:
+            result.update(status=404, error="Not found")
+        seen.add(op.id)
+
+    failed = sum(1 for r in results if r["status"])
+    if atomic and failed:
+        for result in results:
+            if not result["status"]:
+                result.update(status=424, error="Not applied: another operation of the atomic batch failed")
+        return results, False
+
+    valid = [(op, r) for op, r in zip(operations, results) if not r["status"]]
+    creates = [(op, r) for op, r in valid if op.op == "create"]
+    updates = [(op, r) for op, r in valid if op.op == "update"]
+    deletes = [(op, r) for op, r in valid if op.op == "delete"]
+    if not valid:
+        return results, False
+
+    change_seq = bump_contacts_version(db, user_id)
+    if creates:
+        created = db.scalars(
+            insert(models.Contact).returning(models.Contact, sort_by_parameter_order=True),
+            [{**op.data.model_dump(), "owner_id": user_id, "change_seq": change_seq} for op, _ in creates],
+        ).all()
+        for (_, result), contact in zip(creates, created):
+            result.update(status=201, id=contact.id, contact=schemas.ContactOut.model_validate(contact))
+
+    if updates:
+        values = {"change_seq": change_seq}
+        for column in schemas.ContactUpdate.model_fields:
+            changed = {op.id: data[column] for op, _ in updates if column in (data := op.data.model_dump(exclude_unset=True))}
+            if changed:
+                values[column] = case(changed, value=models.Contact.id, else_=getattr(models.Contact, column))
+        updated = {
+            contact.id: contact
+            for contact in db.scalars(
+                update(models.Contact)
+                .where(models.Contact.id.in_([op.id for op, _ in updates]), models.Contact.owner_id == user_id)
+                .values(**values)
+                .returning(models.Contact)
+                .execution_options(synchronize_session=False)
+            )
+        }
+        for op, result in updates:
+            result.update(status=200, contact=schemas.ContactOut.model_validate(updated[op.id]))
+
+    if deletes:
+        db.execute(
+            update(models.Contact)
+            .where(models.Contact.id.in_([op.id for op, _ in deletes]), models.Contact.owner_id == user_id)
+            .values(deleted_at=datetime.utcnow(), change_seq=change_seq)
+            .execution_options(synchronize_session=False)
+        )
+        for _, result in deletes:
+            result["status"] = 204
+
+    db.commit()
+    return results, True
+
+def get_contact_changes(
+    db: Session,
+    user_id: int,
+    since: Optional[str] = None,
+    limit: int = 500,
+) -> Tuple[List[models.Contact], str, bool]:
+    """
+    Отримує контакти, створені, змінені або видалені після токена `since`.
+
+    Зміни впорядковано за `(change_seq, id)` і читаються за індексом
+    `(owner_id, change_seq, id)`, тож вартість запиту пропорційна
+    кількості змін, а не розміру адресної книги. Кожен контакт
+    з’являється один раз — у своєму останньому стані (видалені —
+    з `deleted_at`).
+
+    Args:
+        db (Session): Сесія бази даних.
+        user_id (int): Ідентифікатор користувача.
+        since (Optional[str]): Токен попередньої синхронізації; None — з самого початку.
+        limit (int): Максимальна кількість змін у відповіді.
+
+    Returns:
+        Tuple[List[Contact], str, bool]: Змінені контакти, токен для
+        наступного запиту та ознака, що змін більше, ніж `limit`.
+
+    Raises:
+        ValueError: Якщо токен недійсний.
+    """
+    last_seq, last_id = decode_cursor(since, "changes") if since else (0, 0)
+    stmt = (
+        select(models.Contact)
+        .where(
+            models.Contact.owner_id == user_id,
+            or_(
+                models.Contact.change_seq > last_seq,
+                and_(models.Contact.change_seq == last_seq, models.Contact.id > last_id),
+            ),
+        )
+        .order_by(models.Contact.change_seq, models.Contact.id)
+        .limit(limit + 1)
+    )
+    rows = list(db.scalars(stmt))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        last_seq, last_id = rows[-1].change_seq, rows[-1].id
+    return rows, encode_cursor("changes", [last_seq, last_id]), has_more
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Модуль `queries.py`
+
+Запити гарячих шляхів у стилі SQLAlchemy 2.0.
+
+Функції повертають `lambda_stmt`: при першому виклику лямбда виконується
+і результат кешується за її кодом, а при наступних змінюються лише
+значення зв’язаних параметрів (змінні замикання) — без побудови нового
+`select()` і без повторної компіляції SQL (скомпільований рядок береться
+з кешу компіляції двигуна).
+
+Пошук за первинним ключем сюди не входить — для нього `crud`
+використовує `Session.get`, який спершу перевіряє identity map сесії.
+"""
+
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.models import models
+
+
+def user_by_email(email: str) -> StatementLambdaElement:
+    """
+    Запит користувача за email.
+
+    Args:
+        email (str): Електронна пошта користувача.
+
+    Returns:
+        StatementLambdaElement: Запит для `Session.scalar`.
+    """
+    return lambda_stmt(lambda: select(models.User).where(models.User.email == email).limit(1))
+
+
+def contacts_of(user_id: int) -> StatementLambdaElement:
+    """
+    Запит усіх (не видалених) контактів користувача.
+
+    Args:
+        user_id (int): Ідентифікатор користувача.
+
+    Returns:
+        StatementLambdaElement: Запит для `Session.scalars`.
+    """
+    return lambda_stmt(
+        lambda: select(models.Contact).where(
+            models.Contact.owner_id == user_id,
+            models.Contact.deleted_at.is_(None),
+        )
+    )
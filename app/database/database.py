@@ -10,33 +10,231 @@
 
 Передбачено використання PostgreSQL за замовчуванням, але можна вказати
 інший URL бази даних через змінну середовища `DATABASE_URL`.
+
+Доступні два шляхи виконання запитів:
+
+- асинхронний (за замовчуванням) — `AsyncSession` поверх asyncpg/aiosqlite,
+  запити не займають потоки threadpool Starlette;
+- синхронний — класична `Session` поверх psycopg2, вмикається
+  змінною середовища ``USE_ASYNC_DB=0`` (наприклад, для порівняльних
+  навантажувальних тестів обох підходів).
+
+Обидва двигуни використовують інструментований пул з’єднань
+(`app.database.pool`), розміри та тайм-аути якого задаються
+у `app.config.config` (``DB_POOL_*``).
+
+Сесії запитів API (`get_db`) — це `RoutingSession`: якщо задано
+``DATABASE_REPLICA_URLS``, читання йдуть на репліки (`app.database.replicas`),
+а запис і запити, що змінюють дані, — на основну БД.
 """
 
-from sqlalchemy import create_engine
+import asyncio
+from functools import lru_cache
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base, Session
-import os
+from app.config.config import (
+    ASYNC_DATABASE_URL as CONFIGURED_ASYNC_DATABASE_URL,
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_POOL_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_POOL_WARMUP,
+    USE_ASYNC_DB,
+)
+from app.database.pool import InstrumentedAsyncQueuePool, InstrumentedQueuePool, PoolMetrics, instrument_engine
+from app.database.replicas import PRIMARY, READ_METHODS, ReplicaSet, RoutingSession
+from app.metrics.middleware import instrument_queries
+from app.redis_cache.redis_cache import redis_client
 
 # ---------- Конфігурація бази даних ----------
 
-#: URL підключення до бази даних. Може бути перевизначено через змінну середовища.
-DATABASE_URL = os.getenv("DATABASE_URL", "postgresql+psycopg2://postgres:postgres@db:5432/postgres")
+#: Асинхронні драйвери для відповідних СУБД.
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def to_async_url(url: str) -> str:
+    """
+    Перетворює синхронний URL бази даних на URL з асинхронним драйвером.
+
+    Args:
+        url (str): URL, наприклад ``postgresql+psycopg2://...``.
+
+    Returns:
+        str: URL з драйвером asyncpg (PostgreSQL) або aiosqlite (SQLite).
+    """
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+#: URL для асинхронного двигуна. За замовчуванням виводиться з `DATABASE_URL`.
+ASYNC_DATABASE_URL = CONFIGURED_ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+
+def pool_options(url: str, async_: bool = False) -> dict:
+    """
+    Формує параметри пулу з’єднань для `create_engine`.
+
+    Для SQLite пул залишається стандартним — налаштування розмірів
+    мають сенс лише для серверних СУБД.
+
+    Args:
+        url (str): URL бази даних.
+        async_ (bool): Чи створюється асинхронний двигун.
+
+    Returns:
+        dict: Іменовані аргументи пулу.
+    """
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if async_ else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
 
 #: SQLAlchemy engine — створює з’єднання з базою даних.
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(DATABASE_URL, **pool_options(DATABASE_URL))
+
+#: Метрики пулу синхронного двигуна.
+sync_pool_metrics = instrument_engine(engine, PoolMetrics("sync"))
+instrument_queries(engine)
+
+#: Метрики пулу асинхронного двигуна (оновлюються після його створення).
+async_pool_metrics = PoolMetrics("async")
 
 #: Фабрика сесій, що створює об’єкти Session для взаємодії з базою даних.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+#: Як і в асинхронної фабрики, ``expire_on_commit=False``: об’єкти, повернені
+#: `INSERT/UPDATE ... RETURNING`, лишаються завантаженими після коміту.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+def create_replica_engine(url: str) -> Engine:
+    """
+    Створює синхронний двигун репліки з тими самими налаштуваннями пулу.
+
+    Args:
+        url (str): URL репліки.
+
+    Returns:
+        Engine: Двигун репліки.
+    """
+    replica_engine = create_engine(url, **pool_options(url))
+    instrument_queries(replica_engine)
+    return replica_engine
+
+def create_async_replica_engine(url: str) -> AsyncEngine:
+    """
+    Створює асинхронний двигун репліки (драйвер виводиться з URL).
+
+    Args:
+        url (str): Синхронний URL репліки.
+
+    Returns:
+        AsyncEngine: Двигун репліки.
+    """
+    async_url = to_async_url(url)
+    replica_engine = create_async_engine(async_url, **pool_options(async_url, async_=True))
+    instrument_queries(replica_engine.sync_engine)
+    return replica_engine
+
+#: Репліки для читання з `DATABASE_REPLICA_URLS` (порожній набір — лише основна БД).
+replica_set = ReplicaSet(DATABASE_REPLICA_URLS, create_replica_engine, create_async_replica_engine, redis=redis_client)
+
+#: Фабрика сесій запитів API: читання — на репліки, запис — на основну БД.
+RoutingSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    replica_set=replica_set,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    bind=engine,
+)
 
 #: Базовий клас для всіх ORM-моделей.
 Base = declarative_base()
 
-def get_db():
+@lru_cache(maxsize=None)
+def get_async_engine() -> AsyncEngine:
+    """
+    Повертає асинхронний двигун, створюючи його при першому виклику.
+
+    Двигун створюється ліниво, бо асинхронний драйвер імпортується
+    лише тоді, коли асинхронний шлях справді використовується.
+
+    Returns:
+        AsyncEngine: Двигун для `ASYNC_DATABASE_URL`.
+    """
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **pool_options(ASYNC_DATABASE_URL, async_=True))
+    instrument_engine(async_engine.sync_engine, async_pool_metrics)
+    instrument_queries(async_engine.sync_engine)
+    return async_engine
+
+@lru_cache(maxsize=None)
+def get_async_sessionmaker() -> async_sessionmaker:
     """
-    Отримує об’єкт сесії бази даних для запитів у FastAPI.
+    Повертає фабрику асинхронних сесій.
 
-    Ця функція є генератором-залежністю для FastAPI.  
+    ``expire_on_commit=False``: після коміту об’єкти не потребують
+    неявного перезавантаження, яке в асинхронному коді неможливе.
+
+    Returns:
+        async_sessionmaker: Фабрика об’єктів `AsyncSession`.
+    """
+    return async_sessionmaker(
+        get_async_engine(),
+        sync_session_class=RoutingSession,
+        replica_set=replica_set,
+        async_=True,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
+async def warm_up_pool(connections: int = DB_POOL_WARMUP) -> None:
+    """
+    Заздалегідь відкриває з’єднання пулу двигуна, який використовує `get_db`.
+
+    З’єднання відкриваються одночасно (інакше пул повертав би те саме)
+    і після перевірки ``SELECT 1`` лишаються в пулі, тож перші запити
+    воркера не чекають на підключення до БД.
+
+    Args:
+        connections (int): Кількість з’єднань.
+    """
+    if connections <= 0:
+        return
+    if USE_ASYNC_DB:
+        async def connect():
+            async with get_async_engine().connect() as conn:
+                await conn.exec_driver_sql("SELECT 1")
+    else:
+        def connect_sync():
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+
+        async def connect():
+            await run_in_threadpool(connect_sync)
+    await asyncio.gather(*(connect() for _ in range(connections)))
+
+def get_sync_db(request: Request):
+    """
+    Отримує синхронну сесію бази даних для запитів у FastAPI.
+
+    Ця функція є генератором-залежністю для FastAPI.
     Вона створює нову сесію бази даних перед виконанням запиту
-    і гарантує її закриття після завершення.
+    і гарантує її закриття після завершення. Запити, що змінюють
+    дані (не GET/HEAD/OPTIONS), виконуються лише на основній БД.
+
+    Args:
+        request (Request): Поточний запит.
 
     Yields:
         Session: Активна сесія бази даних SQLAlchemy.
@@ -52,8 +250,28 @@ def get_db():
             return db.query(User).all()
         ```
     """
-    db: Session = SessionLocal()
+    db: Session = RoutingSessionLocal()
+    db.info[PRIMARY] = request.method not in READ_METHODS
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db(request: Request):
+    """
+    Отримує асинхронну сесію бази даних для запитів у FastAPI.
+
+    Args:
+        request (Request): Поточний запит (див. `get_sync_db`).
+
+    Yields:
+        AsyncSession: Активна асинхронна сесія SQLAlchemy.
+    """
+    async with get_async_sessionmaker()() as db:
+        db.info[PRIMARY] = request.method not in READ_METHODS
+        yield db
+
+#: Залежність FastAPI для отримання сесії: асинхронна або синхронна
+#: залежно від `USE_ASYNC_DB`. Маршрути працюють з обома варіантами
+#: через `app.crud.async_crud`.
+get_db = get_async_db if USE_ASYNC_DB else get_sync_db
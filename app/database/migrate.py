@@ -0,0 +1,151 @@
+"""
+Модуль `migrate.py`
+
+Одноразовий крок підготовки схеми бази даних перед запуском застосунку.
+
+Створення таблиць винесено зі старту воркерів: його виконують один раз
+на розгортання (окремий сервіс docker-compose, init-контейнер тощо)::
+
+    python -m app.database.migrate
+
+Крок складається з двох частин:
+
+- ``create_all`` створює таблиці, яких ще немає (нова база даних
+  чи таблиці, додані новими можливостями);
+- кроки `UPGRADES` доводять до поточних моделей таблиці, що вже існували:
+  додають колонки та індекси. ``create_all`` існуючих таблиць не змінює,
+  тож без цих кроків оновлена версія застосунку падала б на старій базі
+  з помилкою «column does not exist».
+
+Кожен крок ідемпотентний (перевіряє наявність колонки чи використовує
+``IF NOT EXISTS``), тож повторний запуск нічого не змінює. У PostgreSQL
+увесь крок виконується в одній транзакції під advisory-блокуванням, тож
+кілька одночасних запусків (наприклад, кількох реплік init-контейнера)
+не конфліктують між собою.
+"""
+
+import logging
+from typing import Callable, List
+
+from sqlalchemy import Column, Connection, Engine, Index, Table, inspect
+from sqlalchemy.schema import CreateColumn, CreateIndex
+
+from app.database.database import Base, engine
+from app.models import models  # реєструє таблиці в Base.metadata
+
+logger = logging.getLogger(__name__)
+
+#: Ключ advisory-блокування PostgreSQL для кроку міграції.
+LOCK_KEY = 0x636F6E74  # "cont"
+
+#: Кроки оновлення існуючих таблиць у порядку застосування.
+UPGRADES: List[Callable[[Connection], None]] = []
+
+
+def upgrade(step: Callable[[Connection], None]) -> Callable[[Connection], None]:
+    """Реєструє крок оновлення схеми (декоратор); кроки виконуються в порядку оголошення."""
+    UPGRADES.append(step)
+    return step
+
+
+def add_column(conn: Connection, column: Column) -> bool:
+    """
+    Додає колонку моделі до існуючої таблиці, якщо її ще немає.
+
+    Args:
+        conn (Connection): З’єднання в транзакції міграції.
+        column (Column): Колонка моделі (тип, NOT NULL, ``server_default``
+            та зовнішній ключ беруться з неї).
+
+    Returns:
+        bool: True, якщо колонку додано.
+    """
+    table = column.table
+    if column.name in {c["name"] for c in inspect(conn).get_columns(table.name)}:
+        return False
+    preparer = conn.dialect.identifier_preparer
+    spec = str(CreateColumn(column).compile(dialect=conn.dialect))
+    for fk in column.foreign_keys:
+        spec += f" REFERENCES {preparer.format_table(fk.column.table)} ({preparer.quote(fk.column.name)})"
+        if fk.ondelete:
+            spec += f" ON DELETE {fk.ondelete}"
+    conn.exec_driver_sql(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {spec}")
+    logger.info("Added column %s.%s", table.name, column.name)
+    return True
+
+
+def add_index(conn: Connection, index: Index) -> None:
+    """
+    Створює індекс моделі, якщо його ще немає (``CREATE INDEX IF NOT EXISTS``).
+
+    Args:
+        conn (Connection): З’єднання в транзакції міграції.
+        index (Index): Індекс з ``__table_args__`` моделі.
+    """
+    conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def model_index(table: Table, name: str) -> Index:
+    """Повертає індекс моделі за назвою."""
+    return next(index for index in table.indexes if index.name == name)
+
+
+# ---------- Кроки оновлення ----------
+
+@upgrade
+def contacts_owner_indexes(conn: Connection) -> None:
+    """Складені індекси контактів власника та trgm-індекси пошуку (лише PostgreSQL)."""
+    contacts = models.Contact.__table__
+    for name in ("ix_contacts_owner_id_id", "ix_contacts_owner_id_name_id", "ix_contacts_owner_id_email_lower"):
+        add_index(conn, model_index(contacts, name))
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name in ("ix_contacts_name_trgm", "ix_contacts_email_trgm"):
+            add_index(conn, model_index(contacts, name))
+
+
+@upgrade
+def contacts_etag_columns(conn: Connection) -> None:
+    """Версія колекції контактів (ETag списку) та час зміни контакту (ETag контакту)."""
+    add_column(conn, models.User.__table__.c.contacts_version)
+    add_column(conn, models.Contact.__table__.c.updated_at)
+
+
+@upgrade
+def contacts_tombstone_columns(conn: Connection) -> None:
+    """М’яке видалення, номер зміни контакту та індекс стрічки змін ``GET /contacts/changes``."""
+    contacts = models.Contact.__table__
+    add_column(conn, contacts.c.deleted_at)
+    add_column(conn, contacts.c.change_seq)
+    add_index(conn, model_index(contacts, "ix_contacts_owner_id_change_seq_id"))
+
+
+@upgrade
+def users_avatar_hash(conn: Connection) -> None:
+    """Посилання користувача на аватар за хешем вмісту (таблицю `avatar_blobs` створює ``create_all``)."""
+    add_column(conn, models.User.__table__.c.avatar_hash)
+
+
+def migrate(bind: Engine = engine) -> None:
+    """
+    Створює відсутні таблиці й доводить існуючі до поточних моделей.
+
+    Args:
+        bind (Engine): Двигун основної бази даних.
+    """
+    with bind.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql(f"SELECT pg_advisory_xact_lock({LOCK_KEY})")
+        Base.metadata.create_all(bind=conn)
+        for step in UPGRADES:
+            step(conn)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    migrate()
+    logger.info("Database schema is up to date (%s)", engine.url.render_as_string(hide_password=True))
+
+
+if __name__ == "__main__":
+    main()
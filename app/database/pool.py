@@ -0,0 +1,172 @@
+"""
+Модуль `pool.py`
+
+Інструментований пул з’єднань SQLAlchemy.
+
+`InstrumentedQueuePool` та `InstrumentedAsyncQueuePool` — звичайні
+`QueuePool` / `AsyncAdaptedQueuePool`, які додатково вимірюють час
+отримання з’єднання (очікування вільного з’єднання в пулі або
+відкриття нового). Події пулу (`checkout`, `checkin`, `connect`,
+`invalidate`) та двигуна (`handle_error`) оновлюють `PoolMetrics`:
+
+- гістограму очікування на з’єднання та кількість тайм-аутів пулу;
+- кількість виданих з’єднань і видач понад `pool_size` (overflow);
+- кількість відкритих і інвалідованих з’єднань та розривів з’єднань.
+
+Замість ``pool_pre_ping`` (зайвий запит до БД на кожну видачу з’єднання)
+використовується стратегія «інвалідувати при помилці»: при розриві
+з’єднання SQLAlchemy інвалідує весь пул, тож наступні запити отримують
+нові з’єднання, а запит, що застав розрив, отримує 503 з `Retry-After`.
+"""
+
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.metrics.metrics import REGISTRY
+
+
+class PoolMetrics:
+    """
+    Метрики одного пулу з’єднань.
+
+    Attributes:
+        name (str): Назва пулу ("sync" або "async").
+        checkout_wait (Histogram): Час отримання з’єднання, секунд.
+        checkouts (Counter): Кількість виданих з’єднань.
+        overflow_checkouts (Counter): Видачі, коли зайнято більше ніж `pool_size` з’єднань.
+        timeouts (Counter): Запити, що не дочекалися з’єднання за `pool_timeout`.
+        connects (Counter): Відкриті фізичні з’єднання.
+        invalidations (Counter): Інвалідовані з’єднання.
+        disconnects (Counter): Помилки розриву з’єднання з БД.
+        in_use (Gauge): З’єднання, видані зараз.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkout_wait = REGISTRY.histogram(
+            "db_pool_checkout_wait_seconds", "Time to get a connection from the pool.", ("pool",)
+        ).labels(name)
+        self.checkouts = REGISTRY.counter("db_pool_checkouts_total", "Connections checked out.", ("pool",)).labels(name)
+        self.overflow_checkouts = REGISTRY.counter(
+            "db_pool_overflow_checkouts_total", "Checkouts beyond pool_size.", ("pool",)
+        ).labels(name)
+        self.timeouts = REGISTRY.counter("db_pool_timeouts_total", "Checkouts that hit pool_timeout.", ("pool",)).labels(name)
+        self.connects = REGISTRY.counter("db_pool_connects_total", "Physical connections opened.", ("pool",)).labels(name)
+        self.invalidations = REGISTRY.counter(
+            "db_pool_invalidations_total", "Connections invalidated.", ("pool",)
+        ).labels(name)
+        self.disconnects = REGISTRY.counter(
+            "db_pool_disconnects_total", "Disconnect errors from the database.", ("pool",)
+        ).labels(name)
+        self.in_use = REGISTRY.gauge("db_pool_in_use", "Connections currently checked out.", ("pool",)).labels(name)
+
+    def snapshot(self, pool: Optional[Pool] = None) -> Dict:
+        """
+        Повертає метрики пулу.
+
+        Args:
+            pool (Optional[Pool]): Поточний пул двигуна — для його розміру та стану.
+
+        Returns:
+            Dict: Налаштування та поточний стан пулу, лічильники і гістограма очікування.
+        """
+        data = {
+            "in_use": int(self.in_use.value),
+            "checkouts": int(self.checkouts.value),
+            "overflow_checkouts": int(self.overflow_checkouts.value),
+            "timeouts": int(self.timeouts.value),
+            "connects": int(self.connects.value),
+            "invalidations": int(self.invalidations.value),
+            "disconnects": int(self.disconnects.value),
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+        }
+        if isinstance(pool, QueuePool):
+            data.update(
+                pool_size=pool.size(),
+                max_overflow=pool._max_overflow,
+                idle=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+            )
+        return data
+
+
+class _InstrumentedPoolMixin:
+    """Вимірює час `_do_get` — отримання з’єднання з пулу з урахуванням очікування."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.timeouts.inc()
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.checkout_wait.observe(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """`QueuePool` з вимірюванням часу отримання з’єднання."""
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """`AsyncAdaptedQueuePool` з вимірюванням часу отримання з’єднання."""
+
+
+def instrument_engine(engine: Engine, metrics: PoolMetrics) -> PoolMetrics:
+    """
+    Підключає метрики до пулу та подій двигуна.
+
+    Args:
+        engine (Engine): Синхронний двигун (для асинхронного — `AsyncEngine.sync_engine`).
+        metrics (PoolMetrics): Метрики, які оновлюватимуться.
+
+    Returns:
+        PoolMetrics: Ті самі метрики (для зручності присвоєння).
+    """
+    pool = engine.pool
+    if isinstance(pool, _InstrumentedPoolMixin):
+        pool.metrics = metrics
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.connects.inc()
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.checkouts.inc()
+        metrics.in_use.inc()
+        current = engine.pool
+        if isinstance(current, QueuePool) and current.checkedout() > current.size():
+            metrics.overflow_checkouts.inc()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        metrics.in_use.dec()
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.invalidations.inc()
+
+    @event.listens_for(engine, "handle_error")
+    def on_error(context):
+        if context.is_disconnect:
+            metrics.disconnects.inc()
+            # Усі з’єднання, відкриті до розриву, будуть замінені при наступній видачі
+            context.invalidate_pool_on_disconnect = True
+
+    return metrics
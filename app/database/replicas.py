@@ -0,0 +1,325 @@
+"""
+Модуль `replicas.py`
+
+Маршрутизація запитів читання на репліки бази даних.
+
+- `ReplicaSet` тримає двигуни реплік із `DATABASE_REPLICA_URLS` і періодично
+  перевіряє їх: недоступна репліка або репліка з відставанням понад
+  `REPLICA_MAX_LAG` секунд не отримує запитів до наступної перевірки.
+  Справні репліки обираються по колу (round-robin).
+- `RoutingSession` обирає двигун для кожного оператора (`Session.get_bind`):
+  запис (flush, INSERT/UPDATE/DELETE, ``SELECT ... FOR UPDATE``, текстовий SQL)
+  йде на основну БД, і після нього вся сесія залишається на основній;
+  читання — на одну репліку, закріплену за сесією.
+- Read-your-writes: запит, що змінює дані (не GET/HEAD/OPTIONS), повністю
+  виконується на основній БД і закріплює за користувачем основну БД
+  на `REPLICA_PIN_SECONDS`. Закріплення зберігається в Redis (спільне для
+  всіх воркерів) та локально; якщо Redis недоступний — лише локально.
+
+Відставання PostgreSQL-репліки визначається за часом останньої відтвореної
+транзакції (``pg_last_xact_replay_timestamp``); для інших СУБД (наприклад,
+кількох локальних файлів SQLite) перевіряється лише доступність.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Connection, Engine, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+from app.config.config import REPLICA_CHECK_INTERVAL, REPLICA_MAX_LAG, REPLICA_PIN_SECONDS
+from app.metrics.metrics import EXTERNAL_CALL_SECONDS, REGISTRY, timer
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "db_primary"
+"""str: Ключ `Session.info`: True — усі оператори сесії йдуть на основну БД."""
+
+REPLICA = "db_replica"
+"""str: Ключ `Session.info` з репліки, закріпленої за сесією."""
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+"""tuple: HTTP-методи, запити яких можуть читати з реплік."""
+
+PIN_KEY = "db:primary:{}"
+"""str: Ключ Redis, поки він існує, користувач читає з основної БД."""
+
+REDIS_RETRY_SECONDS = 30
+"""int: Скільки секунд не звертатися до Redis після помилки з’єднання."""
+
+LOCAL_MAXSIZE = 100000
+"""int: Після скількох локальних закріплень прибирати прострочені."""
+
+#: Запити відставання репліки за діалектом, секунд. Репліка без нових WAL
+#: (усе отримане вже відтворено) не відстає, навіть якщо остання транзакція давня.
+LAG_QUERIES = {
+    "postgresql": (
+        "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+        "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    ),
+}
+
+REPLICA_LAG = REGISTRY.gauge("db_replica_lag_seconds", "Replication lag measured by the last health check.", ("replica",))
+REPLICA_HEALTHY = REGISTRY.gauge("db_replica_healthy", "1 if the replica receives reads, 0 otherwise.", ("replica",))
+
+
+def default_lag_probe(conn: Connection) -> float:
+    """
+    Вимірює відставання репліки.
+
+    Args:
+        conn (Connection): З’єднання з реплікою.
+
+    Returns:
+        float: Відставання, секунд (0 для СУБД без запиту в `LAG_QUERIES`).
+    """
+    query = LAG_QUERIES.get(conn.dialect.name)
+    if query is None:
+        conn.exec_driver_sql("SELECT 1")
+        return 0.0
+    return float(conn.exec_driver_sql(query).scalar() or 0.0)
+
+
+class Replica:
+    """
+    Репліка бази даних та результат її останньої перевірки.
+
+    Attributes:
+        name (str): URL без пароля (мітка метрик).
+        engine (Engine): Синхронний двигун.
+        healthy (bool): Чи отримує репліка запити (False до першої перевірки).
+        lag (Optional[float]): Останнє виміряне відставання, секунд.
+    """
+
+    def __init__(self, url: str, engine_factory: Callable[[str], Engine], async_engine_factory: Optional[Callable] = None):
+        self.url = url
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.engine = engine_factory(url)
+        self._async_engine_factory = async_engine_factory
+        self._async_engine = None
+        self.healthy = False
+        self.lag: Optional[float] = None
+
+    @property
+    def async_engine(self):
+        """AsyncEngine репліки (створюється при першому зверненні)."""
+        if self._async_engine is None:
+            self._async_engine = self._async_engine_factory(self.url)
+        return self._async_engine
+
+    def bind(self, async_: bool = False) -> Engine:
+        """Повертає синхронний двигун для `Session.get_bind` (для `AsyncSession` — двигун під асинхронним)."""
+        return self.async_engine.sync_engine if async_ else self.engine
+
+
+class ReplicaSet:
+    """
+    Набір реплік для читання з перевіркою стану та закріпленням користувачів.
+
+    Attributes:
+        replicas (List[Replica]): Репліки у порядку конфігурації.
+        redis: Асинхронний клієнт Redis або None — лише локальні закріплення.
+        max_lag (float): Максимальне допустиме відставання, секунд.
+        check_interval (float): Пауза між перевірками, секунд.
+        pin_seconds (float): Тривалість закріплення користувача за основною БД.
+        lag_probe (Callable[[Connection], float]): Функція вимірювання відставання.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        engine_factory: Callable[[str], Engine] = create_engine,
+        async_engine_factory: Optional[Callable] = None,
+        redis=None,
+        max_lag: float = REPLICA_MAX_LAG,
+        check_interval: float = REPLICA_CHECK_INTERVAL,
+        pin_seconds: float = REPLICA_PIN_SECONDS,
+        lag_probe: Callable[[Connection], float] = default_lag_probe,
+    ):
+        self.replicas = [Replica(url, engine_factory, async_engine_factory) for url in urls]
+        self.redis = redis
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.pin_seconds = pin_seconds
+        self.lag_probe = lag_probe
+        self._next = itertools.count()
+        self._pins: Dict[int, float] = {}
+        self._redis_down_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    # ---------- Вибір репліки ----------
+
+    def choose(self) -> Optional[Replica]:
+        """
+        Обирає наступну справну репліку по колу.
+
+        Returns:
+            Optional[Replica]: Репліка або None, якщо справних немає.
+        """
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    def check(self) -> None:
+        """Перевіряє доступність і відставання кожної репліки (блокуючий виклик)."""
+        for replica in self.replicas:
+            try:
+                with timer(EXTERNAL_CALL_SECONDS.labels("db_replica", "health_check")):
+                    with replica.engine.connect() as conn:
+                        replica.lag = self.lag_probe(conn)
+                replica.healthy = replica.lag <= self.max_lag
+                if not replica.healthy:
+                    logger.warning("Replica %s lags %.1f s, routing reads to the primary", replica.name, replica.lag)
+            except Exception:
+                replica.healthy, replica.lag = False, None
+                logger.warning("Replica %s health check failed", replica.name, exc_info=True)
+            REPLICA_LAG.labels(replica.name).set(replica.lag if replica.lag is not None else 0.0)
+            REPLICA_HEALTHY.labels(replica.name).set(1.0 if replica.healthy else 0.0)
+
+    def snapshot(self) -> List[Dict]:
+        """
+        Повертає стан реплік.
+
+        Returns:
+            List[Dict]: ``name``, ``healthy`` та ``lag`` кожної репліки.
+        """
+        return [{"name": r.name, "healthy": r.healthy, "lag": r.lag} for r in self.replicas]
+
+    # ---------- Read-your-writes ----------
+
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_down_until
+
+    async def pin(self, user_id: int) -> None:
+        """
+        Закріплює читання користувача за основною БД на `pin_seconds`.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+        """
+        now = time.monotonic()
+        if len(self._pins) >= LOCAL_MAXSIZE:
+            self._pins = {k: v for k, v in self._pins.items() if v > now}
+        self._pins[user_id] = now + self.pin_seconds
+        if self._redis_available():
+            try:
+                with timer(EXTERNAL_CALL_SECONDS.labels("redis", "replica_pin")):
+                    await self.redis.set(PIN_KEY.format(user_id), 1, px=int(self.pin_seconds * 1000))
+            except Exception:
+                self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+    async def is_pinned(self, user_id: int) -> bool:
+        """
+        Перевіряє, чи читає користувач з основної БД.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+
+        Returns:
+            bool: True, якщо користувач змінював дані останні `pin_seconds` (на будь-якому воркері).
+        """
+        if self._pins.get(user_id, 0.0) > time.monotonic():
+            return True
+        if not self._redis_available():
+            return False
+        try:
+            with timer(EXTERNAL_CALL_SECONDS.labels("redis", "replica_pin")):
+                return bool(await self.redis.exists(PIN_KEY.format(user_id)))
+        except Exception:
+            self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+            return False
+
+    async def bind_user(self, db, user_id: int) -> None:
+        """
+        Маршрутизує сесію запиту з урахуванням закріплення користувача.
+
+        Запит, що змінює дані (сесія вже на основній БД), закріплює
+        користувача; запит читання переходить на основну БД, якщо
+        користувач закріплений.
+
+        Args:
+            db (Session | AsyncSession): Сесія запиту.
+            user_id (int): Ідентифікатор автентифікованого користувача.
+        """
+        if not self.replicas:
+            return
+        if db.info.get(PRIMARY):
+            await self.pin(user_id)
+        elif await self.is_pinned(user_id):
+            db.info[PRIMARY] = True
+
+    # ---------- Фонова перевірка ----------
+
+    async def run(self) -> None:
+        """Перевіряє репліки кожні `check_interval` секунд, доки не викликано `stop`."""
+        while not self._stopping.is_set():
+            await run_in_threadpool(self.check)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.check_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Запускає перевірку реплік як задачу asyncio у поточному циклі подій."""
+        if self.replicas and self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Зупиняє перевірку та закриває з’єднання реплік."""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        for replica in self.replicas:
+            replica.engine.dispose()
+            if replica._async_engine is not None:
+                await replica._async_engine.dispose()
+
+
+class RoutingSession(Session):
+    """
+    Сесія, що надсилає читання на репліку, а запис — на основну БД.
+
+    Основна БД — це `bind` сесії. Для `AsyncSession` клас передається як
+    ``sync_session_class`` разом з ``async_=True``.
+
+    Attributes:
+        replica_set (Optional[ReplicaSet]): Репліки; None або порожній набір — лише основна БД.
+        async_ (bool): Чи працює сесія під `AsyncSession`.
+    """
+
+    def __init__(self, *args, replica_set: Optional[ReplicaSet] = None, async_: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica_set = replica_set
+        self.async_ = async_
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        primary = super().get_bind(mapper, clause=clause, **kw)
+        if self.replica_set is None or not self.replica_set.replicas or self.info.get(PRIMARY):
+            return primary
+        if (
+            self._flushing
+            or clause is None
+            or isinstance(clause, TextClause)
+            or getattr(clause, "is_dml", False)
+            or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            # Після запису решта сесії читає з основної БД (свої ж зміни)
+            self.info[PRIMARY] = True
+            return primary
+        replica = self.info.get(REPLICA)
+        if replica is None:
+            replica = self.replica_set.choose()
+            if replica is None:
+                return primary
+            self.info[REPLICA] = replica
+        return replica.bind(self.async_)
@@ -1,38 +1,50 @@
 """
 Модуль `mailer.py`
 
-Відповідає за надсилання службових електронних листів:
+Відповідає за службові електронні листи:
 - підтвердження електронної пошти користувача після реєстрації;
 - посилання для скидання пароля.
 
-Використовується SMTP-сервер (наприклад, MailHog у середовищі розробки).
+Листи не надсилаються безпосередньо в запиті: функції цього модуля лише
+додають їх у таблицю `email_outbox`, а відправленням через SMTP-сервер
+(наприклад, MailHog у середовищі розробки) займається фоновий воркер
+`app.mailer.outbox.MailOutboxWorker`.
 """
 
-import os
-from email.message import EmailMessage
-import smtplib
 from urllib.parse import quote
+from sqlalchemy.orm import Session
+from app.config.config import APP_HOST
+from app.models import models
 
-# ---------- Конфігурація SMTP ----------
-SMTP_HOST = os.getenv("SMTP_HOST", "mailhog")
-"""str: Хост SMTP-сервера (за замовчуванням — mailhog)."""
+# ---------- Постановка листів у чергу ----------
 
-SMTP_PORT = int(os.getenv("SMTP_PORT", 1025))
-"""int: Порт SMTP-сервера (MailHog працює на 1025)."""
+def queue_email(db: Session, to_email: str, subject: str, body: str) -> models.EmailOutbox:
+    """
+    Додає лист у чергу на відправлення.
 
-FROM_EMAIL = os.getenv("FROM_EMAIL", "no-reply@example.com")
-"""str: Адреса відправника для службових листів."""
+    Запис не фіксується тут: викликач додає лист у транзакцію зміни, через
+    яку лист надсилається (створення користувача, запит на скидання
+    пароля), і фіксує їх одним ``commit`` — або обидва, або жодного.
 
-APP_HOST = os.getenv("APP_HOST", "http://localhost:8000")
-"""str: Базова URL-адреса бекенду для побудови посилань (verify/reset)."""
+    Args:
+        db (Session): Сесія бази даних.
+        to_email (str): Адреса одержувача.
+        subject (str): Тема листа.
+        body (str): Текст листа.
 
-# ---------- Функції для відправлення листів ----------
+    Returns:
+        EmailOutbox: Створений запис черги.
+    """
+    message = models.EmailOutbox(to_email=to_email, subject=subject, body=body)
+    db.add(message)
+    return message
 
-def send_verification_email(to_email: str, token: str):
+def queue_verification_email(db: Session, to_email: str, token: str) -> models.EmailOutbox:
     """
-    Надсилає лист із посиланням для підтвердження електронної пошти.
+    Ставить у чергу лист із посиланням для підтвердження електронної пошти.
 
     Args:
+        db (Session): Сесія бази даних.
         to_email (str): Адреса одержувача.
         token (str): Токен підтвердження (JWT), який додається в URL.
 
@@ -42,19 +54,14 @@ def send_verification_email(to_email: str, token: str):
     Після переходу користувач підтверджує свою електронну адресу.
     """
     verify_link = f"{APP_HOST}/auth/verify?token={quote(token)}"
-    msg = EmailMessage()
-    msg["Subject"] = "Verify your email"
-    msg["From"] = FROM_EMAIL
-    msg["To"] = to_email
-    msg.set_content(f"Click to verify: {verify_link}")
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as s:
-        s.send_message(msg)
-
-def send_reset_email(to_email: str, token: str):
+    return queue_email(db, to_email, "Verify your email", f"Click to verify: {verify_link}")
+
+def queue_reset_email(db: Session, to_email: str, token: str) -> models.EmailOutbox:
     """
-    Надсилає лист із посиланням для скидання пароля користувача.
+    Ставить у чергу лист із посиланням для скидання пароля користувача.
 
     Args:
+        db (Session): Сесія бази даних.
         to_email (str): Електронна адреса користувача.
         token (str): JWT-токен для підтвердження операції скидання пароля.
 
@@ -64,11 +71,4 @@ def send_reset_email(to_email: str, token: str):
     Після переходу користувач може задати новий пароль.
     """
     reset_link = f"{APP_HOST}/auth/reset-password?token={token}"
-    msg = EmailMessage()
-    msg["Subject"] = "Reset your password"
-    msg["From"] = FROM_EMAIL
-    msg["To"] = to_email
-    msg.set_content(f"Click to reset your password: {reset_link}")
-    
-    with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as s:
-        s.send_message(msg)
\ No newline at end of file
+    return queue_email(db, to_email, "Reset your password", f"Click to reset your password: {reset_link}")
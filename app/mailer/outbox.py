@@ -0,0 +1,280 @@
+"""
+Модуль `outbox.py`
+
+Фоновий воркер, що відправляє листи з таблиці `email_outbox`.
+
+Воркер працює як задача asyncio всередині процесу застосунку:
+
+- забирає пакет листів, готових до відправлення (``FOR UPDATE SKIP LOCKED``
+  у PostgreSQL), у короткій транзакції: рахує спробу і відкладає листи
+  на `MAIL_LEASE_SECONDS`, тож інші воркери їх не беруть, а після падіння
+  воркера листи повертаються в чергу;
+- надсилає їх поза транзакцією через одне постійне SMTP-з’єднання, яке
+  перевідкривається лише після розриву чи збою обміну — повільний SMTP-сервер не тримає
+  з’єднання з БД і блокування рядків;
+- записує результати другою короткою транзакцією: при помилці відкладає
+  лист з експоненційною затримкою, а після `MAIL_MAX_ATTEMPTS` спроб
+  позначає його як "failed".
+
+SMTP-клієнт створюється фабрикою `smtp_factory`, тому в тестах воркер
+можна спрямувати на локальний aiosmtpd-сервер. ``smtplib`` та ``email``
+імпортуються лише під час першого пакета листів — не при старті застосунку.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.config.config import (
+    FROM_EMAIL,
+    MAIL_BATCH_SIZE,
+    MAIL_LEASE_SECONDS,
+    MAIL_MAX_ATTEMPTS,
+    MAIL_POLL_INTERVAL,
+    MAIL_RETRY_BASE_SECONDS,
+    SMTP_HOST,
+    SMTP_PASSWORD,
+    SMTP_PORT,
+    SMTP_USER,
+)
+from app.database.database import SessionLocal
+from app.metrics.metrics import EXTERNAL_CALL_SECONDS, timer
+from app.models import models
+
+if TYPE_CHECKING:
+    import smtplib
+    from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+#: Максимальна затримка між повторними спробами, секунд.
+MAX_RETRY_DELAY = 3600
+
+
+def default_smtp_factory() -> "smtplib.SMTP":
+    """
+    Відкриває SMTP-з’єднання з налаштувань `SMTP_*`.
+
+    Returns:
+        smtplib.SMTP: Підключений (і, за потреби, автентифікований) клієнт.
+    """
+    import smtplib
+
+    smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10)
+    if SMTP_USER:
+        smtp.login(SMTP_USER, SMTP_PASSWORD)
+    return smtp
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Обчислює затримку перед наступною спробою.
+
+    Args:
+        attempts (int): Кількість уже виконаних спроб.
+
+    Returns:
+        timedelta: ``MAIL_RETRY_BASE_SECONDS * 2**(attempts - 1)``, не більше години.
+    """
+    return timedelta(seconds=min(MAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), MAX_RETRY_DELAY))
+
+
+class MailOutboxWorker:
+    """
+    Воркер черги вихідних листів.
+
+    Attributes:
+        session_factory (Callable[[], Session]): Фабрика синхронних сесій БД.
+        smtp_factory (Callable[[], smtplib.SMTP]): Фабрика SMTP-з’єднань.
+        batch_size (int): Скільки листів забирати за один прохід.
+        poll_interval (float): Пауза між проходами, коли черга порожня.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        smtp_factory: Callable[[], "smtplib.SMTP"] = default_smtp_factory,
+        batch_size: int = MAIL_BATCH_SIZE,
+        poll_interval: float = MAIL_POLL_INTERVAL,
+    ):
+        self.session_factory = session_factory
+        self.smtp_factory = smtp_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._smtp: Optional["smtplib.SMTP"] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    # ---------- SMTP ----------
+
+    def _send(self, message: "EmailMessage") -> None:
+        """
+        Надсилає лист, один раз перевідкриваючи з’єднання після розриву.
+
+        Після відмови сервера прийняти відправника чи отримувачів
+        (``smtplib`` уже скинув обмін командою RSET) з’єднання
+        використовується далі. Після будь-якої іншої помилки (таймаут,
+        ``OSError``, обірвана посередині відповідь) стан обміну невідомий:
+        з’єднання закривається, щоб наступний лист не отримав залишок
+        відповіді на попередній.
+        """
+        import smtplib
+
+        for attempt in (1, 2):
+            if self._smtp is None:
+                with timer(EXTERNAL_CALL_SECONDS.labels("smtp", "connect")):
+                    self._smtp = self.smtp_factory()
+            try:
+                with timer(EXTERNAL_CALL_SECONDS.labels("smtp", "send")):
+                    self._smtp.send_message(message)
+                return
+            except smtplib.SMTPServerDisconnected:
+                self._drop_connection()
+                if attempt == 2:
+                    raise
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused):
+                raise
+            except (smtplib.SMTPException, OSError):
+                self._drop_connection()
+                raise
+
+    def _drop_connection(self) -> None:
+        """Закриває з’єднання без QUIT (воно може бути непридатним) і забуває його."""
+        smtp, self._smtp = self._smtp, None
+        try:
+            smtp.close()
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Закриває постійне SMTP-з’єднання."""
+        import smtplib
+
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except smtplib.SMTPException:
+                pass
+            self._smtp = None
+
+    # ---------- Черга ----------
+
+    def claim_batch(self) -> List[models.EmailOutbox]:
+        """
+        Забирає пакет листів, готових до відправлення, і фіксує це одразу.
+
+        Кожному листу зараховується спроба, а наступна спроба відкладається
+        на `MAIL_LEASE_SECONDS`: поки воркер надсилає пакет, інші воркери
+        ці листи не беруть, а якщо він впаде, листи повернуться в чергу.
+
+        Returns:
+            List[EmailOutbox]: Забрані листи (від’єднані від сесії).
+        """
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            batch = list(db.scalars(
+                select(models.EmailOutbox)
+                .where(models.EmailOutbox.status == "pending", models.EmailOutbox.next_attempt_at <= now)
+                .order_by(models.EmailOutbox.next_attempt_at, models.EmailOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ))
+            for item in batch:
+                item.attempts += 1
+                item.next_attempt_at = now + timedelta(seconds=MAIL_LEASE_SECONDS)
+            db.commit()
+            return batch
+        finally:
+            db.close()
+
+    def record_results(self, batch: List[models.EmailOutbox], errors: Dict[int, str]) -> None:
+        """
+        Записує результати відправлення пакета однією короткою транзакцією.
+
+        Args:
+            batch (List[EmailOutbox]): Листи з `claim_batch`.
+            errors (Dict[int, str]): Ідентифікатор листа -> текст помилки для невдалих.
+        """
+        db = self.session_factory()
+        try:
+            now = datetime.utcnow()
+            for item in batch:
+                error = errors.get(item.id)
+                if error is None:
+                    values = {"status": "sent", "sent_at": now}
+                elif item.attempts >= MAIL_MAX_ATTEMPTS:
+                    values = {"status": "failed", "last_error": error}
+                    logger.error("Giving up on email %s to %s: %s", item.id, item.to_email, error)
+                else:
+                    values = {"last_error": error, "next_attempt_at": now + retry_delay(item.attempts)}
+                db.execute(update(models.EmailOutbox).where(models.EmailOutbox.id == item.id).values(**values))
+            db.commit()
+        finally:
+            db.close()
+
+    def process_batch(self) -> int:
+        """
+        Надсилає один пакет листів, готових до відправлення.
+
+        Листи забираються й результати записуються окремими короткими
+        транзакціями; під час роботи з SMTP транзакцію не відкрито.
+
+        Returns:
+            int: Кількість оброблених листів (надісланих і відкладених).
+        """
+        import smtplib
+        from email.message import EmailMessage
+
+        batch = self.claim_batch()
+        errors = {}
+        for item in batch:
+            message = EmailMessage()
+            message["Subject"] = item.subject
+            message["From"] = FROM_EMAIL
+            message["To"] = item.to_email
+            message.set_content(item.body)
+            try:
+                self._send(message)
+            except (smtplib.SMTPException, OSError) as exc:
+                errors[item.id] = str(exc)[:255]
+        if batch:
+            self.record_results(batch, errors)
+        return len(batch)
+
+    async def run(self) -> None:
+        """Основний цикл воркера; працює, доки не викликано `stop`."""
+        while not self._stopping.is_set():
+            try:
+                processed = await run_in_threadpool(self.process_batch)
+            except Exception:
+                logger.exception("Email outbox batch failed")
+                processed = 0
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        await run_in_threadpool(self.close)
+
+    def start(self) -> None:
+        """Запускає воркер як задачу asyncio у поточному циклі подій."""
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Зупиняє воркер після завершення поточного пакета."""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+
+#: Воркер черги листів застосунку.
+mail_worker = MailOutboxWorker()
@@ -5,36 +5,122 @@
 - маршрути (auth, contacts),
 - CORS-доступ,
 - обмеження швидкості запитів (rate limiting),
-- ініціалізація бази даних (SQLAlchemy),
-- обробка помилок перевищення ліміту запитів.
+- життєвий цикл воркера (`lifespan`): прогрівання з’єднань, фонові задачі
+  та їх зупинка після завершення поточних запитів,
+- обробка помилок перевищення ліміту запитів і розриву з’єднання з БД,
+- службові маршрути (/admin),
+- метрики Prometheus (`MetricsMiddleware` та `/metrics`),
+- профілювання запитів на вимогу (`ProfilerMiddleware`).
 
-Модуль є точкою входу для всього REST API застосунку.
+Модуль є точкою входу для всього REST API застосунку. Схема бази даних
+створюється окремим кроком (`app.database.migrate`), а виробничий сервер
+запускається через `app.server`.
 """
 
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
-from starlette.responses import JSONResponse
-from app.rate_limit.rate_limit import limiter
-from app.database.database import Base, engine
-from app.routes import auth, contacts
+from fastapi.staticfiles import StaticFiles
+from sqlalchemy.exc import DBAPIError
+from starlette.responses import JSONResponse, PlainTextResponse
+from app.avatars.pipeline import avatar_pipeline
+from app.rate_limit.rate_limit import RateLimitExceeded
+from app.config.config import (
+    AVATAR_LOCAL_DIR,
+    AVATAR_LOCAL_URL,
+    AVATAR_STORAGE,
+    MAIL_WORKER_ENABLED,
+    METRICS_FLUSH_INTERVAL,
+    METRICS_MULTIPROC_DIR,
+)
+from app.database.database import engine, get_async_engine, replica_set, warm_up_pool
+from app.mailer.outbox import mail_worker
+from app.metrics import multiprocess
+from app.metrics.metrics import REGISTRY, render_text
+from app.metrics.middleware import MetricsMiddleware
+from app.metrics.profiler import ProfilerMiddleware
+from app.redis_cache.redis_cache import redis_client
+from app.redis_cache.revocation import revocations
+from app.routes import admin, auth, contacts
+from app.utils.tokens import get_signing_keys
+from app.utils.password_pool import PasswordPoolSaturated, password_pool
 
-# ✅ Створюємо всі таблиці бази даних, якщо вони ще не існують
-def init_db():
-    Base.metadata.create_all(bind=engine)
+logger = logging.getLogger(__name__)
+
+async def warm_up() -> None:
+    """
+    Відкриває з’єднання з БД та Redis до першого запиту воркера.
+
+    Недоступність БД чи Redis не зупиняє запуск: запити обробляють
+    такі помилки самі (503 для БД, локальний резерв для Redis).
+    """
+    try:
+        await warm_up_pool()
+    except Exception as exc:
+        logger.warning("Database pool warm-up failed: %s", exc)
+    try:
+        await redis_client.ping()
+    except Exception as exc:
+        logger.warning("Redis warm-up failed: %s", exc)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Життєвий цикл воркера застосунку.
+
+    Під час запуску готує ключі JWT, прогріває з’єднання (`warm_up`)
+    і запускає фонові задачі. Завершення починається, коли сервер уже
+    перестав приймати з’єднання і дочекався поточних запитів (SIGTERM,
+    див. `app.server`): зупиняються фонові задачі, пули та з’єднання.
+
+    Args:
+        app (FastAPI): Застосунок.
+    """
+    # Готуємо ключі JWT один раз; помилка конфігурації ключів зупиняє запуск
+    get_signing_keys()
+    await warm_up()
+    # Локальне дзеркало відкликаних токенів синхронізується з Redis
+    revocations.start()
+    # Перевірка стану реплік для читання (до першої перевірки читання йдуть на основну БД)
+    replica_set.start()
+    # Запускаємо фоновий воркер черги листів
+    if MAIL_WORKER_ENABLED:
+        mail_worker.start()
+    # Кожен воркер періодично публікує свої метрики для спільного /metrics
+    if METRICS_MULTIPROC_DIR:
+        app.state.metrics_flusher = asyncio.create_task(
+            multiprocess.flush_periodically(METRICS_MULTIPROC_DIR, METRICS_FLUSH_INTERVAL)
+        )
+    yield
+    # Дочікуємося поточного пакета листів і зупиняємо пули паролів та зображень
+    await mail_worker.stop()
+    await revocations.stop()
+    await replica_set.stop()
+    password_pool.shutdown()
+    avatar_pipeline.shutdown()
+    # Закриваємо з’єднання пулів (асинхронного — якщо двигун уже створювався)
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
+    engine.dispose()
+    if METRICS_MULTIPROC_DIR:
+        app.state.metrics_flusher.cancel()
+        multiprocess.write_snapshot(METRICS_MULTIPROC_DIR)
 
 # ✅ Ініціалізація FastAPI
-app = FastAPI(title="Contacts API with Auth & Verification")
+app = FastAPI(title="Contacts API with Auth & Verification", lifespan=lifespan)
 
 # ✅ Налаштування CORS
 origins = ["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:8080"]
 app.add_middleware(CORSMiddleware, allow_origins=origins, allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
-# ✅ Налаштування rate limiting (SlowAPI)
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
+# ✅ Профілювання запитів на вимогу та метрики запитів (зовнішній шар — вимірює весь стек)
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(MetricsMiddleware)
 
+# ✅ Rate limiting підключається до маршрутів залежністю `limiter.limit(...)`
 @app.exception_handler(RateLimitExceeded)
 async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     """
@@ -45,16 +131,76 @@ async def rate_limit_handler(request: Request, exc: RateLimitExceeded):
         exc (RateLimitExceeded): Об'єкт винятку з деталями перевищення ліміту.
 
     Returns:
-        JSONResponse: Відповідь із кодом 429 ("Too Many Requests").
+        JSONResponse: Відповідь із кодом 429 ("Too Many Requests") та заголовками
+        `Retry-After` і `X-RateLimit-*`.
+    """
+    return JSONResponse(status_code=429, content={"detail": "Too Many Requests"}, headers=exc.result.headers())
+
+@app.exception_handler(PasswordPoolSaturated)
+async def password_pool_handler(request: Request, exc: PasswordPoolSaturated):
     """
-    return JSONResponse(status_code=429, content={"detail": "Too Many Requests"})
+    Обробник перевантаження пулу хешування паролів.
+
+    Args:
+        request (Request): Поточний HTTP-запит.
+        exc (PasswordPoolSaturated): Виняток із назвою відхиленої операції.
+
+    Returns:
+        JSONResponse: Відповідь із кодом 503 та заголовком `Retry-After`.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service busy, try again later"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(DBAPIError)
+async def database_error_handler(request: Request, exc: DBAPIError):
+    """
+    Обробник помилок бази даних.
+
+    Розрив з’єднання (пул уже інвалідовано в `app.database.pool`)
+    повертається як тимчасова недоступність — повторний запит отримає
+    нове з’єднання. Решта помилок обробляються як звичайні 500.
+
+    Args:
+        request (Request): Поточний HTTP-запит.
+        exc (DBAPIError): Помилка драйвера бази даних.
+
+    Returns:
+        JSONResponse: Відповідь із кодом 503 та заголовком `Retry-After`.
+    """
+    if not exc.connection_invalidated:
+        raise exc
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database connection lost, try again"},
+        headers={"Retry-After": "1"},
+    )
 
 # ✅ Підключення основних маршрутів застосунку
 app.include_router(auth.router)
 app.include_router(contacts.router)
+app.include_router(admin.router)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Віддає метрики у текстовому форматі Prometheus.
+
+    Якщо задано `METRICS_MULTIPROC_DIR`, об’єднуються знімки всіх воркерів.
+
+    Returns:
+        PlainTextResponse: Метрики процесу (або всіх воркерів).
+    """
+    if METRICS_MULTIPROC_DIR:
+        multiprocess.write_snapshot(METRICS_MULTIPROC_DIR)
+        snapshot = multiprocess.merge_snapshots(METRICS_MULTIPROC_DIR)
+    else:
+        snapshot = REGISTRY.collect()
+    return PlainTextResponse(render_text(snapshot), media_type="text/plain; version=0.0.4")
 
-@app.on_event("startup")
-def on_startup():
-    # Створюємо таблиці при запуску контейнера
-    init_db()
-   
+# ✅ Локальне сховище аватарів віддається самим застосунком
+if AVATAR_STORAGE == "local":
+    os.makedirs(AVATAR_LOCAL_DIR, exist_ok=True)
+    app.mount(AVATAR_LOCAL_URL, StaticFiles(directory=AVATAR_LOCAL_DIR), name="media")
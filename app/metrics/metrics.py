@@ -0,0 +1,291 @@
+"""
+Модуль `metrics.py`
+
+Метрики процесу у моделі Prometheus: лічильник, датчик та гістограма
+з фіксованими межами кошиків, згруповані в сімейства з мітками.
+
+Метрики попередньо агреговані й дешеві на гарячому шляху: кожен потік
+оновлює власний «шард» значень без блокувань, а шарди сумуються лише
+під час збирання (`Registry.collect`) — тобто при запиті `/metrics`.
+
+Назви мають вигляд ``http_request_duration_seconds``; значення з кількох
+воркерів uvicorn об’єднує `app.metrics.multiprocess`.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+#: Межі кошиків за замовчуванням для тривалостей, секунд.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Sharded:
+    """Значення, розкладене на шарди окремих потоків; кожен потік пише лише у свій."""
+
+    def __init__(self, size: int):
+        self._size = size
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> List[float]:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = [0.0] * self._size
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _totals(self) -> List[float]:
+        totals = [0.0] * self._size
+        for shard in list(self._shards):
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class Counter(_Sharded):
+    """Монотонний лічильник."""
+
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Збільшує лічильник на `amount`."""
+        self._shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        """Поточне значення."""
+        return self._totals()[0]
+
+
+class Gauge(_Sharded):
+    """Датчик — значення, яке може зростати та спадати."""
+
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Збільшує значення на `amount`."""
+        self._shard()[0] += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Зменшує значення на `amount`."""
+        self._shard()[0] -= amount
+
+    def set(self, value: float) -> None:
+        """Встановлює значення (для датчиків, які оновлює один потік)."""
+        self._shard()[0] += value - self.value
+
+    @property
+    def value(self) -> float:
+        """Поточне значення."""
+        return self._totals()[0]
+
+
+class Histogram(_Sharded):
+    """
+    Гістограма спостережень з кумулятивними кошиками.
+
+    Attributes:
+        buckets (Sequence[float]): Верхні межі кошиків (зростаючі).
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # Кошики, «+Inf», сума
+        super().__init__(len(self.buckets) + 2)
+        self._max = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Додає спостереження.
+
+        Args:
+            value (float): Значення (наприклад, тривалість у секундах).
+        """
+        shard = self._shard()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+        if value > self._max:
+            self._max = value
+
+    def snapshot(self) -> Dict:
+        """
+        Повертає поточний стан гістограми.
+
+        Returns:
+            Dict: ``count``, ``sum``, ``max`` та кумулятивні ``buckets``
+            (межа -> кількість спостережень, не більших за неї; ``"+Inf"`` — усі).
+        """
+        totals = self._totals()
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets, totals):
+            running += int(count)
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = running + int(totals[-2])
+        return {"count": cumulative["+Inf"], "sum": totals[-1], "max": self._max, "buckets": cumulative}
+
+
+class MetricFamily:
+    """
+    Сімейство метрик одного типу з однаковим набором міток.
+
+    Attributes:
+        name (str): Назва метрики.
+        help (str): Опис для ``# HELP``.
+        kind (str): "counter", "gauge" або "histogram".
+        labelnames (Tuple[str, ...]): Назви міток.
+    """
+
+    def __init__(self, name: str, help: str, kind: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **labels):
+        """
+        Повертає метрику для конкретних значень міток (створює за потреби).
+
+        Args:
+            *values: Значення міток у порядку `labelnames`.
+            **labels: Або ті самі значення за назвами.
+
+        Returns:
+            Counter | Gauge | Histogram: Метрика для цих міток.
+        """
+        key = tuple(str(v) for v in values) if values else tuple(str(labels[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    if self.kind == "histogram":
+                        child = Histogram(self.buckets)
+                    else:
+                        child = Counter() if self.kind == "counter" else Gauge()
+                    self._children[key] = child
+        return child
+
+    def collect(self) -> List[Tuple[Dict[str, str], object]]:
+        """
+        Збирає значення всіх метрик сімейства.
+
+        Returns:
+            List[Tuple[Dict[str, str], object]]: Пари (мітки, значення або знімок гістограми).
+        """
+        samples = []
+        for key, child in list(self._children.items()):
+            value = child.snapshot() if self.kind == "histogram" else child.value
+            samples.append((dict(zip(self.labelnames, key)), value))
+        return samples
+
+
+class Registry:
+    """Реєстр сімейств метрик процесу."""
+
+    def __init__(self):
+        self._families: Dict[str, MetricFamily] = {}
+        self._lock = threading.Lock()
+
+    def _family(self, name: str, help: str, kind: str, labelnames: Sequence[str], **kwargs) -> MetricFamily:
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = MetricFamily(name, help, kind, labelnames, **kwargs)
+            return family
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """Реєструє (або повертає наявне) сімейство лічильників."""
+        return self._family(name, help, "counter", labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """Реєструє (або повертає наявне) сімейство датчиків."""
+        return self._family(name, help, "gauge", labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> MetricFamily:
+        """Реєструє (або повертає наявне) сімейство гістограм."""
+        return self._family(name, help, "histogram", labelnames, buckets=buckets)
+
+    def collect(self) -> Dict[str, Dict]:
+        """
+        Збирає всі метрики у JSON-сумісний знімок.
+
+        Returns:
+            Dict[str, Dict]: Назва -> ``{"kind", "help", "samples"}``.
+        """
+        return {
+            name: {"kind": f.kind, "help": f.help, "samples": [[labels, value] for labels, value in f.collect()]}
+            for name, f in list(self._families.items())
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def render_text(snapshot: Dict[str, Dict]) -> str:
+    """
+    Форматує знімок метрик у текстовий формат Prometheus (0.0.4).
+
+    Args:
+        snapshot (Dict[str, Dict]): Результат `Registry.collect` (або об’єднаний знімок воркерів).
+
+    Returns:
+        str: Текст для відповіді `/metrics`.
+    """
+    lines = []
+    for name, family in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['kind']}")
+        for labels, value in family["samples"]:
+            if family["kind"] != "histogram":
+                lines.append(f"{name}{_labels(labels)} {value}")
+                continue
+            for bound, count in value["buckets"].items():
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"{name}_sum{_labels(labels)} {value['sum']}")
+            lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def timer(histogram: Histogram) -> Iterator[None]:
+    """
+    Вимірює тривалість блоку `with` у гістограму (також навколо `await`).
+
+    Args:
+        histogram (Histogram): Гістограма для спостереження.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+
+#: Реєстр метрик застосунку.
+REGISTRY = Registry()
+
+#: Тривалість викликів зовнішніх сервісів (Redis, SMTP, Cloudinary).
+EXTERNAL_CALL_SECONDS = REGISTRY.histogram(
+    "external_call_duration_seconds",
+    "Duration of calls to external services.",
+    ("service", "operation"),
+)
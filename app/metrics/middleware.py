@@ -0,0 +1,130 @@
+"""
+Модуль `middleware.py`
+
+Збір метрик HTTP-запитів і SQL-запитів.
+
+- `MetricsMiddleware` — «чистий» ASGI-middleware (без `BaseHTTPMiddleware`
+  і копіювання тіла відповіді): рахує запити та їхню тривалість за
+  шаблоном маршруту (``/contacts/{contact_id}``), методом і статусом;
+- `instrument_queries` — події ``before/after_cursor_execute`` двигуна,
+  що рахують тривалість SQL-запитів загалом і в межах поточного HTTP-запиту,
+  а для профільованих запитів ще й записують їхній текст у `statement_log`.
+
+Лічильник запитів до БД поточного HTTP-запиту зберігається в `ContextVar`,
+тому він доходить і до threadpool (синхронна сесія), і до greenlet
+`AsyncSession.run_sync`.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics.metrics import REGISTRY
+
+#: Мітка маршруту для запитів, що не збіглися з жодним маршрутом API.
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests.", ("method", "route", "status"))
+HTTP_DURATION = REGISTRY.histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+HTTP_DB_QUERIES = REGISTRY.histogram(
+    "http_request_db_queries", "SQL queries per HTTP request.", ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+HTTP_DB_SECONDS = REGISTRY.histogram("http_request_db_seconds", "SQL time per HTTP request.", ("method", "route"))
+DB_QUERY_SECONDS = REGISTRY.histogram("db_query_duration_seconds", "SQL statement latency.").labels()
+
+
+class RequestStats:
+    """
+    Лічильники SQL-запитів одного HTTP-запиту.
+
+    Attributes:
+        queries (int): Кількість виконаних SQL-запитів.
+        seconds (float): Сумарний час SQL-запитів.
+    """
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+#: Статистика поточного HTTP-запиту (None поза запитом).
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+#: Журнал SQL-запитів профільованого запиту (`app.metrics.profiler`); None — не вести.
+statement_log: ContextVar[Optional[List[Dict]]] = ContextVar("statement_log", default=None)
+
+#: Максимальна довжина тексту SQL у журналі.
+STATEMENT_MAX_LENGTH = 2000
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware, що записує метрики кожного HTTP-запиту.
+
+    Attributes:
+        app: Вкладений ASGI-застосунок.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            current_request.reset(token)
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, route, status).inc()
+            HTTP_DURATION.labels(method, route).observe(duration)
+            HTTP_DB_QUERIES.labels(method, route).observe(stats.queries)
+            HTTP_DB_SECONDS.labels(method, route).observe(stats.seconds)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    DB_QUERY_SECONDS.observe(duration)
+    stats = current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += duration
+    log = statement_log.get()
+    if log is not None:
+        log.append({"statement": statement[:STATEMENT_MAX_LENGTH], "duration": round(duration, 6), "executemany": executemany})
+
+
+def instrument_queries(engine: Engine) -> None:
+    """
+    Підключає вимірювання SQL-запитів до двигуна (повторний виклик нічого не робить).
+
+    Args:
+        engine (Engine): Синхронний двигун (для асинхронного — `AsyncEngine.sync_engine`).
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,163 @@
+"""
+Модуль `multiprocess.py`
+
+Об’єднання метрик кількох воркерів uvicorn/gunicorn.
+
+Кожен воркер періодично (та перед відповіддю на `/metrics`) записує знімок
+свого реєстру у файл ``<METRICS_MULTIPROC_DIR>/<pid>-<мітка запуску>.json``.
+Ендпоінт `/metrics` читає всі файли та сумує значення з однаковими мітками:
+
+- лічильники й гістограми сумуються по всіх файлах, включно з
+  завершеними воркерами. Мітка запуску в назві файлу не дає новому
+  воркеру з PID завершеного перезаписати його останні значення, тож
+  суми лишаються монотонними;
+- датчики враховуються лише для живих процесів (для PID — лише
+  найновіший запуск).
+
+Директорію очищає `clear_snapshots` перед запуском воркерів
+(`app.server`), тож після перезапуску сервера лічильники починаються з нуля.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from app.metrics.metrics import REGISTRY, Registry
+
+logger = logging.getLogger(__name__)
+
+#: PID і мітка запуску процесу, що пише знімки (після fork визначаються заново).
+_process_key: Tuple[int, int] = (0, 0)
+
+
+def process_key() -> Tuple[int, int]:
+    """
+    Повертає PID поточного процесу та мітку його запуску.
+
+    Returns:
+        Tuple[int, int]: ``(pid, time_ns)``; мітка фіксується при першому виклику в процесі.
+    """
+    global _process_key
+    pid = os.getpid()
+    if _process_key[0] != pid:
+        _process_key = (pid, time.time_ns())
+    return _process_key
+
+
+def clear_snapshots(directory: str) -> None:
+    """
+    Видаляє знімки попереднього запуску сервера (викликається до створення воркерів).
+
+    Args:
+        directory (str): Спільна директорія метрик (створюється, якщо її немає).
+    """
+    os.makedirs(directory, exist_ok=True)
+    for filename in os.listdir(directory):
+        if filename.endswith((".json", ".json.tmp")):
+            os.remove(os.path.join(directory, filename))
+
+
+def write_snapshot(
+    directory: str,
+    registry: Registry = REGISTRY,
+    pid: Optional[int] = None,
+    started: Optional[int] = None,
+) -> None:
+    """
+    Атомарно записує знімок метрик поточного процесу.
+
+    Args:
+        directory (str): Спільна директорія метрик.
+        registry (Registry): Реєстр процесу.
+        pid (Optional[int]): Ідентифікатор процесу (за замовчуванням — поточний).
+        started (Optional[int]): Мітка запуску процесу (за замовчуванням — поточного).
+    """
+    own_pid, own_started = process_key()
+    pid = pid or own_pid
+    started = started if started is not None else own_started
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{pid}-{started}.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(registry.collect(), f)
+    os.replace(f"{path}.tmp", path)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge_value(kind: str, total, value):
+    if total is None:
+        return json.loads(json.dumps(value))
+    if kind != "histogram":
+        return total + value
+    total["count"] += value["count"]
+    total["sum"] += value["sum"]
+    total["max"] = max(total["max"], value["max"])
+    for bound, count in value["buckets"].items():
+        total["buckets"][bound] = total["buckets"].get(bound, 0) + count
+    return total
+
+
+def merge_snapshots(directory: str) -> Dict[str, Dict]:
+    """
+    Читає та об’єднує знімки всіх воркерів.
+
+    Args:
+        directory (str): Спільна директорія метрик.
+
+    Returns:
+        Dict[str, Dict]: Знімок у форматі `Registry.collect`.
+    """
+    files = {}
+    for filename in sorted(os.listdir(directory)):
+        pid, _, started = filename[:-len(".json")].partition("-")
+        if filename.endswith(".json") and pid.isdigit() and started.isdigit():
+            files[filename] = (int(pid), int(started))
+    latest: Dict[int, int] = {}
+    for pid, started in files.values():
+        latest[pid] = max(latest.get(pid, started), started)
+
+    merged: Dict[str, Dict] = {}
+    for filename, (pid, started) in files.items():
+        try:
+            with open(os.path.join(directory, filename)) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        alive = started == latest[pid] and _alive(pid)
+        for name, family in snapshot.items():
+            if family["kind"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {"kind": family["kind"], "help": family["help"], "samples": {}})
+            for labels, value in family["samples"]:
+                key = json.dumps(labels, sort_keys=True)
+                target["samples"][key] = _merge_value(family["kind"], target["samples"].get(key), value)
+    for family in merged.values():
+        family["samples"] = [[json.loads(key), value] for key, value in family["samples"].items()]
+    return merged
+
+
+async def flush_periodically(directory: str, interval: float) -> None:
+    """
+    Фонова задача: записує знімок метрик кожні `interval` секунд.
+
+    Args:
+        directory (str): Спільна директорія метрик.
+        interval (float): Період запису, секунд.
+    """
+    while True:
+        try:
+            write_snapshot(directory)
+        except OSError:
+            logger.exception("Failed to write metrics snapshot")
+        await asyncio.sleep(interval)
@@ -0,0 +1,231 @@
+"""
+Модуль `profiler.py`
+
+Профілювання окремих запитів на вимогу.
+
+`ProfilerMiddleware` вмикає cProfile для запиту, якщо:
+
+- запит містить заголовок ``X-Profile`` з токеном, підписаним
+  `ADMIN_TOKEN` (див. `sign_profile_token`), або
+- запит потрапив у випадкову вибірку з часткою `PROFILE_SAMPLE_RATE`.
+
+Звіт містить дерево викликів (за даними cProfile), перелік SQL-запитів
+із тривалістю та загальні дані запиту; останні `PROFILE_BUFFER_SIZE`
+звітів зберігаються в кільцевому буфері процесу й доступні через
+`/admin/profiles`.
+
+Обмеження: cProfile бачить лише потік циклу подій (робота в threadpool
+видна як очікування), а поки запит профілюється, у звіт потрапляють
+і кадри інших конкурентних запитів. Одночасно профілюється не більше
+одного запиту на воркер. Коли профілювання не ввімкнено, middleware
+лише перевіряє заголовки запиту.
+"""
+
+import cProfile
+import hashlib
+import hmac
+import itertools
+import pstats
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from app.config.config import ADMIN_TOKEN, PROFILE_BUFFER_SIZE, PROFILE_SAMPLE_RATE
+from app.metrics.middleware import statement_log
+
+#: Заголовок запиту, що вмикає профілювання.
+PROFILE_HEADER = b"x-profile"
+
+#: Глибина та мінімальна частка часу вузлів дерева викликів у звіті.
+TREE_MAX_DEPTH = 25
+TREE_MIN_FRACTION = 0.01
+
+
+def sign_profile_token(expires: int, key: Optional[str] = None) -> str:
+    """
+    Створює токен для заголовка ``X-Profile``.
+
+    Args:
+        expires (int): Unix-час, до якого токен дійсний.
+        key (Optional[str]): Секрет підпису; за замовчуванням — `ADMIN_TOKEN`.
+
+    Returns:
+        str: Токен виду ``<expires>.<hmac-sha256>``.
+    """
+    key = ADMIN_TOKEN if key is None else key
+    signature = hmac.new(key.encode(), f"profile:{expires}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_profile_token(token: str, key: Optional[str] = None) -> bool:
+    """
+    Перевіряє підпис і строк дії токена ``X-Profile``.
+
+    Args:
+        token (str): Значення заголовка.
+        key (Optional[str]): Секрет підпису (за замовчуванням — `ADMIN_TOKEN`);
+            порожній — профілювання за заголовком вимкнено.
+
+    Returns:
+        bool: True, якщо токен дійсний.
+    """
+    key = ADMIN_TOKEN if key is None else key
+    expires, _, _ = token.partition(".")
+    if not key or not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(token, sign_profile_token(int(expires), key))
+
+
+def _label(func: tuple) -> str:
+    filename, line, name = func
+    return name if filename == "~" else f"{name} ({filename}:{line})"
+
+
+def call_tree(profile: cProfile.Profile) -> List[Dict]:
+    """
+    Будує дерево викликів зі статистики cProfile.
+
+    Вузли з часткою часу менше `TREE_MIN_FRACTION` відкидаються.
+
+    Args:
+        profile (cProfile.Profile): Завершений профіль.
+
+    Returns:
+        List[Dict]: Корені дерева: ``{"function", "calls", "total", "own", "children"}``.
+    """
+    stats = pstats.Stats(profile).stats
+    children: Dict[tuple, Dict[tuple, tuple]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, caller_stats in callers.items():
+            children.setdefault(caller, {})[func] = caller_stats
+    roots = [f for f, (_, _, _, _, callers) in stats.items() if not callers]
+    grand_total = sum(stats[f][3] for f in roots) or 1e-9
+
+    def node(func, calls, total, depth, path):
+        own = stats[func][2] if not path else None
+        result = {"function": _label(func), "calls": calls, "total": round(total, 6), "children": []}
+        if own is not None:
+            result["own"] = round(own, 6)
+        if depth < TREE_MAX_DEPTH:
+            for child, (_, nc, tt, ct) in sorted(children.get(func, {}).items(), key=lambda i: -i[1][3]):
+                if ct / grand_total >= TREE_MIN_FRACTION and child not in path:
+                    result["children"].append(node(child, nc, ct, depth + 1, path | {func}))
+        return result
+
+    return [node(f, stats[f][1], stats[f][3], 0, frozenset()) for f in sorted(roots, key=lambda f: -stats[f][3])
+            if stats[f][3] / grand_total >= TREE_MIN_FRACTION]
+
+
+class ProfileBuffer:
+    """
+    Кільцевий буфер останніх звітів профілювання.
+
+    Attributes:
+        maxlen (int): Максимальна кількість звітів.
+    """
+
+    def __init__(self, maxlen: int = PROFILE_BUFFER_SIZE):
+        self.maxlen = maxlen
+        self._reports: deque = deque(maxlen=maxlen)
+        self._ids = itertools.count(1)
+
+    def add(self, report: Dict) -> Dict:
+        """Додає звіт, присвоюючи йому ідентифікатор."""
+        report["id"] = next(self._ids)
+        self._reports.append(report)
+        return report
+
+    def list(self) -> List[Dict]:
+        """Короткі дані звітів, від найновішого."""
+        keys = ("id", "method", "path", "status", "started_at", "duration", "sql_count", "sql_seconds", "reason")
+        return [{k: r[k] for k in keys} for r in reversed(self._reports)]
+
+    def get(self, report_id: int) -> Optional[Dict]:
+        """Повний звіт за ідентифікатором або None."""
+        return next((r for r in self._reports if r["id"] == report_id), None)
+
+    def clear(self) -> None:
+        """Очищає буфер."""
+        self._reports.clear()
+
+
+#: Звіти профілювання процесу.
+profile_buffer = ProfileBuffer()
+
+
+class ProfilerMiddleware:
+    """
+    ASGI-middleware, що профілює запити на вимогу або за вибіркою.
+
+    Attributes:
+        app: Вкладений ASGI-застосунок.
+        sample_rate (float): Частка запитів, що профілюються без заголовка.
+        buffer (ProfileBuffer): Буфер для звітів.
+    """
+
+    def __init__(self, app, sample_rate: float = PROFILE_SAMPLE_RATE, buffer: ProfileBuffer = profile_buffer):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.buffer = buffer
+        self._busy = False
+
+    def _reason(self, scope) -> Optional[str]:
+        if ADMIN_TOKEN:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return "header" if verify_profile_token(value.decode("latin-1")) else None
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        reason = self._reason(scope) if scope["type"] == "http" and not self._busy else None
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Інший профайлер (наприклад, coverage) вже активний у цьому потоці
+            await self.app(scope, receive, send)
+            return
+        profile.disable()
+
+        self._busy = True
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        statements: List[Dict] = []
+        token = statement_log.set(statements)
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profile.disable()
+            duration = time.perf_counter() - start
+            statement_log.reset(token)
+            self._busy = False
+            self.buffer.add({
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status,
+                "reason": reason,
+                "started_at": started_at.isoformat(),
+                "duration": round(duration, 6),
+                "sql_count": len(statements),
+                "sql_seconds": round(sum(s["duration"] for s in statements), 6),
+                "sql": statements,
+                "call_tree": call_tree(profile),
+            })
@@ -4,14 +4,24 @@
 Містить ORM-моделі SQLAlchemy для таблиць:
 - User (користувачі)
 - Contact (контакти користувачів)
+- EmailOutbox (черга вихідних листів)
+- AvatarJob (фонові завдання завантаження аватарів)
+- AvatarBlob (індекс завантажених аватарів за хешем вмісту)
 
 Використовується SQLAlchemy ORM та базовий клас Base із модуля app.database.
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+from sqlalchemy import DDL, JSON, Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, event, func
 from sqlalchemy.orm import relationship
 from app.database.database import Base
 from datetime import datetime
 
+# Розширення pg_trgm потрібне для GIN-індексів пошуку контактів (лише PostgreSQL)
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
 class User(Base):
     """
     Модель користувача системи.
@@ -26,7 +36,10 @@ class User(Base):
         username (str): Унікальне ім’я користувача (необов’язкове поле).
         is_verified (bool): Статус верифікації користувача.
         avatar_url (str): Посилання на зображення аватара.
+        avatar_hash (str): Хеш вмісту аватара (`AvatarBlob.hash`), на який посилається користувач.
         created_at (datetime): Час створення користувача.
+        contacts_version (int): Версія колекції контактів; збільшується при
+            кожному створенні, зміні чи видаленні контакту (для ETag).
         contacts (relationship): Зв’язок один-до-багатьох з моделлю Contact.
     """
     
@@ -38,7 +51,9 @@ class User(Base):
     username = Column(String(50), unique=True, index=True, nullable=True)
     is_verified = Column(Boolean, default=False)
     avatar_url = Column(String(255), nullable=True)
+    avatar_hash = Column(String(64), ForeignKey("avatar_blobs.hash"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    contacts_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     contacts = relationship("Contact", back_populates="owner", cascade="all, delete-orphan")
 
@@ -57,7 +72,20 @@ class Contact(Base):
         phone (str): Телефонний номер контакту.
         address (str): Адреса контакту.
         owner_id (int): Зовнішній ключ до таблиці користувачів (users.id).
+        updated_at (datetime): Час останньої зміни контакту.
+        deleted_at (datetime): Час видалення; видалений контакт лишається
+            «надгробком» (tombstone) для синхронізації змін.
+        change_seq (int): Номер зміни в межах власника — значення
+            `User.contacts_version` на момент останньої зміни контакту.
         owner (relationship): Зв’язок із користувачем (User).
+
+    Indexes:
+        - ``(owner_id, id)`` — список контактів, keyset-пагінація та `get_contact`;
+        - ``(owner_id, name, id)`` — список із сортуванням за ім’ям;
+        - ``(owner_id, lower(email))`` — пошук контакту власника за email;
+        - ``(owner_id, change_seq, id)`` — стрічка змін `GET /contacts/changes`;
+        - GIN ``gin_trgm_ops`` на ``name`` та ``email`` — нечіткий пошук
+          та ``ILIKE '%...%'`` (створюються лише в PostgreSQL).
     """
     
     __tablename__ = "contacts"
@@ -68,4 +96,121 @@ class Contact(Base):
     phone = Column(String(20), nullable=True)
     address = Column(String(255), nullable=True)
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    owner = relationship("User", back_populates="contacts")
\ No newline at end of file
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    deleted_at = Column(DateTime, nullable=True)
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
+    owner = relationship("User", back_populates="contacts")
+
+    __table_args__ = (
+        Index("ix_contacts_owner_id_id", owner_id, id),
+        Index("ix_contacts_owner_id_name_id", owner_id, name, id),
+        Index("ix_contacts_owner_id_email_lower", owner_id, func.lower(email)),
+        Index("ix_contacts_owner_id_change_seq_id", owner_id, change_seq, id),
+        Index(
+            "ix_contacts_name_trgm", name,
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_contacts_email_trgm", email,
+            postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+class EmailOutbox(Base):
+    """
+    Лист у черзі на відправлення.
+
+    Маршрути лише додають рядок у цю таблицю, а фоновий воркер
+    (`app.mailer.outbox.MailOutboxWorker`) надсилає листи пакетами
+    через постійне SMTP-з’єднання та повторює невдалі спроби з затримкою.
+
+    Attributes:
+        id (int): Первинний ключ.
+        to_email (str): Адреса одержувача.
+        subject (str): Тема листа.
+        body (str): Текст листа.
+        status (str): "pending", "sent" або "failed" (вичерпано спроби).
+        attempts (int): Кількість виконаних спроб відправлення.
+        next_attempt_at (datetime): Не раніше якого часу робити наступну спробу.
+        last_error (str): Текст останньої помилки SMTP.
+        created_at (datetime): Час постановки в чергу.
+        sent_at (datetime): Час успішного відправлення.
+    """
+
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True)
+    to_email = Column(String(100), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String(10), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", status, next_attempt_at),
+    )
+
+
+class AvatarJob(Base):
+    """
+    Фонове завдання завантаження аватара.
+
+    Маршрут `PUT /contacts/{id}/avatar` лише готує зменшені копії зображення
+    і створює завдання; вивантаження у сховище та оновлення
+    `User.avatar_url` виконує `app.avatars.pipeline.AvatarPipeline`.
+
+    Attributes:
+        id (str): Ідентифікатор завдання (UUID у hex).
+        user_id (int): Власник аватара (users.id).
+        status (str): "pending", "done" або "failed".
+        urls (dict): Розмір у пікселях -> URL завантаженої копії.
+        error (str): Текст помилки для статусу "failed".
+        created_at (datetime): Час створення завдання.
+        finished_at (datetime): Час завершення завдання.
+    """
+
+    __tablename__ = "avatar_jobs"
+
+    id = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String(10), nullable=False, default="pending")
+    urls = Column(JSON, nullable=True)
+    error = Column(String(255), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class AvatarBlob(Base):
+    """
+    Завантажений у сховище аватар, адресований хешем вмісту.
+
+    Однакові зображення мають однаковий SHA-256, тож повторне
+    завантаження того самого файлу повторно використовує вже
+    вивантажені копії без звернення до сховища. `refcount` рахує
+    користувачів, чий аватар посилається на запис; записи з нульовим
+    лічильником прибирає `AvatarPipeline.collect_garbage`.
+
+    Attributes:
+        hash (str): SHA-256 вмісту (з урахуванням профілю обробки), hex.
+        urls (dict): Розмір у пікселях -> URL копії у сховищі.
+        refcount (int): Кількість користувачів з цим аватаром.
+        created_at (datetime): Час першого завантаження.
+        updated_at (datetime): Час останньої зміни лічильника.
+    """
+
+    __tablename__ = "avatar_blobs"
+
+    hash = Column(String(64), primary_key=True)
+    urls = Column(JSON, nullable=False)
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_avatar_blobs_refcount_updated_at", refcount, updated_at),
+    )
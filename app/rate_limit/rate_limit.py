@@ -1,4 +1,243 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+"""
+Модуль `rate_limit.py`
 
-limiter = Limiter(key_func=get_remote_address)
\ No newline at end of file
+Розподілене обмеження частоти запитів для маршрутів API.
+
+Ліміт рахується алгоритмом GCRA (generic cell rate algorithm — еквівалент
+«ковзного вікна» без зберігання окремих міток часу):
+
+- у Redis для кожного ключа зберігається одне число — теоретичний час
+  прибуття наступного запиту (TAT); перевірка та оновлення виконуються
+  одним Lua-скриптом, тому ліміт спільний і атомарний для всіх воркерів
+  і подів, а час береться з годинника Redis;
+- ключем є ідентифікатор автентифікованого користувача, а не IP-адреса,
+  тож користувачі за одним NAT не ділять ліміт між собою;
+- ліміт для кожного маршруту задається через `RATE_LIMIT_PER_MINUTE`
+  (типове значення) та `RATE_LIMIT_ROUTES` (перевизначення);
+- якщо Redis недоступний, ліміт тимчасово рахується в локальних
+  (in-process) лічильниках того самого алгоритму.
+
+Відповіді отримують заголовки `X-RateLimit-Limit`, `X-RateLimit-Remaining`,
+`X-RateLimit-Reset`, а відхилені (429) — ще й `Retry-After`.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from fastapi import Depends, Response
+
+from app.config.config import RATE_LIMIT_PER_MINUTE, RATE_LIMIT_ROUTES, RATE_LIMIT_STORAGE
+from app.metrics.metrics import EXTERNAL_CALL_SECONDS, timer
+from app.models import models
+from app.redis_cache.redis_cache import redis_client
+from app.routes.auth import get_current_user
+
+KEY = "ratelimit:{}:{}"
+"""str: Ключ Redis з TAT для пари (маршрут, користувач)."""
+
+REDIS_RETRY_SECONDS = 30
+"""int: Скільки секунд не звертатися до Redis після помилки з’єднання."""
+
+LOCAL_MAXSIZE = 100000
+"""int: Після скількох локальних ключів прибирати прострочені."""
+
+#: GCRA у Redis. ARGV: період у мс, ліміт за період.
+#: Повертає {дозволено, залишок, мс до повного відновлення, мс до повторної спроби}.
+GCRA_SCRIPT = """
+local period = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local interval = period / limit
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, 0, math.ceil(tat - now), math.ceil(allow_at - now)}
+end
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((period - (new_tat - now)) / interval), math.ceil(new_tat - now), 0}
+"""
+
+
+class RateLimitExceeded(Exception):
+    """
+    Виняток при перевищенні ліміту запитів.
+
+    Attributes:
+        result (RateLimitResult): Стан ліміту для заголовків відповіді 429.
+    """
+
+    def __init__(self, result: "RateLimitResult"):
+        super().__init__(f"Rate limit {result.limit}/{result.period}s exceeded")
+        self.result = result
+
+
+@dataclass
+class RateLimitResult:
+    """
+    Результат перевірки ліміту.
+
+    Attributes:
+        allowed (bool): Чи пропускається запит.
+        limit (int): Кількість запитів за період.
+        period (int): Період ліміту, секунд.
+        remaining (int): Скільки запитів ще можна зробити зараз.
+        reset_after (float): Секунд до повного відновлення ліміту.
+        retry_after (float): Секунд до наступної дозволеної спроби (0, якщо дозволено).
+    """
+    allowed: bool
+    limit: int
+    period: int
+    remaining: int
+    reset_after: float
+    retry_after: float
+
+    def headers(self) -> Dict[str, str]:
+        """
+        Формує заголовки `X-RateLimit-*` (та `Retry-After` для відмови).
+
+        Returns:
+            Dict[str, str]: Заголовки відповіді.
+        """
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+def parse_route_limits(spec: str) -> Dict[str, int]:
+    """
+    Розбирає перевизначення лімітів виду ``"contacts:bulk=5,contacts:create=20"``.
+
+    Args:
+        spec (str): Рядок із `RATE_LIMIT_ROUTES`.
+
+    Returns:
+        Dict[str, int]: Назва маршруту -> кількість запитів за хвилину.
+    """
+    limits = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class RateLimiter:
+    """
+    Лімітер запитів з Redis-сховищем і локальним резервом.
+
+    Attributes:
+        redis: Асинхронний клієнт Redis або None — лише локальні лічильники.
+        default_per_minute (int): Ліміт для маршрутів без перевизначення.
+        route_limits (Dict[str, int]): Перевизначення лімітів за назвою маршруту.
+    """
+
+    def __init__(self, redis=None, default_per_minute: int = RATE_LIMIT_PER_MINUTE, route_limits: Optional[Dict[str, int]] = None):
+        self.redis = redis
+        self.default_per_minute = default_per_minute
+        self.route_limits = route_limits or {}
+        self._script = None
+        self._local: Dict[str, float] = {}
+        self._redis_down_until = 0.0
+
+    def limit_for(self, name: str) -> int:
+        """
+        Повертає ліміт запитів за хвилину для маршруту.
+
+        Args:
+            name (str): Назва маршруту, наприклад ``"contacts:create"``.
+
+        Returns:
+            int: Кількість запитів за хвилину.
+        """
+        return self.route_limits.get(name, self.default_per_minute)
+
+    def reset(self) -> None:
+        """Очищає локальні лічильники (використовується в тестах)."""
+        self._local.clear()
+        self._redis_down_until = 0.0
+
+    # ---------- Сховища ----------
+
+    async def _hit_redis(self, key: str, limit: int, period: int) -> RateLimitResult:
+        # Скрипт реєструється при першому запиті: клієнт Redis створюється лише тоді
+        if self._script is None:
+            self._script = self.redis.register_script(GCRA_SCRIPT)
+        with timer(EXTERNAL_CALL_SECONDS.labels("redis", "rate_limit")):
+            allowed, remaining, reset_ms, retry_ms = await self._script(keys=[key], args=[period * 1000, limit])
+        return RateLimitResult(bool(allowed), limit, period, int(remaining), reset_ms / 1000, retry_ms / 1000)
+
+    def _hit_local(self, key: str, limit: int, period: int) -> RateLimitResult:
+        now = time.monotonic()
+        interval = period / limit
+        tat = max(self._local.get(key, now), now)
+        new_tat = tat + interval
+        allow_at = new_tat - period
+        if now < allow_at:
+            return RateLimitResult(False, limit, period, 0, tat - now, allow_at - now)
+        if len(self._local) >= LOCAL_MAXSIZE:
+            self._local = {k: v for k, v in self._local.items() if v > now}
+        self._local[key] = new_tat
+        remaining = math.floor((period - (new_tat - now)) / interval + 1e-9)
+        return RateLimitResult(True, limit, period, remaining, new_tat - now, 0.0)
+
+    async def hit(self, name: str, identity, limit: Optional[int] = None, period: int = 60) -> RateLimitResult:
+        """
+        Рахує один запит і перевіряє ліміт.
+
+        Args:
+            name (str): Назва маршруту.
+            identity: Ідентифікатор клієнта (id користувача).
+            limit (Optional[int]): Ліміт за період; None — з конфігурації маршруту.
+            period (int): Період ліміту, секунд.
+
+        Returns:
+            RateLimitResult: Результат перевірки.
+        """
+        limit = limit or self.limit_for(name)
+        key = KEY.format(name, identity)
+        if self.redis is not None and time.monotonic() >= self._redis_down_until:
+            try:
+                return await self._hit_redis(key, limit, period)
+            except Exception:
+                self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        return self._hit_local(key, limit, period)
+
+    def limit(self, name: str) -> Callable:
+        """
+        Створює залежність FastAPI, що обмежує маршрут для поточного користувача.
+
+        Args:
+            name (str): Назва маршруту в конфігурації лімітів.
+
+        Returns:
+            Callable: Залежність для `Depends(...)`.
+
+        Raises:
+            RateLimitExceeded: Якщо ліміт вичерпано.
+        """
+        async def dependency(response: Response, current_user: models.User = Depends(get_current_user)) -> None:
+            result = await self.hit(name, current_user.id)
+            if not result.allowed:
+                raise RateLimitExceeded(result)
+            response.headers.update(result.headers())
+
+        return dependency
+
+
+#: Лімітер застосунку.
+limiter = RateLimiter(
+    redis=redis_client if RATE_LIMIT_STORAGE == "redis" else None,
+    route_limits=parse_route_limits(RATE_LIMIT_ROUTES),
+)
@@ -1,6 +1,61 @@
-import os
-import redis.asyncio as aioredis
+"""
+Модуль `redis_cache.py`
 
-REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+Спільний асинхронний клієнт Redis (`redis_client`).
 
-redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
\ No newline at end of file
+Клієнт (і пакет ``redis.asyncio``) створюється при першому зверненні,
+а не під час імпорту: процес, що ще не ходив у Redis, не платить
+за його завантаження на старті.
+"""
+
+from typing import Any, Callable
+
+from app.config.config import REDIS_URL
+
+
+def connect() -> Any:
+    """
+    Створює клієнт Redis з `REDIS_URL`.
+
+    Короткі таймаути, щоб недоступний Redis не блокував запити — кеш має
+    деградувати до бази даних, а не гальмувати її.
+
+    Returns:
+        redis.asyncio.Redis: Клієнт із пулом з’єднань (з’єднання відкриваються за потреби).
+    """
+    import redis.asyncio as aioredis
+
+    return aioredis.from_url(
+        REDIS_URL,
+        decode_responses=True,
+        socket_connect_timeout=1,
+        socket_timeout=1,
+    )
+
+
+class LazyRedis:
+    """
+    Замісник клієнта Redis: створює справжній клієнт при першому зверненні
+    до будь-якого його атрибута і далі передає звернення йому.
+
+    Attributes:
+        factory (Callable[[], Any]): Фабрика клієнта.
+    """
+
+    def __init__(self, factory: Callable[[], Any] = connect):
+        self.factory = factory
+        self._client = None
+
+    @property
+    def client(self) -> Any:
+        """Справжній клієнт Redis (створюється за потреби)."""
+        if self._client is None:
+            self._client = self.factory()
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+#: Клієнт Redis застосунку.
+redis_client = LazyRedis()
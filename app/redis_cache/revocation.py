@@ -0,0 +1,313 @@
+"""
+Модуль `revocation.py`
+
+Список відкликаних токенів (denylist) для виходу із сесії, ротації
+refresh-токенів та скидання пароля.
+
+- Авторитетне сховище — Redis: відсортована множина ``auth:revoked``
+  (ідентифікатор -> час, до якого він відкликаний; це ``exp`` токена,
+  тож записи зникають разом із токенами) та ``auth:revoked-before``
+  (email -> час, раніше якого видані токени недійсні).
+- Кожен воркер тримає локальне дзеркало: фільтр Блума для ідентифікаторів
+  та словник часових меж для користувачів. Воно заповнюється при запуску
+  та оновлюється повідомленнями каналу ``auth:revocations``.
+- Перевірка токена (`is_revoked`) — це перевірка фільтра Блума без
+  мережевих викликів; до Redis звертаємося лише при позитивній відповіді
+  фільтра, щоб відсіяти хибні спрацьовування.
+
+Якщо Redis недоступний, список працює лише з локальними відкликаннями
+цього воркера, не пропускаючи помилок у запит.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from typing import Dict, Optional
+
+from app.config.config import (
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    REVOCATION_BLOOM_CAPACITY,
+    REVOCATION_BLOOM_ERROR_RATE,
+)
+from app.metrics.metrics import EXTERNAL_CALL_SECONDS, timer
+from app.redis_cache.redis_cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY = "auth:revoked"
+"""str: Відсортована множина відкликаних jti/sid (оцінка — час дії відкликання)."""
+
+CUTOFF_KEY = "auth:revoked-before"
+"""str: Відсортована множина email -> час, раніше якого видані токени недійсні."""
+
+CHANNEL = "auth:revocations"
+"""str: Канал Redis, яким воркери повідомляють один одного про відкликання."""
+
+REDIS_RETRY_SECONDS = 30
+"""int: Скільки секунд не звертатися до Redis після помилки з’єднання."""
+
+LOCAL_MAXSIZE = 100000
+"""int: Після скількох локальних записів прибирати прострочені."""
+
+
+class BloomFilter:
+    """
+    Фільтр Блума для рядків.
+
+    Може хибно відповісти «є» (з імовірністю `error_rate` при заповненні
+    до `capacity`), але ніколи — «немає» для доданого елемента.
+
+    Attributes:
+        capacity (int): Розрахункова кількість елементів.
+        size (int): Кількість бітів.
+        hashes (int): Кількість хеш-функцій.
+        count (int): Кількість доданих елементів.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(1, capacity)
+        self.size = max(64, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Подвійне хешування: k позицій з двох 64-бітних половин одного дайджесту
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        """Додає елемент."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+
+class RevocationList:
+    """
+    Список відкликаних токенів із Redis-сховищем і локальним дзеркалом.
+
+    Attributes:
+        redis: Асинхронний клієнт Redis або None — лише локальні відкликання.
+        capacity (int): Початкова місткість фільтра Блума.
+        error_rate (float): Частка хибних спрацьовувань фільтра.
+        cutoff_ttl (float): Скільки секунд зберігати часові межі користувачів
+            (час життя найдовшого токена — refresh).
+    """
+
+    def __init__(
+        self,
+        redis=None,
+        capacity: int = REVOCATION_BLOOM_CAPACITY,
+        error_rate: float = REVOCATION_BLOOM_ERROR_RATE,
+        cutoff_ttl: float = REFRESH_TOKEN_EXPIRE_DAYS * 86400,
+    ):
+        self.redis = redis
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.cutoff_ttl = cutoff_ttl
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._local: Dict[str, float] = {}
+        self._cutoffs: Dict[str, float] = {}
+        self._redis_down_until = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------- Redis ----------
+
+    def _redis_available(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _mark_redis_down(self) -> None:
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+    # ---------- Локальне дзеркало ----------
+
+    def _remember(self, token_id: str, expires_at: float) -> bool:
+        """Запам’ятовує відкликання локально; повертає False, якщо воно вже було."""
+        now = time.time()
+        known = self._local.get(token_id, 0.0) > now
+        if len(self._local) >= LOCAL_MAXSIZE:
+            self._local = {k: v for k, v in self._local.items() if v > now}
+        self._local[token_id] = max(expires_at, self._local.get(token_id, 0.0))
+        self._bloom.add(token_id)
+        return not known
+
+    def _remember_cutoff(self, subject: str, cutoff: float) -> None:
+        if len(self._cutoffs) >= LOCAL_MAXSIZE:
+            oldest = time.time() - self.cutoff_ttl
+            self._cutoffs = {k: v for k, v in self._cutoffs.items() if v > oldest}
+        self._cutoffs[subject] = max(cutoff, self._cutoffs.get(subject, 0.0))
+
+    def _apply(self, message: Dict) -> None:
+        """Застосовує повідомлення каналу `CHANNEL` до локального дзеркала."""
+        if "id" in message:
+            self._bloom.add(message["id"])
+        elif "sub" in message:
+            self._remember_cutoff(message["sub"], message["cutoff"])
+
+    def clear(self) -> None:
+        """Очищає локальне дзеркало (використовується в тестах)."""
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        self._local.clear()
+        self._cutoffs.clear()
+        self._redis_down_until = 0.0
+
+    # ---------- Публічний API ----------
+
+    async def revoke(self, token_id: str, expires_at: float) -> bool:
+        """
+        Відкликає jti токена або sid сесії.
+
+        Args:
+            token_id (str): Ідентифікатор (``jti`` або ``sid``).
+            expires_at (float): Unix-час, до якого діє відкликання (``exp`` токена).
+
+        Returns:
+            bool: True, якщо ідентифікатор відкликано цим викликом; False,
+            якщо він уже був відкликаний (для виявлення повторного
+            використання refresh-токена — атомарно для всіх воркерів).
+        """
+        newly = self._remember(token_id, expires_at)
+        if self._redis_available():
+            try:
+                with timer(EXTERNAL_CALL_SECONDS.labels("redis", "revocation")):
+                    added = await self.redis.zadd(KEY, {token_id: expires_at}, nx=True)
+                    await self.redis.zremrangebyscore(KEY, "-inf", time.time())
+                    await self.redis.publish(CHANNEL, json.dumps({"id": token_id}))
+                newly = newly and bool(added)
+            except Exception:
+                self._mark_redis_down()
+        return newly
+
+    async def revoke_subject(self, subject: str, cutoff: Optional[float] = None) -> None:
+        """
+        Відкликає всі токени користувача, видані до `cutoff`.
+
+        Args:
+            subject (str): ``sub`` токенів (email користувача).
+            cutoff (Optional[float]): Unix-час межі; None — початок наступної секунди.
+                ``iat`` токенів має секундну точність, тож відкликаються й токени,
+                видані в ту ж секунду (користувач входить заново після скидання).
+        """
+        cutoff = cutoff if cutoff is not None else float(int(time.time()) + 1)
+        self._remember_cutoff(subject, cutoff)
+        if self._redis_available():
+            try:
+                with timer(EXTERNAL_CALL_SECONDS.labels("redis", "revocation")):
+                    await self.redis.zadd(CUTOFF_KEY, {subject: cutoff}, gt=True)
+                    await self.redis.zremrangebyscore(CUTOFF_KEY, "-inf", time.time() - self.cutoff_ttl)
+                    await self.redis.publish(CHANNEL, json.dumps({"sub": subject, "cutoff": cutoff}))
+            except Exception:
+                self._mark_redis_down()
+
+    async def _confirm(self, token_id: str) -> bool:
+        """Перевіряє позитивну відповідь фільтра Блума за точними даними."""
+        now = time.time()
+        if self._local.get(token_id, 0.0) > now:
+            return True
+        if not self._redis_available():
+            return False
+        try:
+            with timer(EXTERNAL_CALL_SECONDS.labels("redis", "revocation")):
+                score = await self.redis.zscore(KEY, token_id)
+        except Exception:
+            self._mark_redis_down()
+            return False
+        return score is not None and score > now
+
+    async def is_revoked(self, claims: Dict) -> bool:
+        """
+        Перевіряє, чи відкликаний токен.
+
+        Без мережевих викликів, доки ні ``jti``, ні ``sid`` токена не
+        потрапили у фільтр Блума.
+
+        Args:
+            claims (Dict): Перевірені claims токена.
+
+        Returns:
+            bool: True, якщо відкликаний сам токен, його сесія або всі
+            токени користувача, видані до ``iat``.
+        """
+        cutoff = self._cutoffs.get(claims.get("sub"))
+        if cutoff is not None and claims.get("iat", 0) < cutoff:
+            return True
+        for token_id in (claims.get("jti"), claims.get("sid")):
+            if token_id and token_id in self._bloom and await self._confirm(token_id):
+                return True
+        return False
+
+    # ---------- Синхронізація воркерів ----------
+
+    async def load(self) -> None:
+        """Перебудовує локальне дзеркало з Redis (з запасом місткості фільтра)."""
+        now = time.time()
+        with timer(EXTERNAL_CALL_SECONDS.labels("redis", "revocation")):
+            ids = await self.redis.zrangebyscore(KEY, now, "+inf")
+            cutoffs = await self.redis.zrangebyscore(CUTOFF_KEY, now - self.cutoff_ttl, "+inf", withscores=True)
+        bloom = BloomFilter(max(self.capacity, 2 * (len(ids) + len(self._local))), self.error_rate)
+        for token_id in ids:
+            bloom.add(token_id)
+        for token_id in self._local:
+            bloom.add(token_id)
+        self._bloom = bloom
+        for subject, cutoff in cutoffs:
+            self._remember_cutoff(subject, cutoff)
+
+    async def run(self) -> None:
+        """
+        Слухає канал `CHANNEL` і підтримує локальне дзеркало актуальним.
+
+        Дзеркало перебудовується після підписки (тож жодне відкликання
+        не губиться між завантаженням і підпискою), після відновлення
+        з’єднання та при переповненні фільтра Блума.
+        """
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(CHANNEL)
+                await self.load()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is None:
+                        continue
+                    self._apply(json.loads(message["data"]))
+                    if self._bloom.count > self._bloom.capacity:
+                        await self.load()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Revocation list sync failed, retrying in %s s", REDIS_RETRY_SECONDS, exc_info=True)
+                await asyncio.sleep(REDIS_RETRY_SECONDS)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def start(self) -> None:
+        """Запускає синхронізацію як задачу asyncio у поточному циклі подій."""
+        if self.redis is not None and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Зупиняє синхронізацію."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+#: Список відкликаних токенів застосунку.
+revocations = RevocationList(redis_client)
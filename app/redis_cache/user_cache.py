@@ -0,0 +1,216 @@
+"""
+Модуль `user_cache.py`
+
+Дворівневий кеш автентифікованих користувачів для `get_current_user`:
+
+- локальний (in-process) рівень із коротким TTL — обслуговує повторні
+  запити того самого воркера без жодного мережевого виклику;
+- спільний рівень у Redis (`redis_client`) із довшим TTL — спільний
+  для всіх воркерів і подів.
+
+У кеші зберігається серіалізований знімок `models.User` (без хешу пароля)
+за ключем ``user:email:{email}`` та відображення ``user:{id}`` -> email,
+тож користувача можна знайти як за email, так і за ідентифікатором.
+
+Якщо Redis недоступний, кеш тимчасово вимикає спільний рівень
+і працює лише з локальним, не пропускаючи помилок у запит.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Tuple
+
+from app.config.config import USER_CACHE_LOCAL_MAXSIZE, USER_CACHE_LOCAL_TTL, USER_CACHE_TTL
+from app.metrics.metrics import EXTERNAL_CALL_SECONDS, timer
+from app.models import models
+from app.redis_cache.redis_cache import redis_client
+
+EMAIL_KEY = "user:email:{}"
+"""str: Ключ Redis зі знімком користувача за email."""
+
+ID_KEY = "user:{}"
+"""str: Ключ Redis із відображенням id -> email."""
+
+REDIS_RETRY_SECONDS = 30
+"""int: Скільки секунд не звертатися до Redis після помилки з’єднання."""
+
+#: Поля `models.User`, які потрапляють у знімок. Пароль свідомо не кешується.
+SNAPSHOT_FIELDS = ("id", "email", "username", "is_verified", "avatar_url", "created_at")
+
+_local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_local_ids: dict = {}
+_redis_down_until = 0.0
+
+
+def serialize_user(user: models.User) -> str:
+    """
+    Серіалізує користувача у JSON-знімок.
+
+    Args:
+        user (User): ORM-об’єкт користувача.
+
+    Returns:
+        str: JSON-рядок з полями із `SNAPSHOT_FIELDS`.
+    """
+    data = {field: getattr(user, field) for field in SNAPSHOT_FIELDS}
+    if isinstance(data["created_at"], datetime):
+        data["created_at"] = data["created_at"].isoformat()
+    return json.dumps(data)
+
+
+def deserialize_user(raw: str) -> models.User:
+    """
+    Відновлює знімок користувача з JSON.
+
+    Повертається транзієнтний (не прив’язаний до сесії) об’єкт `models.User`,
+    придатний лише для читання. Для змін користувача його потрібно
+    повторно завантажити з бази даних.
+
+    Args:
+        raw (str): JSON-рядок, створений `serialize_user`.
+
+    Returns:
+        User: Знімок користувача.
+    """
+    data = json.loads(raw)
+    if data.get("created_at"):
+        data["created_at"] = datetime.fromisoformat(data["created_at"])
+    return models.User(**data)
+
+
+# ---------- Локальний рівень ----------
+
+def _local_get(email: str) -> Optional[str]:
+    entry = _local.get(email)
+    if entry is None:
+        return None
+    expires_at, raw = entry
+    if expires_at < time.monotonic():
+        _local_drop(email)
+        return None
+    _local.move_to_end(email)
+    return raw
+
+
+def _local_set(email: str, user_id: int, raw: str) -> None:
+    _local[email] = (time.monotonic() + USER_CACHE_LOCAL_TTL, raw)
+    _local.move_to_end(email)
+    _local_ids[user_id] = email
+    while len(_local) > USER_CACHE_LOCAL_MAXSIZE:
+        old_email, (_, old_raw) = _local.popitem(last=False)
+        _local_ids.pop(json.loads(old_raw)["id"], None)
+
+
+def _local_drop(email: str) -> None:
+    entry = _local.pop(email, None)
+    if entry is not None:
+        _local_ids.pop(json.loads(entry[1])["id"], None)
+
+
+def clear_local() -> None:
+    """Очищає локальний рівень кешу (використовується в тестах)."""
+    global _redis_down_until
+    _local.clear()
+    _local_ids.clear()
+    _redis_down_until = 0.0
+
+
+# ---------- Рівень Redis ----------
+
+def _redis_available() -> bool:
+    return time.monotonic() >= _redis_down_until
+
+
+def _mark_redis_down() -> None:
+    global _redis_down_until
+    _redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+
+
+# ---------- Публічний API ----------
+
+async def get_user(email: str) -> Optional[models.User]:
+    """
+    Шукає знімок користувача за email спершу локально, потім у Redis.
+
+    Args:
+        email (str): Електронна пошта користувача.
+
+    Returns:
+        Optional[User]: Знімок користувача або None, якщо його немає в кеші.
+    """
+    raw = _local_get(email)
+    if raw is None and _redis_available():
+        try:
+            with timer(EXTERNAL_CALL_SECONDS.labels("redis", "get")):
+                raw = await redis_client.get(EMAIL_KEY.format(email))
+        except Exception:
+            _mark_redis_down()
+            raw = None
+        if raw is not None:
+            _local_set(email, json.loads(raw)["id"], raw)
+    return deserialize_user(raw) if raw is not None else None
+
+
+async def get_user_by_id(user_id: int) -> Optional[models.User]:
+    """
+    Шукає знімок користувача за ідентифікатором.
+
+    Args:
+        user_id (int): Ідентифікатор користувача.
+
+    Returns:
+        Optional[User]: Знімок користувача або None, якщо його немає в кеші.
+    """
+    email = _local_ids.get(user_id)
+    if email is None and _redis_available():
+        try:
+            with timer(EXTERNAL_CALL_SECONDS.labels("redis", "get")):
+                email = await redis_client.get(ID_KEY.format(user_id))
+        except Exception:
+            _mark_redis_down()
+            email = None
+    return await get_user(email) if email else None
+
+
+async def set_user(user: models.User) -> None:
+    """
+    Кладе знімок користувача в обидва рівні кешу.
+
+    Args:
+        user (User): ORM-об’єкт користувача.
+    """
+    raw = serialize_user(user)
+    _local_set(user.email, user.id, raw)
+    if not _redis_available():
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.set(EMAIL_KEY.format(user.email), raw, ex=USER_CACHE_TTL)
+            pipe.set(ID_KEY.format(user.id), user.email, ex=USER_CACHE_TTL)
+            with timer(EXTERNAL_CALL_SECONDS.labels("redis", "set")):
+                await pipe.execute()
+    except Exception:
+        _mark_redis_down()
+
+
+async def invalidate_user(user: models.User) -> None:
+    """
+    Видаляє користувача з кешу після зміни його даних.
+
+    Викликається після `update_user_password`, `update_user_avatar`
+    та `verify_user_email`. Локальні рівні інших воркерів застаріють
+    щонайбільше на `USER_CACHE_LOCAL_TTL` секунд.
+
+    Args:
+        user (User): Користувач, дані якого змінено.
+    """
+    _local_drop(user.email)
+    if not _redis_available():
+        return
+    try:
+        with timer(EXTERNAL_CALL_SECONDS.labels("redis", "delete")):
+            await redis_client.delete(EMAIL_KEY.format(user.email), ID_KEY.format(user.id))
+    except Exception:
+        _mark_redis_down()
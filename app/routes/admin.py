@@ -0,0 +1,95 @@
+"""
+Службові маршрути для операторів застосунку.
+
+Доступ захищено заголовком `X-Admin-Token`, який має збігатися
+з `ADMIN_TOKEN`; якщо токен не налаштовано, маршрути недоступні (404).
+"""
+
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.config.config import ADMIN_TOKEN
+from app.database import database
+from app.metrics.profiler import profile_buffer
+from app.utils.password_pool import password_pool
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Перевіряє службовий токен запиту.
+
+    Args:
+        x_admin_token (Optional[str]): Значення заголовка `X-Admin-Token`.
+
+    Raises:
+        HTTPException: 404, якщо службові маршрути вимкнено; 403, якщо токен невірний.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/pool")
+def pool_metrics():
+    """
+    Повертає метрики пулів з’єднань з базою даних.
+
+    Returns:
+        dict: Метрики синхронного пулу та, якщо двигун уже створено, асинхронного.
+    """
+    data = {"sync": database.sync_pool_metrics.snapshot(database.engine.pool)}
+    if database.get_async_engine.cache_info().currsize:
+        data["async"] = database.async_pool_metrics.snapshot(database.get_async_engine().sync_engine.pool)
+    return data
+
+@router.get("/password-pool")
+def password_pool_metrics():
+    """
+    Повертає метрики пулу хешування паролів.
+
+    Returns:
+        dict: Розмір пулу, черга, відхилені операції та час bcrypt-операцій.
+    """
+    return password_pool.metrics()
+
+@router.get("/replicas")
+def replica_status():
+    """
+    Повертає стан реплік для читання за останньою перевіркою.
+
+    Returns:
+        list: Назва, справність і відставання (секунд) кожної репліки.
+    """
+    return database.replica_set.snapshot()
+
+@router.get("/profiles")
+def list_profiles():
+    """
+    Повертає короткі дані останніх звітів профілювання цього воркера.
+
+    Returns:
+        list: Звіти від найновішого (без дерева викликів і SQL).
+    """
+    return profile_buffer.list()
+
+@router.get("/profiles/{report_id}")
+def get_profile(report_id: int):
+    """
+    Повертає повний звіт профілювання.
+
+    Args:
+        report_id (int): Ідентифікатор звіту.
+
+    Returns:
+        dict: Дерево викликів, SQL-запити з тривалістю та дані запиту.
+
+    Raises:
+        HTTPException: Якщо звіт не знайдено (вже витіснено з буфера).
+    """
+    report = profile_buffer.get(report_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return report
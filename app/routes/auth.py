@@ -3,38 +3,33 @@
 
 Цей модуль містить маршрути та логіку для:
 - реєстрації користувачів;
-- входу в систему (отримання JWT-токена);
+- входу в систему (отримання пари JWT: токена доступу та refresh-токена);
+- оновлення токенів із ротацією refresh-токена та виходу із сесії;
 - підтвердження електронної пошти;
 - скидання та зміни пароля.
 
 Використовується FastAPI, SQLAlchemy, Redis для кешування,
-JWT для токенів доступу, та Mailhog (через send_email)
-для тестування email-повідомлень.
+JWT для токенів доступу, та черга листів `email_outbox`
+(відправляє фоновий воркер, у розробці — через Mailhog).
 """
 
 from datetime import datetime, timedelta
 from typing import Optional
-import os
+from uuid import uuid4
+import time
 import jwt
-from fastapi import APIRouter, Depends, HTTPException, status 
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession
 from urllib.parse import unquote
-from app.crud import crud
-from app.database.database import get_db
+from app.config.config import ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS
+from app.crud import async_crud as crud
+from app.database.database import get_db, replica_set
 from app.models import models
-from app.mailer.mailer import send_verification_email, send_reset_email
-from app.redis_cache.redis_cache import redis_client
+from app.redis_cache import user_cache
+from app.redis_cache.revocation import revocations
 from app.schemas import schemas
-
-# Завантаження змінних середовища
-load_dotenv()
-
-SECRET_KEY = os.getenv("SECRET_KEY", "dev_secret") 
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))
-REDIS_TTL = int(os.getenv("REDIS_TTL", 3600))
+from app.utils import tokens
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -43,6 +38,9 @@ def create_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     Створює JWT-токен для користувача.
 
+    Токен підписується ключами, підготовленими при запуску (`app.utils.tokens`),
+    і отримує унікальний ``jti`` та ``iat`` для відкликання.
+
     Args:
         data (dict): Дані, які потрібно закодувати (наприклад, email користувача).
         expires_delta (Optional[timedelta]): Час життя токена. Якщо не вказано — береться зі змінних середовища.
@@ -52,89 +50,189 @@ def create_token(data: dict, expires_delta: Optional[timedelta] = None):
     """
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "jti": uuid4().hex})
+    return tokens.encode_token(to_encode)
+
+def create_token_pair(email: str, sid: Optional[str] = None) -> dict:
+    """
+    Створює токен доступу та refresh-токен однієї сесії.
+
+    Args:
+        email (str): Email користувача (``sub``).
+        sid (Optional[str]): Ідентифікатор сесії; None — нова сесія.
+
+    Returns:
+        dict: Поля схеми `schemas.TokenPair`.
+    """
+    sid = sid or uuid4().hex
+    return {
+        "access_token": create_token({"sub": email, "sid": sid, "type": "access"}),
+        "refresh_token": create_token(
+            {"sub": email, "sid": sid, "type": "refresh"}, expires_delta=timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        ),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
 
 def decode_token(token: str):
     """
     Розшифровує JWT-токен та повертає дані.
 
+    Перевірені токени кешуються до `exp`, тож повторні запити з тим самим
+    токеном не перевіряють підпис знову.
+
     Args:
         token (str): Рядок токена.
 
     Returns:
-        dict: Розкодовані дані з токена.
+        dict: Розкодовані дані з токена (лише для читання).
+
+    Raises:
+        jwt.PyJWTError: Якщо токен недійсний або прострочений.
     """
-    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    return tokens.decode_token(token)
 
-@router.post("/token")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+@router.post("/token", response_model=schemas.TokenPair)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """
     Аутентифікація користувача за email та паролем.
 
     Використовується стандартна схема OAuth2PasswordRequestForm.
-    Якщо авторизація успішна — генерується JWT-токен.
+    Якщо авторизація успішна — генерується пара токенів нової сесії:
+    токен доступу та refresh-токен для `/auth/refresh`, тож повторний
+    вхід із перевіркою пароля (bcrypt) потрібен лише після виходу
+    або закінчення строку дії refresh-токена.
 
     Args:
         form_data (OAuth2PasswordRequestForm): Дані користувача (email, пароль).
-        db (Session): Сесія бази даних.
+        db (AsyncSession): Сесія бази даних.
 
     Returns:
-        dict: Об'єкт із токеном доступу (`access_token`) та типом токена (`bearer`).
+        schemas.TokenPair: Токен доступу, refresh-токен і тип токена (`bearer`).
 
     Raises:
         HTTPException: Якщо облікові дані некоректні.
     """
-    user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not crud.verify_password(form_data.password, user.password):
+    user = await crud.get_user_by_email(db, email=form_data.username)
+    if not user or not await crud.verify_password(form_data.password, user.password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    access_token = create_token({"sub": user.email})
-    # Кешування користувача у Redis
+    # Прогріваємо кеш користувача, щоб перший запит із токеном не йшов у БД
+    await user_cache.set_user(user)
+    return create_token_pair(user.email)
+
+@router.post("/refresh", response_model=schemas.TokenPair)
+async def refresh(data: schemas.RefreshRequest):
+    """
+    Видає нову пару токенів за refresh-токеном (ротація).
+
+    Кожен refresh-токен одноразовий: після використання його ``jti``
+    відкликається. Повторне використання вже використаного токена
+    означає, що його могли викрасти, тому відкликається вся сесія.
+
+    Args:
+        data (schemas.RefreshRequest): Refresh-токен.
+
+    Returns:
+        schemas.TokenPair: Нова пара токенів тієї самої сесії.
+
+    Raises:
+        HTTPException: Якщо токен недійсний, прострочений, відкликаний або вже використаний.
+    """
+    try:
+        payload = decode_token(data.refresh_token)
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    if payload.get("type") != "refresh" or not payload.get("sid"):
+        raise HTTPException(status_code=401, detail="Invalid token type")
+    # Відкликаний або вже використаний refresh-токен: відкликаємо всю сесію
+    if await revocations.is_revoked(payload) or not await revocations.revoke(payload["jti"], payload["exp"]):
+        await revocations.revoke(payload["sid"], time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+        raise HTTPException(status_code=401, detail="Token revoked")
+    return create_token_pair(payload["sub"], sid=payload["sid"])
+
+@router.post("/logout")
+async def logout(token: str = Depends(oauth2_scheme)):
+    """
+    Завершує сесію поточного токена доступу.
+
+    Відкликається ``sid`` сесії, тож одразу стають недійсними і токен
+    доступу, і всі refresh-токени цієї сесії на всіх воркерах.
+
+    Args:
+        token (str): JWT-токен із заголовку `Authorization`.
+
+    Returns:
+        dict: Повідомлення про вихід.
+
+    Raises:
+        HTTPException: Якщо токен недійсний.
+    """
     try:
-        redis_client.set(f"user:{user.id}", user.email, ex=REDIS_TTL)
-    except Exception:
-        pass
-    return {"access_token": access_token, "token_type": "bearer"}
+        payload = decode_token(token)
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    if payload.get("sid"):
+        await revocations.revoke(payload["sid"], time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+    elif payload.get("jti"):
+        await revocations.revoke(payload["jti"], payload["exp"])
+    return {"message": "Logged out"}
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> models.User:
     """
     Отримує поточного користувача за JWT-токеном.
 
+    Відкликання перевіряється за локальним дзеркалом `revocations`
+    (без звернень до БД). Користувач шукається спершу в `user_cache`
+    (локально та в Redis), і лише при промаху — у базі даних. Результат призначений лише
+    для читання: знімок із кешу не прив’язаний до сесії.
+
+    Після автентифікації сесія запиту маршрутизується з урахуванням
+    read-your-writes (`replica_set.bind_user`).
+
     Args:
         token (str): JWT-токен із заголовку `Authorization`.
-        db (Session): Сесія бази даних.
+        db (AsyncSession): Сесія бази даних.
 
     Returns:
         models.User: Об'єкт користувача з бази даних.
 
     Raises:
-        HTTPException: Якщо токен недійсний, прострочений або користувача не знайдено.
+        HTTPException: Якщо токен недійсний, прострочений, відкликаний або користувача не знайдено.
     """
     try:
         payload = decode_token(token)
         email: str = payload.get("sub")
-        if not email:
+        # Токени підтвердження, скидання пароля та refresh-токени не дають доступу до API
+        if not email or payload.get("type", "access") != "access":
             raise HTTPException(status_code=401, detail="Invalid token")
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
-    user = crud.get_user_by_email(db, email=email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    if await revocations.is_revoked(payload):
+        raise HTTPException(status_code=401, detail="Token revoked")
+    user = await user_cache.get_user(email)
+    if user is None:
+        user = await crud.get_user_by_email(db, email=email)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        await user_cache.set_user(user)
+    await replica_set.bind_user(db, user.id)
     return user
 
 @router.post("/register", response_model=schemas.UserOut)
-def register(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(user_in: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Реєстрація нового користувача.
 
-    Створює нового користувача, хешує пароль та надсилає лист
+    Створює нового користувача, хешує пароль та ставить у чергу лист
     із підтвердженням на email.
 
     Args:
         user_in (schemas.UserCreate): Дані нового користувача.
-        db (Session): Сесія бази даних.
+        db (AsyncSession): Сесія бази даних.
 
     Returns:
         schemas.UserOut: Створений користувач.
@@ -142,30 +240,39 @@ def register(user_in: schemas.UserCreate, db: Session = Depends(get_db)):
     Raises:
         HTTPException: Якщо користувач уже існує.
     """
-    if crud.get_user_by_email(db, email=user_in.email):
+    if await crud.get_user_by_email(db, email=user_in.email):
         raise HTTPException(status_code=400, detail="User already exists")
-    hashed = crud.get_password_hash(user_in.password) if hasattr(crud, "get_password_hash") else crud.get_password_hash(user_in.password)
-    # створити підпис користувача очікує хешований пароль
-    new_user = crud.create_user(db, email=user_in.email, hashed_password=hashed) if "hashed_password" in crud.create_user.__code__.co_varnames else crud.create_user(db, email=user_in.email, hashed_password=hashed)  # fallback
-    # отже, використовуйте нашого створеного користувача: почта, пароль, ім'я.
-    # Якщо підпис вашого crud.create_user відрізняється, відкоригуйте відповідно
-    # надіслати лист для підтвердження
-    token = create_token({"sub": new_user.email, "type": "verify"}, expires_delta=timedelta(hours=1))
-    send_verification_email(new_user.email, token)
-    return new_user
+    hashed = await crud.get_password_hash(user_in.password)
+    # користувач і лист для підтвердження фіксуються однією транзакцією
+    token = create_token({"sub": user_in.email, "type": "verify"}, expires_delta=timedelta(hours=1))
+    return await crud.register_user(db, user_in.email, hashed, token)
 
 @router.get("/health")
 async def health_check():
     return {"status": "ok"}
 
+@router.get("/jwks.json")
+async def jwks(response: Response):
+    """
+    Публічні ключі для перевірки токенів іншими сервісами (JWK Set).
+
+    Для асиметричних алгоритмів (RS256, ES256, EdDSA) містить поточний
+    публічний ключ з ``kid`` із заголовка токенів; для HS256 список порожній.
+
+    Returns:
+        dict: ``{"keys": [...]}``.
+    """
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return tokens.jwks()
+
 @router.get("/verify")
-def verify_email(token: str, db: Session = Depends(get_db)):
+async def verify_email(token: str, db: AsyncSession = Depends(get_db)):
     """
     Підтвердження електронної пошти користувача.
 
     Args:
         token (str): JWT-токен із посилання підтвердження.
-        db (Session): Сесія бази даних.
+        db (AsyncSession): Сесія бази даних.
 
     Returns:
         dict: Повідомлення про успішну верифікацію.
@@ -179,10 +286,11 @@ def verify_email(token: str, db: Session = Depends(get_db)):
         if payload.get("type") != "verify":
             raise HTTPException(status_code=400, detail="Invalid token type")
         email = payload.get("sub")
-        user = crud.get_user_by_email(db, email=email)
+        user = await crud.get_user_by_email(db, email=email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        crud.verify_user_email(db, user)
+        await crud.verify_user_email(db, user)
+        await user_cache.invalidate_user(user)
         return {"message": "Email verified"}
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=400, detail="Token expired")
@@ -190,51 +298,60 @@ def verify_email(token: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Invalid token")
 
 @router.post("/forgot-password")
-def forgot_password(data: schemas.PasswordResetRequest, db: Session = Depends(get_db)):
+async def forgot_password(data: schemas.PasswordResetRequest, db: AsyncSession = Depends(get_db)):
     """
     Запит на скидання пароля.
 
-    Користувач вводить свій email, система надсилає лист
+    Користувач вводить свій email, система ставить у чергу лист
     із посиланням для зміни пароля.
 
     Args:
         data (schemas.PasswordResetRequest): Email користувача.
-        db (Session): Сесія бази даних.
+        db (AsyncSession): Сесія бази даних.
 
     Returns:
         dict: Повідомлення про успішну відправку листа.
     """
-    user = crud.get_user_by_email(db, data.email)
+    user = await crud.get_user_by_email(db, data.email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     token = create_token({"sub": user.email, "type": "reset"}, expires_delta=timedelta(hours=1))
-    send_reset_email(user.email, token)
+    await crud.request_password_reset(db, user.email, token)
     return {"message": "Password reset email sent"}
 
 @router.post("/reset-password")
-def reset_password(data: schemas.PasswordResetConfirm, db: Session = Depends(get_db)):
+async def reset_password(data: schemas.PasswordResetConfirm, db: AsyncSession = Depends(get_db)):
     """
     Оновлення пароля користувача після запиту на скидання.
 
+    Токен скидання одноразовий, а всі токени користувача, видані до зміни
+    пароля (зокрема refresh-токени інших сесій), відкликаються.
+
     Args:
         data (schemas.PasswordResetConfirm): Новий пароль і токен підтвердження.
-        db (Session): Сесія бази даних.
+        db (AsyncSession): Сесія бази даних.
 
     Returns:
         dict: Повідомлення про успішну зміну пароля.
 
     Raises:
-        HTTPException: Якщо токен недійсний або користувач не знайдений.
+        HTTPException: Якщо токен недійсний, уже використаний або користувач не знайдений.
     """
     try:
         payload = decode_token(data.token)
         if payload.get("type") != "reset":
             raise HTTPException(status_code=400, detail="Invalid token type")
+        if await revocations.is_revoked(payload):
+            raise HTTPException(status_code=400, detail="Token already used")
         email = payload.get("sub")
-        user = crud.get_user_by_email(db, email=email)
+        user = await crud.get_user_by_email(db, email=email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
-        crud.update_user_password(db, user, data.new_password)
+        if payload.get("jti") and not await revocations.revoke(payload["jti"], payload["exp"]):
+            raise HTTPException(status_code=400, detail="Token already used")
+        await crud.update_user_password(db, user, data.new_password)
+        await revocations.revoke_subject(user.email)
+        await user_cache.invalidate_user(user)
         return {"message": "Password updated"}
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=400, detail="Token expired")
@@ -5,22 +5,51 @@
 створення, перегляд, оновлення, видалення контактів, а також
 завантаження аватарів користувачів.
 
-Використовується FastAPI, SQLAlchemy, Cloudinary для зберігання зображень
-та Redis (через rate limiter) для обмеження запитів.
+Використовується FastAPI, SQLAlchemy, конвеєр аватарів (`app.avatars`) для зберігання зображень
+та Redis (через `app.rate_limit.rate_limit.limiter`) для обмеження запитів
+кожного користувача.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
-from sqlalchemy.orm import Session
-from typing import List
-from app.crud import crud
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, UploadFile, File, Request
+from fastapi.responses import Response, StreamingResponse
+import hashlib
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from app.crud import async_crud as crud
+from app.crud.crud import CONTACT_COLUMNS, decode_cursor
 from app.database.database import get_db
 from app.models import models
 from app.routes.auth import get_current_user
 from app.rate_limit.rate_limit import limiter
-from app.cloudinary_utils.cloudinary_utils import upload_avatar_file
+from app.avatars.pipeline import avatar_pipeline
+from app.config.config import AVATAR_MAX_BYTES
+from app.redis_cache import user_cache
 from app.schemas import schemas
+from app.utils import contacts_io
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+#: Розмір сторінки списку контактів за замовчуванням.
+DEFAULT_PAGE_SIZE = 50
+
+#: Максимально дозволений розмір сторінки списку контактів.
+MAX_PAGE_SIZE = 500
+
+#: Скільки записів імпорту вставляти однією транзакцією.
+BULK_CHUNK_SIZE = 1000
+
+#: Скільки помилок записів повертати у відповіді імпорту.
+MAX_REPORTED_ERRORS = 1000
+
+#: Скільки контактів читати з БД за один крок експорту та NDJSON-потоку.
+EXPORT_BATCH_SIZE = 1000
+
+#: MIME-тип потокової відповіді зі списком контактів.
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+#: Назви колонок у «швидких» відповідях (відповідають `crud.CONTACT_COLUMNS`).
+CONTACT_FIELDS = tuple(column.key for column in CONTACT_COLUMNS)
+
 @router.get("/health")
 async def health_check():
     return {"status": "ok"}
@@ -35,40 +64,355 @@ def ping():
     """
     return {"message": "Contacts OK"}
 
-@router.get("/", response_model=List[schemas.ContactOut])
-def list_contacts(
-    db: Session = Depends(get_db),
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Перевіряє заголовок `If-None-Match` (слабке порівняння, RFC 9110).
+
+    Args:
+        if_none_match (Optional[str]): Значення заголовка запиту.
+        etag (str): Поточний ETag ресурсу.
+
+    Returns:
+        bool: True, якщо клієнт уже має актуальну версію ресурсу.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def list_etag(request: Request, user_id: int, version: int) -> str:
+    """
+    Будує ETag списку контактів.
+
+    ETag залежить від версії колекції користувача та від параметрів
+    запиту (сторінка, фільтри, режим відповіді), тож різні подання
+    тієї самої колекції мають різні ETag.
+
+    Args:
+        request (Request): Поточний запит.
+        user_id (int): Ідентифікатор користувача.
+        version (int): Версія колекції контактів.
+
+    Returns:
+        str: Слабкий ETag.
+    """
+    variant = f"{sorted(request.query_params.multi_items())}|{request.headers.get('accept', '')}"
+    digest = hashlib.sha1(variant.encode()).hexdigest()[:12]
+    return f'W/"{user_id}-{version}-{digest}"'
+
+
+@router.get("/", response_model=schemas.ContactPage)
+async def list_contacts(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    sort: Literal["id", "name"] = "id",
+    name: Optional[str] = None,
+    email: Optional[str] = None,
+    phone: Optional[str] = None,
+    fast: bool = False,
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
-    Отримує список контактів для поточного користувача.
+    Отримує сторінку контактів поточного користувача.
+
+    Використовується keyset-пагінація: щоб отримати наступну сторінку,
+    передайте `next_cursor` із відповіді в параметр `after`.
+
+    Додаткові режими для великих адресних книг:
+
+    - ``fast=true`` — колонки вибираються як кортежі, без ORM-об’єктів
+      і валідації Pydantic, відповідь кодується orjson;
+    - ``Accept: application/x-ndjson`` — усі контакти (або `limit` штук,
+      якщо його вказано) передаються потоком, по одному JSON-об’єкту
+      в рядку, прямо з серверного курсора. Час до першого байта
+      та пікова пам’ять не залежать від кількості контактів.
+
+    Відповідь містить ETag, що залежить від версії колекції контактів.
+    Якщо клієнт передає його в `If-None-Match` і колекція не змінилась,
+    повертається 304 без запиту списку та серіалізації.
 
     Args:
-        db (Session): Сесія бази даних.
+        request (Request): Запит (для заголовків `Accept` та `If-None-Match`).
+        response (Response): Відповідь (для заголовка `ETag`).
+        limit (Optional[int]): Кількість контактів на сторінці (1..MAX_PAGE_SIZE,
+            за замовчуванням DEFAULT_PAGE_SIZE).
+        after (Optional[str]): Курсор попередньої сторінки.
+        sort (str): Сортування: "id" або "name".
+        name (Optional[str]): Фільтр за частиною імені.
+        email (Optional[str]): Фільтр за частиною email.
+        phone (Optional[str]): Фільтр за частиною номера телефону.
+        fast (bool): Увімкнути швидкий режим серіалізації.
+        db (AsyncSession): Сесія бази даних.
         current_user (models.User): Поточний авторизований користувач.
 
     Returns:
-        List[schemas.ContactOut]: Список об’єктів контактів користувача.
+        schemas.ContactPage: Контакти сторінки та курсор наступної сторінки
+        (або потік NDJSON, або 304 Not Modified).
+
+    Raises:
+        HTTPException: Якщо курсор недійсний.
+    """
+    filters = {"after": after, "sort": sort, "name": name, "email": email, "phone": phone}
+    version = await crud.get_contacts_version(db, current_user.id)
+    etag = list_etag(request, current_user.id, version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    headers = {"ETag": etag}
+    try:
+        if after:
+            decode_cursor(after, sort)
+        if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+            return StreamingResponse(
+                _ndjson_rows(db, current_user.id, limit, filters), media_type=NDJSON_MEDIA_TYPE, headers=headers
+            )
+        if fast:
+            rows, next_cursor = await crud.get_contact_rows_page(
+                db, current_user.id, limit=limit or DEFAULT_PAGE_SIZE, **filters
+            )
+            items = [dict(zip(CONTACT_FIELDS, row)) for row in rows]
+            return Response(
+                orjson.dumps({"items": items, "next_cursor": next_cursor}),
+                media_type="application/json",
+                headers=headers,
+            )
+        items, next_cursor = await crud.get_contacts_page(
+            db, current_user.id, limit=limit or DEFAULT_PAGE_SIZE, **filters
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    response.headers.update(headers)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def _ndjson_rows(db, user_id: int, limit: Optional[int], filters: dict):
+    """Кодує потік рядків контактів у NDJSON, зупиняючись після `limit` рядків."""
+    remaining = limit
+    async for batch in crud.stream_contact_rows(db, user_id, batch_size=EXPORT_BATCH_SIZE, **filters):
+        if remaining is not None:
+            batch = batch[:remaining]
+            remaining -= len(batch)
+        yield b"".join(orjson.dumps(dict(zip(CONTACT_FIELDS, row))) + b"\n" for row in batch)
+        if remaining == 0:
+            break
+
+
+@router.get("/search", response_model=List[schemas.ContactOut])
+async def search_contacts(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Шукає контакти поточного користувача за частиною імені або email.
+
+    Args:
+        q (str): Рядок пошуку.
+        limit (int): Максимальна кількість результатів.
+        db (AsyncSession): Сесія бази даних.
+        current_user (models.User): Поточний користувач.
+
+    Returns:
+        List[schemas.ContactOut]: Знайдені контакти, найрелевантніші першими.
+    """
+    return await crud.search_contacts(db, current_user.id, q, limit=limit)
+
+
+@router.get("/changes", response_model=schemas.ContactChanges)
+async def contact_changes(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Повертає контакти, створені, змінені або видалені після токена `since`.
+
+    Перший запит робиться без `since` (повна синхронізація), далі клієнт
+    передає `next_token` з попередньої відповіді. Якщо `has_more` = true,
+    запит слід повторити з новим токеном.
+
+    Args:
+        since (Optional[str]): Токен попередньої синхронізації.
+        limit (int): Максимальна кількість змін у відповіді.
+        db (AsyncSession): Сесія бази даних.
+        current_user (models.User): Поточний користувач.
+
+    Returns:
+        schemas.ContactChanges: Зміни, новий токен та ознака наявності інших змін.
+
+    Raises:
+        HTTPException: Якщо токен недійсний.
+    """
+    try:
+        rows, next_token, has_more = await crud.get_contact_changes(db, current_user.id, since=since, limit=limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid token")
+    changes = [
+        {"id": c.id, "deleted": True} if c.deleted_at else {"id": c.id, "deleted": False, "contact": c}
+        for c in rows
+    ]
+    return {"changes": changes, "next_token": next_token, "has_more": has_more}
+
+
+@router.get("/avatar-jobs/{job_id}", response_model=schemas.AvatarJobOut)
+async def get_avatar_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Повертає стан фонового завдання завантаження аватара.
+
+    Args:
+        job_id (str): Ідентифікатор завдання з відповіді `PUT /contacts/{id}/avatar`.
+        db (AsyncSession): Сесія бази даних.
+        current_user (models.User): Поточний користувач.
+
+    Returns:
+        schemas.AvatarJobOut: Стан завдання та URL копій аватара.
+
+    Raises:
+        HTTPException: Якщо завдання не знайдено.
+    """
+    job = await crud.get_avatar_job(db, job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Avatar job not found")
+    return job
+
+
+@router.post("/bulk", response_model=schemas.BulkImportResult, dependencies=[Depends(limiter.limit("contacts:bulk"))])
+async def bulk_import(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Масово імпортує контакти з CSV або NDJSON.
+
+    Тіло запиту читається потоково (Content-Type `text/csv` або
+    `application/x-ndjson`), записи валідуються через `ContactCreate`
+    і вставляються пакетами по `BULK_CHUNK_SIZE` — кожен пакет окремою
+    транзакцією. Некоректні записи пропускаються і повертаються у `errors`.
+
+    Args:
+        request (Request): Запит із потоковим тілом.
+        db (AsyncSession): Сесія бази даних.
+        current_user (models.User): Поточний користувач.
+
+    Returns:
+        schemas.BulkImportResult: Кількість вставлених і відхилених записів та помилки.
+
+    Raises:
+        HTTPException: Якщо формат тіла не підтримується.
+    """
+    fmt = contacts_io.import_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Expected text/csv or application/x-ndjson")
+    inserted, failed, errors, chunk = 0, 0, [], []
+    async for row_no, data, row_errors in contacts_io.iter_records(request.stream(), fmt):
+        if row_errors:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": row_no, "errors": row_errors})
+            continue
+        chunk.append(data)
+        if len(chunk) >= BULK_CHUNK_SIZE:
+            inserted += await crud.bulk_create_contacts(db, chunk, current_user.id)
+            chunk = []
+    inserted += await crud.bulk_create_contacts(db, chunk, current_user.id)
+    return {"inserted": inserted, "failed": failed, "errors": errors}
+
+
+@router.post("/batch", response_model=schemas.ContactBatchResult, dependencies=[Depends(limiter.limit("contacts:batch"))])
+async def batch_contacts(
+    batch: schemas.ContactBatch,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Виконує пакет створень, оновлень і видалень контактів однією транзакцією.
+
+    Належність контактів перевіряється одним запитом, а кожен тип
+    операцій виконується одним SQL-оператором (`crud.apply_contact_batch`).
+    Операції з чужими або неіснуючими контактами отримують статус 404,
+    повторне згадування контакту — 409. З ``atomic=true`` за наявності
+    таких помилок не виконується жодна операція (решта отримують 424).
+
+    Args:
+        batch (schemas.ContactBatch): Операції та режим «все або нічого».
+        db (AsyncSession): Сесія бази даних.
+        current_user (models.User): Поточний користувач.
+
+    Returns:
+        schemas.ContactBatchResult: Результати кожної операції та ознака коміту.
+    """
+    results, committed = await crud.apply_contact_batch(db, current_user.id, batch.operations, batch.atomic)
+    failed = sum(1 for r in results if r["status"] >= 400)
+    return {"committed": committed, "applied": len(results) - failed, "failed": failed, "results": results}
+
+
+@router.get("/export")
+async def export_contacts(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Потоково експортує всі контакти користувача у CSV або NDJSON.
+
+    Контакти читаються з серверного курсора пакетами по `EXPORT_BATCH_SIZE`
+    і відправляються клієнту одразу, тож повний список не
+    матеріалізується ні в БД-сесії, ні у відповіді.
+
+    Args:
+        format (str): "ndjson" (за замовчуванням) або "csv".
+        db (AsyncSession): Сесія бази даних.
+        current_user (models.User): Поточний користувач.
+
+    Returns:
+        StreamingResponse: Потік контактів.
     """
-    return crud.get_contacts(db, current_user.id)
+    user_id = current_user.id
+
+    async def body():
+        if format == "csv":
+            yield contacts_io.encode_rows([], format, header=True)
+        async for batch in crud.stream_contact_rows(db, user_id, batch_size=EXPORT_BATCH_SIZE):
+            rows = ({f: row._mapping[f] for f in contacts_io.EXPORT_FIELDS} for row in batch)
+            yield contacts_io.encode_rows(rows, format)
+
+    return StreamingResponse(
+        body(),
+        media_type=contacts_io.EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format}"'},
+    )
 
 
 # ✅ Єдиний правильний POST-ендпоінт
-@router.post("/", response_model=schemas.ContactOut, status_code=status.HTTP_201_CREATED)
-@limiter.limit("5/minute")
-def create_contact(
-    request: Request,  # 🔹 обов’язково потрібно для slowapi
+@router.post(
+    "/",
+    response_model=schemas.ContactOut,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limiter.limit("contacts:create"))],
+)
+async def create_contact(
     contact: schemas.ContactCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
     Створює новий контакт для поточного користувача.
 
     Args:
-        request (Request): Об’єкт запиту (використовується для ліміту запитів).
         contact (schemas.ContactCreate): Дані нового контакту.
-        db (Session): Сесія бази даних.
+        db (AsyncSession): Сесія бази даних.
         current_user (models.User): Поточний користувач.
 
     Returns:
@@ -77,14 +421,52 @@ def create_contact(
     Raises:
         HTTPException: Якщо перевищено ліміт запитів.
     """
-    return crud.create_contact(db, contact, current_user.id)
+    return await crud.create_contact(db, contact, current_user.id)
+
+
+@router.get("/{contact_id}", response_model=schemas.ContactOut)
+async def get_contact(
+    contact_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Отримує один контакт поточного користувача.
+
+    Відповідь містить ETag за часом останньої зміни контакту;
+    при збігу з `If-None-Match` повертається 304 без тіла.
+
+    Args:
+        contact_id (int): Ідентифікатор контакту.
+        request (Request): Запит (для заголовка `If-None-Match`).
+        response (Response): Відповідь (для заголовка `ETag`).
+        db (AsyncSession): Сесія бази даних.
+        current_user (models.User): Поточний користувач.
+
+    Returns:
+        schemas.ContactOut: Контакт (або 304 Not Modified).
+
+    Raises:
+        HTTPException: Якщо контакт не знайдено.
+    """
+    contact = await crud.get_contact(db, contact_id, current_user.id)
+    if not contact:
+        raise HTTPException(status_code=404, detail="Not found")
+    stamp = contact.updated_at.timestamp() if contact.updated_at else 0
+    etag = f'W/"{contact.id}-{stamp:.6f}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return contact
 
 
 @router.put("/{contact_id}", response_model=schemas.ContactOut)
-def update_contact(
+async def update_contact(
     contact_id: int,
     updates: schemas.ContactUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
@@ -93,7 +475,7 @@ def update_contact(
     Args:
         contact_id (int): Ідентифікатор контакту.
         updates (schemas.ContactUpdate): Дані для оновлення.
-        db (Session): Сесія бази даних.
+        db (AsyncSession): Сесія бази даних.
         current_user (models.User): Поточний користувач.
 
     Returns:
@@ -102,16 +484,16 @@ def update_contact(
     Raises:
         HTTPException: Якщо контакт не знайдено.
     """
-    contact = crud.get_contact(db, contact_id, current_user.id)
+    contact = await crud.get_contact(db, contact_id, current_user.id)
     if not contact:
         raise HTTPException(status_code=404, detail="Not found")
-    return crud.update_contact(db, contact, updates)
+    return await crud.update_contact(db, contact, updates)
 
 
 @router.delete("/{contact_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_contact(
+async def delete_contact(
     contact_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
@@ -119,7 +501,7 @@ def delete_contact(
 
     Args:
         contact_id (int): Ідентифікатор контакту.
-        db (Session): Сесія бази даних.
+        db (AsyncSession): Сесія бази даних.
         current_user (models.User): Поточний користувач.
 
     Returns:
@@ -128,32 +510,56 @@ def delete_contact(
     Raises:
         HTTPException: Якщо контакт не знайдено.
     """
-    contact = crud.get_contact(db, contact_id, current_user.id)
+    contact = await crud.get_contact(db, contact_id, current_user.id)
     if not contact:
         raise HTTPException(status_code=404, detail="Not found")
-    crud.delete_contact(db, contact)
+    await crud.delete_contact(db, contact)
     return None
 
 
-@router.put("/{contact_id}/avatar", status_code=status.HTTP_200_OK)
-def upload_avatar(
+@router.put("/{contact_id}/avatar", status_code=status.HTTP_202_ACCEPTED)
+async def upload_avatar(
     contact_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user),
 ):
     """
-    Завантажує аватар користувача у Cloudinary
-    та оновлює URL аватару в базі даних.
+    Приймає новий аватар користувача для фонового завантаження.
+
+    Файл потоково хешується (SHA-256): якщо такий самий вміст уже
+    завантажено, повторно використовуються наявні копії. Інакше
+    зображення перевіряється та зменшується до фіксованих розмірів
+    у пулі процесів, а вивантаження у сховище та оновлення URL аватара
+    виконується фоновим завданням. Стан завдання доступний за
+    `GET /contacts/avatar-jobs/{job_id}`.
 
     Args:
+        contact_id (int): Ідентифікатор контакту (не використовується — аватар належить користувачу).
+        background_tasks (BackgroundTasks): Фонові завдання відповіді.
         file (UploadFile): Файл зображення, який завантажується.
-        db (Session): Сесія бази даних.
+        db (AsyncSession): Сесія бази даних.
         current_user (models.User): Поточний користувач.
 
     Returns:
-        dict: Посилання на завантажений аватар.
+        dict: Ідентифікатор завдання, його стан і посилання на перевірку стану.
+
+    Raises:
+        HTTPException: Якщо файл завеликий або не є допустимим зображенням.
     """
-    url = upload_avatar_file(file.file)
-    crud.update_user_avatar(db, current_user, url)
-    return {"avatar_url": url}
+    digest, size = await avatar_pipeline.digest(file, AVATAR_MAX_BYTES)
+    if size > AVATAR_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+    if await crud.get_avatar_blob(db, digest) is not None:
+        # Такий самий вміст уже завантажено — лише посилаємося на наявні копії
+        job = await crud.create_avatar_job(db, current_user.id)
+        background_tasks.add_task(avatar_pipeline.finish, job.id, digest)
+    else:
+        try:
+            copies = await avatar_pipeline.prepare(await file.read())
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        job = await crud.create_avatar_job(db, current_user.id)
+        background_tasks.add_task(avatar_pipeline.upload, job.id, digest, copies)
+    return {"job_id": job.id, "status": job.status, "status_url": f"/contacts/avatar-jobs/{job.id}"}
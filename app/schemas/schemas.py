@@ -7,9 +7,9 @@
 Класи описують структуру запитів і відповідей для користувачів та контактів.
 """
 
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
+from typing import Annotated, Dict, List, Literal, Optional, Union
 
 # ---------- Users ----------
 
@@ -87,6 +87,30 @@ class PasswordResetConfirm(BaseModel):
     """
     token: str
     new_password: str
+
+class TokenPair(BaseModel):
+    """
+    Схема відповіді входу та оновлення токенів.
+
+    Attributes:
+        access_token (str): Короткоживучий токен доступу.
+        refresh_token (str): Одноразовий токен для отримання нової пари (ротується).
+        token_type (str): Тип токена (``bearer``).
+        expires_in (int): Час життя токена доступу, секунд.
+    """
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+class RefreshRequest(BaseModel):
+    """
+    Схема запиту оновлення токенів та виходу.
+
+    Attributes:
+        refresh_token (str): Refresh-токен, отриманий під час входу або попереднього оновлення.
+    """
+    refresh_token: str
     
 # ---------- Contacts ----------
 
@@ -141,3 +165,172 @@ class ContactOut(ContactBase):
 
     class Config:
         from_attributes = True
+
+class ContactPage(BaseModel):
+    """
+    Схема сторінки контактів для keyset-пагінації.
+
+    Attributes:
+        items (List[ContactOut]): Контакти поточної сторінки.
+        next_cursor (Optional[str]): Токен для параметра `after` наступного запиту;
+            None, якщо це остання сторінка.
+    """
+    items: List[ContactOut]
+    next_cursor: Optional[str] = None
+
+class BulkRowError(BaseModel):
+    """
+    Помилка одного запису масового імпорту.
+
+    Attributes:
+        row (int): Номер запису у файлі (з 1, без рядка заголовка CSV).
+        errors (List[str]): Повідомлення валідації.
+    """
+    row: int
+    errors: List[str]
+
+class BulkImportResult(BaseModel):
+    """
+    Результат масового імпорту контактів.
+
+    Attributes:
+        inserted (int): Кількість створених контактів.
+        failed (int): Кількість відхилених записів.
+        errors (List[BulkRowError]): Помилки записів (не більше ліміту відповіді).
+    """
+    inserted: int
+    failed: int
+    errors: List[BulkRowError]
+
+class BatchCreate(BaseModel):
+    """
+    Операція пакета: створення контакту.
+
+    Attributes:
+        op (str): "create".
+        data (ContactCreate): Дані нового контакту.
+    """
+    op: Literal["create"]
+    data: ContactCreate
+
+class BatchUpdate(BaseModel):
+    """
+    Операція пакета: часткове оновлення контакту.
+
+    Attributes:
+        op (str): "update".
+        id (int): Ідентифікатор контакту.
+        data (ContactUpdate): Змінені поля.
+    """
+    op: Literal["update"]
+    id: int
+    data: ContactUpdate
+
+class BatchDelete(BaseModel):
+    """
+    Операція пакета: видалення контакту.
+
+    Attributes:
+        op (str): "delete".
+        id (int): Ідентифікатор контакту.
+    """
+    op: Literal["delete"]
+    id: int
+
+#: Операція пакета (розрізняється за полем `op`).
+BatchOperation = Annotated[Union[BatchCreate, BatchUpdate, BatchDelete], Field(discriminator="op")]
+
+class ContactBatch(BaseModel):
+    """
+    Запит пакетної зміни контактів.
+
+    Attributes:
+        operations (List[BatchOperation]): Операції (кожен контакт — не більше одного разу).
+        atomic (bool): True — «все або нічого»: якщо хоча б одна операція
+            не може бути виконана, не виконується жодна.
+    """
+    operations: List[BatchOperation] = Field(min_length=1, max_length=1000)
+    atomic: bool = False
+
+class BatchOperationResult(BaseModel):
+    """
+    Результат однієї операції пакета.
+
+    Attributes:
+        index (int): Позиція операції у запиті (з 0).
+        op (str): Тип операції.
+        status (int): HTTP-статус операції (201, 200, 204, 404, 409 або 424 — не виконано
+            через помилку іншої операції атомарного пакета).
+        id (Optional[int]): Ідентифікатор контакту.
+        contact (Optional[ContactOut]): Стан контакту після створення або оновлення.
+        error (Optional[str]): Текст помилки.
+    """
+    index: int
+    op: str
+    status: int
+    id: Optional[int] = None
+    contact: Optional[ContactOut] = None
+    error: Optional[str] = None
+
+class ContactBatchResult(BaseModel):
+    """
+    Результат пакетної зміни контактів.
+
+    Attributes:
+        committed (bool): Чи зафіксовано зміни.
+        applied (int): Кількість виконаних операцій.
+        failed (int): Кількість невиконаних операцій.
+        results (List[BatchOperationResult]): Результати в порядку операцій запиту.
+    """
+    committed: bool
+    applied: int
+    failed: int
+    results: List[BatchOperationResult]
+
+class ContactChange(BaseModel):
+    """
+    Одна зміна у стрічці синхронізації контактів.
+
+    Attributes:
+        id (int): Ідентифікатор контакту.
+        deleted (bool): True, якщо контакт видалено.
+        contact (Optional[ContactOut]): Поточний стан контакту (None для видалених).
+    """
+    id: int
+    deleted: bool
+    contact: Optional[ContactOut] = None
+
+class ContactChanges(BaseModel):
+    """
+    Відповідь інкрементальної синхронізації контактів.
+
+    Attributes:
+        changes (List[ContactChange]): Зміни після переданого токена.
+        next_token (str): Токен для наступного запиту `since`.
+        has_more (bool): True, якщо є ще зміни — запит варто повторити одразу.
+    """
+    changes: List[ContactChange]
+    next_token: str
+    has_more: bool
+
+class AvatarJobOut(BaseModel):
+    """
+    Стан фонового завдання завантаження аватара.
+
+    Attributes:
+        id (str): Ідентифікатор завдання.
+        status (str): "pending", "done" або "failed".
+        urls (Optional[Dict[str, str]]): Розмір у пікселях -> URL копії аватара.
+        error (Optional[str]): Текст помилки для статусу "failed".
+        created_at (datetime): Час створення завдання.
+        finished_at (Optional[datetime]): Час завершення завдання.
+    """
+    id: str
+    status: str
+    urls: Optional[Dict[str, str]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
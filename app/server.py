@@ -0,0 +1,234 @@
+"""
+Модуль `server.py`
+
+Виробничий запуск застосунку кількома воркерами uvicorn::
+
+    python -m app.database.migrate
+    python -m app.server --host 0.0.0.0 --port 8000
+
+- кількість воркерів — `WEB_CONCURRENCY` або кількість доступних процесу CPU;
+- цикл подій uvloop і HTTP-парсер httptools задаються явно, тож сервер
+  не відкотиться мовчки до asyncio/h11, якщо їх не встановлено;
+- застосунок імпортується в головному процесі до створення воркерів
+  (``fork``): код і дані модулів спільні між воркерами (copy-on-write),
+  а помилка імпорту чи конфігурації зупиняє запуск одразу;
+- головний процес прив’язує сокет і передає його воркерам, а воркер,
+  що впав, перезапускає; перед запуском воркерів він очищає
+  `METRICS_MULTIPROC_DIR` від знімків метрик попереднього запуску;
+- SIGTERM/SIGINT передаються воркерам: кожен перестає приймати з’єднання,
+  дочікується поточних запитів (не довше `GRACEFUL_TIMEOUT` секунд)
+  і виконує завершення `lifespan`. Воркери, що не завершилися вчасно,
+  отримують SIGKILL.
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from app.config.config import GRACEFUL_TIMEOUT, HOST, METRICS_MULTIPROC_DIR, PORT, WEB_CONCURRENCY
+from app.metrics import multiprocess
+
+logger = logging.getLogger("app.server")
+
+#: Запас часу понад `GRACEFUL_TIMEOUT` на завершення `lifespan`, секунд.
+SHUTDOWN_MARGIN = 5.0
+
+#: Воркер, що завершився швидше, перезапускається з паузою (захист від циклу падінь).
+MIN_WORKER_UPTIME = 1.0
+
+
+def cpu_count() -> int:
+    """
+    Повертає кількість CPU, доступних процесу (з урахуванням affinity/cgroups cpuset).
+
+    Returns:
+        int: Кількість CPU, не менше 1.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count(configured: int = WEB_CONCURRENCY) -> int:
+    """
+    Визначає кількість воркерів.
+
+    Args:
+        configured (int): Явне значення (`WEB_CONCURRENCY`); 0 — за кількістю CPU.
+
+    Returns:
+        int: Кількість воркерів.
+    """
+    return configured if configured > 0 else cpu_count()
+
+
+def build_config(host: str, port: int, graceful_timeout: float = GRACEFUL_TIMEOUT, access_log: bool = False) -> uvicorn.Config:
+    """
+    Імпортує застосунок і готує конфігурацію uvicorn.
+
+    Args:
+        host (str): Адреса прослуховування.
+        port (int): Порт.
+        graceful_timeout (float): Скільки секунд чекати на поточні запити після SIGTERM.
+        access_log (bool): Чи писати журнал доступу (метрики запитів збираються й без нього).
+
+    Returns:
+        uvicorn.Config: Конфігурація з uvloop, httptools та обов’язковим `lifespan`.
+    """
+    from app.main import app
+
+    return uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        lifespan="on",
+        timeout_graceful_shutdown=graceful_timeout,
+        access_log=access_log,
+        proxy_headers=True,
+    )
+
+
+class Supervisor:
+    """
+    Головний процес: створює воркерів через fork і керує їх життєвим циклом.
+
+    Attributes:
+        config (uvicorn.Config): Конфігурація воркерів (застосунок уже імпортовано).
+        workers (int): Кількість воркерів.
+        graceful_timeout (float): Час на завершення поточних запитів, секунд.
+        metrics_dir (str): Спільна директорія метрик воркерів (порожня — не використовується).
+    """
+
+    def __init__(
+        self,
+        config: uvicorn.Config,
+        workers: int,
+        graceful_timeout: float = GRACEFUL_TIMEOUT,
+        metrics_dir: str = METRICS_MULTIPROC_DIR,
+    ):
+        self.config = config
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.metrics_dir = metrics_dir
+        self.children: Dict[int, float] = {}
+        self.deadline: Optional[float] = None
+        self._socket: Optional[socket.socket] = None
+
+    def spawn(self) -> None:
+        """Створює воркера, що обслуговує спільний сокет."""
+        # Сигнали зупинки заблоковано на час fork: воркер не встигне виконати
+        # обробник головного процесу (`stop`) до того, як скине його
+        stop_signals = {signal.SIGTERM, signal.SIGINT}
+        signal.pthread_sigmask(signal.SIG_BLOCK, stop_signals)
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+            return
+        # Воркер: сигнали обробляє uvicorn (припинити прийом, дочекатися запитів, lifespan)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, stop_signals)
+        code = 0
+        try:
+            uvicorn.Server(self.config).run(sockets=[self._socket])
+        except BaseException:
+            logger.exception("Worker %s crashed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def stop(self, signum=None, frame=None) -> None:
+        """Передає SIGTERM воркерам і відкладає SIGKILL до кінця відведеного часу."""
+        if self.deadline is None:
+            logger.info("Shutting down %s workers, draining in-flight requests", len(self.children))
+            self.deadline = time.monotonic() + self.graceful_timeout + SHUTDOWN_MARGIN
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _reap(self) -> None:
+        """Прибирає завершених воркерів і перезапускає їх, якщо сервер не зупиняється."""
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            if started is None or self.deadline is not None:
+                continue
+            logger.warning("Worker %s exited with status %s, restarting", pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < MIN_WORKER_UPTIME:
+                time.sleep(MIN_WORKER_UPTIME)
+            self.spawn()
+
+    def run(self) -> None:
+        """Запускає воркерів і чекає, доки всі вони не завершаться після сигналу зупинки."""
+        self._socket = self.config.bind_socket()
+        # Знімки метрик попереднього запуску не потрапляють у суми нового
+        if self.metrics_dir:
+            multiprocess.clear_snapshots(self.metrics_dir)
+        # Об’єкти, створені під час імпорту, більше не чіпає GC — сторінки пам’яті
+        # лишаються спільними з воркерами, а не копіюються при першому проході збирача
+        gc.collect()
+        gc.freeze()
+        # Обробники ставляться до fork: SIGTERM під час запуску теж зупиняє
+        # вже створених воркерів, а не лишає їх сиротами на сокеті
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            if self.deadline is not None:
+                break
+            self.spawn()
+        logger.info("Started %s workers on %s:%s", len(self.children), self.config.host, self.config.port)
+        while self.children:
+            self._reap()
+            if self.deadline is not None and time.monotonic() > self.deadline:
+                for pid in list(self.children):
+                    logger.warning("Worker %s did not stop in time, killing it", pid)
+                    try:
+                        os.kill(pid, signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                self.deadline = float("inf")
+            time.sleep(0.1)
+        self._socket.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the contacts API with pre-forked uvicorn workers.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY, help="worker processes (0: one per CPU)")
+    parser.add_argument("--graceful-timeout", type=float, default=GRACEFUL_TIMEOUT,
+                        help="seconds to drain in-flight requests after SIGTERM")
+    parser.add_argument("--access-log", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(process)d %(levelname)s %(name)s: %(message)s")
+    config = build_config(args.host, args.port, args.graceful_timeout, args.access_log)
+    workers = worker_count(args.workers)
+    if workers == 1 or not hasattr(os, "fork"):
+        if METRICS_MULTIPROC_DIR:
+            multiprocess.clear_snapshots(METRICS_MULTIPROC_DIR)
+        uvicorn.Server(config).run()
+        return
+    Supervisor(config, workers, args.graceful_timeout).run()
+
+
+if __name__ == "__main__":
+    main()
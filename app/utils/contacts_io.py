@@ -0,0 +1,149 @@
+"""
+Модуль `contacts_io.py`
+
+Потокове читання та запис контактів у форматах CSV і NDJSON
+для масового імпорту (`POST /contacts/bulk`) та експорту (`GET /contacts/export`).
+
+Тіло запиту читається порціями в міру надходження, тому імпорт не тримає
+весь файл у пам’яті. CSV розбирається построково: поля з переносами
+рядків усередині лапок не підтримуються.
+"""
+
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.schemas import schemas
+
+#: Колонки CSV при імпорті та експорті.
+CSV_FIELDS = ("name", "email", "phone", "address")
+
+#: Колонки, що потрапляють в експорт.
+EXPORT_FIELDS = ("id",) + CSV_FIELDS
+
+#: MIME-типи, які приймає імпорт, і відповідні формати.
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+#: MIME-типи відповіді експорту.
+EXPORT_MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def import_format(content_type: Optional[str]) -> Optional[str]:
+    """
+    Визначає формат імпорту за заголовком Content-Type.
+
+    Args:
+        content_type (Optional[str]): Значення заголовка.
+
+    Returns:
+        Optional[str]: "csv", "ndjson" або None, якщо тип не підтримується.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return IMPORT_FORMATS.get(media_type)
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Розбиває потік байтів на текстові рядки.
+
+    Args:
+        stream (AsyncIterator[bytes]): Потік тіла запиту (`Request.stream()`).
+
+    Yields:
+        str: Непорожні рядки без символів кінця рядка.
+    """
+    buffer = b""
+    async for chunk in stream:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            text = line.decode("utf-8-sig").strip("\r")
+            if text.strip():
+                yield text
+    tail = buffer.decode("utf-8-sig").strip("\r")
+    if tail.strip():
+        yield tail
+
+
+def validate_record(data) -> Tuple[Optional[dict], List[str]]:
+    """
+    Перевіряє один запис через `schemas.ContactCreate`.
+
+    Args:
+        data: Розібраний запис (очікується словник).
+
+    Returns:
+        Tuple[Optional[dict], List[str]]: Дані контакту та порожній список
+        або None і список повідомлень про помилки.
+    """
+    if not isinstance(data, dict):
+        return None, ["Row must be an object"]
+    try:
+        return schemas.ContactCreate(**data).model_dump(), []
+    except ValidationError as exc:
+        return None, [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()]
+
+
+async def iter_records(stream: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Optional[dict], List[str]]]:
+    """
+    Читає та валідує записи з потоку CSV або NDJSON.
+
+    Args:
+        stream (AsyncIterator[bytes]): Потік тіла запиту.
+        fmt (str): "csv" або "ndjson".
+
+    Yields:
+        Tuple[int, Optional[dict], List[str]]: Номер запису (з 1), дані
+        контакту (або None) та список помилок.
+    """
+    header = None
+    row_no = 0
+    async for line in iter_lines(stream):
+        if fmt == "csv" and header is None:
+            header = [h.strip().lower() for h in next(csv.reader([line]))]
+            continue
+        row_no += 1
+        if fmt == "csv":
+            values = next(csv.reader([line]))
+            if len(values) != len(header):
+                yield row_no, None, [f"Expected {len(header)} columns, got {len(values)}"]
+                continue
+            data = {k: (v or None) for k, v in zip(header, values) if k in CSV_FIELDS}
+        else:
+            try:
+                data = json.loads(line)
+            except ValueError as exc:
+                yield row_no, None, [f"Invalid JSON: {exc}"]
+                continue
+        contact, errors = validate_record(data)
+        yield row_no, contact, errors
+
+
+def encode_rows(rows: Iterable[dict], fmt: str, header: bool = False) -> str:
+    """
+    Кодує пакет контактів у CSV або NDJSON.
+
+    Args:
+        rows (Iterable[dict]): Контакти з полями `EXPORT_FIELDS`.
+        fmt (str): "csv" або "ndjson".
+        header (bool): Додати рядок заголовка CSV.
+
+    Returns:
+        str: Закодований фрагмент відповіді.
+    """
+    if fmt == "ndjson":
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
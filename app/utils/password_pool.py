@@ -0,0 +1,172 @@
+"""
+Модуль `password_pool.py`
+
+Окремий обмежений пул для хешування та перевірки паролів (bcrypt).
+
+Одна операція bcrypt коштує сотні мілісекунд CPU. Якщо виконувати її
+у спільному threadpool, хвиля логінів витісняє звичайні запити до контактів.
+Тому парольні операції виконуються у власному пулі потоків або процесів
+фіксованого розміру з обмеженою чергою: коли черга заповнена, запит
+одразу отримує 503 замість того, щоб чекати невизначено довго.
+
+Налаштування (див. `app.config.config`):
+
+- ``PASSWORD_POOL_KIND`` — ``thread`` (bcrypt звільняє GIL) або ``process``;
+- ``PASSWORD_POOL_SIZE`` — кількість воркерів пулу;
+- ``PASSWORD_POOL_MAX_QUEUE`` — скільки операцій може чекати понад зайняті воркери.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config.config import PASSWORD_POOL_KIND, PASSWORD_POOL_MAX_QUEUE, PASSWORD_POOL_SIZE
+from app.crud import crud
+from app.metrics.metrics import REGISTRY
+
+PASSWORD_RUN_SECONDS = REGISTRY.histogram(
+    "password_pool_run_seconds", "bcrypt time per operation.", ("operation",)
+)
+PASSWORD_WAIT_SECONDS = REGISTRY.histogram(
+    "password_pool_wait_seconds", "Queue wait before a bcrypt operation.", ("operation",)
+)
+PASSWORD_REJECTED = REGISTRY.counter("password_pool_rejected_total", "Operations rejected by a full queue.")
+
+
+class PasswordPoolSaturated(Exception):
+    """Виняток: пул паролів перевантажений, операцію відхилено."""
+
+
+def _timed(fn: Callable, *args: Any) -> Tuple[Any, float]:
+    """Виконує `fn` у воркері пулу та повертає результат і чистий час виконання."""
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class PasswordPool:
+    """
+    Обмежений пул для bcrypt-операцій з метриками.
+
+    Attributes:
+        size (int): Кількість воркерів.
+        max_queue (int): Максимальна кількість операцій в очікуванні.
+        kind (str): Тип пулу — "thread" або "process".
+    """
+
+    def __init__(self, size: int, max_queue: int, kind: str = "thread"):
+        self.size = size
+        self.max_queue = max_queue
+        self.kind = kind
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._stats: Dict[str, Dict[str, float]] = {
+            op: {"count": 0, "errors": 0, "run_seconds": 0.0, "wait_seconds": 0.0, "max_seconds": 0.0}
+            for op in ("hash", "verify")
+        }
+        self.rejected = 0
+
+    @property
+    def executor(self) -> Executor:
+        """Executor пулу; створюється при першій операції."""
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.size)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="password")
+        return self._executor
+
+    async def _submit(self, op: str, fn: Callable, *args: Any) -> Any:
+        if self._pending >= self.size + self.max_queue:
+            self.rejected += 1
+            PASSWORD_REJECTED.labels().inc()
+            raise PasswordPoolSaturated(op)
+        self._pending += 1
+        stats = self._stats[op]
+        start = time.perf_counter()
+        try:
+            result, run_seconds = await asyncio.get_running_loop().run_in_executor(self.executor, _timed, fn, *args)
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            self._pending -= 1
+        total = time.perf_counter() - start
+        stats["count"] += 1
+        stats["run_seconds"] += run_seconds
+        stats["wait_seconds"] += total - run_seconds
+        stats["max_seconds"] = max(stats["max_seconds"], total)
+        PASSWORD_RUN_SECONDS.labels(op).observe(run_seconds)
+        PASSWORD_WAIT_SECONDS.labels(op).observe(total - run_seconds)
+        return result
+
+    async def hash(self, password: str) -> str:
+        """
+        Хешує пароль у пулі.
+
+        Args:
+            password (str): Пароль у відкритому вигляді.
+
+        Returns:
+            str: Хеш bcrypt.
+
+        Raises:
+            PasswordPoolSaturated: Якщо черга пулу заповнена.
+        """
+        return await self._submit("hash", crud.get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Перевіряє пароль у пулі.
+
+        Args:
+            plain_password (str): Пароль у відкритому вигляді.
+            hashed_password (str): Хеш із бази даних.
+
+        Returns:
+            bool: True, якщо пароль вірний.
+
+        Raises:
+            PasswordPoolSaturated: Якщо черга пулу заповнена.
+        """
+        return await self._submit("verify", crud.verify_password, plain_password, hashed_password)
+
+    def metrics(self) -> dict:
+        """
+        Повертає метрики пулу для підбору його розміру.
+
+        Returns:
+            dict: Розмір, поточне навантаження, кількість відхилених операцій
+            та статистика по кожній операції (кількість, помилки, середній
+            час виконання та очікування в черзі, максимум).
+        """
+        ops = {}
+        for op, s in self._stats.items():
+            count = s["count"] or 1
+            ops[op] = {
+                "count": int(s["count"]),
+                "errors": int(s["errors"]),
+                "avg_run_seconds": s["run_seconds"] / count,
+                "avg_wait_seconds": s["wait_seconds"] / count,
+                "max_seconds": s["max_seconds"],
+            }
+        return {
+            "kind": self.kind,
+            "size": self.size,
+            "max_queue": self.max_queue,
+            "in_flight": min(self._pending, self.size),
+            "queued": max(self._pending - self.size, 0),
+            "rejected": self.rejected,
+            "operations": ops,
+        }
+
+    def shutdown(self) -> None:
+        """Зупиняє воркери пулу."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+#: Спільний пул паролів застосунку.
+password_pool = PasswordPool(PASSWORD_POOL_SIZE, PASSWORD_POOL_MAX_QUEUE, PASSWORD_POOL_KIND)
@@ -0,0 +1,258 @@
+"""
+Модуль `tokens.py`
+
+Підписування та перевірка JWT для `app.routes.auth`.
+
+- Ключі готуються один раз (`get_signing_keys`, викликається при запуску
+  застосунку): PEM розбирається в об’єкти ключів `cryptography`, і PyJWT
+  не повторює цю роботу для кожного токена.
+- Перевірені токени кешуються (`TokenCache`): повторна перевірка того
+  самого bearer-токена — це пошук у локальному LRU за SHA-256 токена.
+  Запис живе не довше за `TOKEN_CACHE_TTL` і ніколи не довше за `exp`.
+- Окрім HS256 підтримуються асиметричні алгоритми (RS256, ES256, EdDSA):
+  токени підписуються приватним ключем, а публічний ключ публікується
+  у форматі JWKS (`/auth/jwks.json`), тож інші сервіси можуть перевіряти
+  токени локально, не звертаючись до цього API.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+
+from app.config.config import (
+    ALGORITHM,
+    JWT_KEY_ID,
+    JWT_PRIVATE_KEY,
+    JWT_PUBLIC_KEY,
+    SECRET_KEY,
+    TOKEN_CACHE_MAXSIZE,
+    TOKEN_CACHE_TTL,
+)
+
+#: Поля JWK, що входять у відбиток ключа (RFC 7638) для кожного типу ключа.
+THUMBPRINT_FIELDS = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y"), "OKP": ("crv", "kty", "x")}
+
+
+@dataclass(frozen=True)
+class SigningKeys:
+    """
+    Підготовлені ключі для підписування та перевірки токенів.
+
+    Attributes:
+        algorithm (str): Алгоритм JWT (HS256, RS256, ES256, EdDSA, ...).
+        signing_key (Any): Секрет HMAC або об’єкт приватного ключа.
+        verifying_key (Any): Секрет HMAC або об’єкт публічного ключа.
+        kid (Optional[str]): Ідентифікатор ключа для заголовка ``kid`` (лише асиметричні).
+        jwk (Optional[Dict]): Публічний ключ у форматі JWK (лише асиметричні).
+    """
+    algorithm: str
+    signing_key: Any
+    verifying_key: Any
+    kid: Optional[str] = None
+    jwk: Optional[Dict] = None
+
+
+def _read_pem(value: str) -> bytes:
+    """Повертає PEM-ключ зі значення змінної середовища або з файлу, на який вона вказує."""
+    if value.lstrip().startswith("-----BEGIN"):
+        return value.encode()
+    with open(os.path.expanduser(value), "rb") as f:
+        return f.read()
+
+
+def jwk_thumbprint(jwk: Dict) -> str:
+    """
+    Обчислює відбиток публічного ключа за RFC 7638.
+
+    Args:
+        jwk (Dict): Публічний ключ у форматі JWK.
+
+    Returns:
+        str: SHA-256 канонічного JWK у base64url без доповнення.
+    """
+    canonical = {k: jwk[k] for k in THUMBPRINT_FIELDS[jwk["kty"]]}
+    digest = hashlib.sha256(json.dumps(canonical, separators=(",", ":"), sort_keys=True).encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def load_signing_keys(
+    algorithm: str = ALGORITHM,
+    secret: str = SECRET_KEY,
+    private_key: str = JWT_PRIVATE_KEY,
+    public_key: str = JWT_PUBLIC_KEY,
+    kid: str = JWT_KEY_ID,
+) -> SigningKeys:
+    """
+    Готує ключі для заданого алгоритму.
+
+    Args:
+        algorithm (str): Алгоритм JWT.
+        secret (str): Секрет для алгоритмів HS*.
+        private_key (str): PEM приватного ключа або шлях до файлу (асиметричні алгоритми).
+        public_key (str): PEM публічного ключа або шлях до файлу; порожній — виводиться з приватного.
+        kid (str): Ідентифікатор ключа; порожній — відбиток JWK.
+
+    Returns:
+        SigningKeys: Підготовлені ключі.
+
+    Raises:
+        RuntimeError: Якщо алгоритм не підтримується або для асиметричного алгоритму немає ключа.
+    """
+    try:
+        alg = jwt.get_algorithm_by_name(algorithm)
+    except NotImplementedError:
+        raise RuntimeError(f"Unsupported JWT algorithm {algorithm!r}")
+    if algorithm.startswith("HS"):
+        key = alg.prepare_key(secret)
+        return SigningKeys(algorithm, key, key)
+    if not private_key:
+        raise RuntimeError(f"JWT algorithm {algorithm} requires JWT_PRIVATE_KEY")
+    signing_key = alg.prepare_key(_read_pem(private_key))
+    verifying_key = alg.prepare_key(_read_pem(public_key)) if public_key else signing_key.public_key()
+    jwk = json.loads(alg.to_jwk(verifying_key))
+    jwk.update(kid=kid or jwk_thumbprint(jwk), use="sig", alg=algorithm)
+    return SigningKeys(algorithm, signing_key, verifying_key, jwk["kid"], jwk)
+
+
+@lru_cache(maxsize=None)
+def get_signing_keys() -> SigningKeys:
+    """
+    Повертає ключі застосунку, готуючи їх при першому виклику.
+
+    Викликається при запуску застосунку, тож помилка конфігурації
+    ключів зупиняє запуск, а не перший запит.
+
+    Returns:
+        SigningKeys: Ключі з конфігурації.
+    """
+    return load_signing_keys()
+
+
+class TokenCache:
+    """
+    Обмежений LRU-кеш перевірених токенів із TTL.
+
+    Ключем є SHA-256 токена, тож у пам’яті не зберігаються самі токени.
+
+    Attributes:
+        maxsize (int): Максимальна кількість записів.
+        ttl (float): Максимальний час життя запису, секунд.
+    """
+
+    def __init__(self, maxsize: int = TOKEN_CACHE_MAXSIZE, ttl: float = TOKEN_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, Dict]]" = OrderedDict()
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        """Повертає ключ кешу для токена."""
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict]:
+        """
+        Повертає закешовані claims токена.
+
+        Args:
+            token (str): JWT.
+
+        Returns:
+            Optional[Dict]: Claims або None, якщо токена немає в кеші чи запис застарів.
+        """
+        key = self.key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return claims
+
+    def set(self, token: str, claims: Dict) -> None:
+        """
+        Кешує claims перевіреного токена до `exp`, але не довше за `ttl`.
+
+        Args:
+            token (str): JWT.
+            claims (Dict): Перевірені claims.
+        """
+        lifetime = self.ttl
+        if "exp" in claims:
+            lifetime = min(lifetime, float(claims["exp"]) - time.time())
+        if lifetime <= 0 or self.maxsize <= 0:
+            return
+        key = self.key(token)
+        self._entries[key] = (time.monotonic() + lifetime, claims)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Очищає кеш."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+#: Кеш перевірених токенів застосунку.
+token_cache = TokenCache()
+
+
+def encode_token(claims: Dict) -> str:
+    """
+    Підписує claims ключем застосунку.
+
+    Args:
+        claims (Dict): Claims токена (разом з ``exp``).
+
+    Returns:
+        str: JWT.
+    """
+    keys = get_signing_keys()
+    headers = {"kid": keys.kid} if keys.kid else None
+    return jwt.encode(claims, keys.signing_key, algorithm=keys.algorithm, headers=headers)
+
+
+def decode_token(token: str) -> Dict:
+    """
+    Перевіряє токен і повертає його claims, використовуючи `token_cache`.
+
+    Повернений словник спільний із кешем і не повинен змінюватися.
+
+    Args:
+        token (str): JWT.
+
+    Returns:
+        Dict: Claims токена.
+
+    Raises:
+        jwt.PyJWTError: Якщо підпис недійсний або токен прострочений.
+    """
+    claims = token_cache.get(token)
+    if claims is None:
+        keys = get_signing_keys()
+        claims = jwt.decode(token, keys.verifying_key, algorithms=[keys.algorithm])
+        token_cache.set(token, claims)
+    return claims
+
+
+def jwks() -> Dict:
+    """
+    Повертає публічні ключі у форматі JWK Set.
+
+    Returns:
+        Dict: ``{"keys": [...]}``; для HS* список порожній — секрет не публікується.
+    """
+    keys = get_signing_keys()
+    return {"keys": [keys.jwk] if keys.jwk else []}
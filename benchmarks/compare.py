@@ -0,0 +1,84 @@
+"""
+Порівняння двох результатів `benchmarks.run`.
+
+Виводить для кожного сценарію p50/p95/p99 та req/s обох запусків і зміну
+у відсотках. Завершується з кодом 1, якщо p95 будь-якого сценарію
+погіршився більше ніж на `--threshold` відсотків або з’явилися помилки.
+
+Приклад::
+
+    python -m benchmarks.compare benchmarks/results/a1b2c3d.json benchmarks/results/e4f5a6b.json
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Tuple
+
+#: Метрики, що виводяться в таблиці порівняння.
+METRICS = ("req_per_s", "p50_ms", "p95_ms", "p99_ms")
+
+
+def change(old: float, new: float) -> float:
+    """
+    Обчислює зміну у відсотках.
+
+    Returns:
+        float: ``(new - old) / old * 100`` (0.0, якщо `old` дорівнює нулю).
+    """
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(base: Dict, head: Dict, threshold: float) -> Tuple[List[str], List[str]]:
+    """
+    Порівнює результати двох запусків.
+
+    Args:
+        base (Dict): Базовий звіт.
+        head (Dict): Новий звіт.
+        threshold (float): Допустиме погіршення p95, відсотків.
+
+    Returns:
+        Tuple[List[str], List[str]]: Рядки таблиці та список регресій.
+    """
+    lines = [f"{'scenario':<14}" + "".join(f"{m:>30}" for m in METRICS)]
+    regressions = []
+    for name, new in head["results"].items():
+        old = base["results"].get(name)
+        if old is None:
+            lines.append(f"{name:<14} (new scenario)")
+            continue
+        cells = []
+        for metric in METRICS:
+            delta = change(old[metric], new[metric])
+            cells.append(f"{old[metric]:>10.2f} -> {new[metric]:>9.2f} ({delta:+6.1f}%)")
+        lines.append(f"{name:<14}" + "".join(f"{c:>30}" for c in cells))
+        if change(old["p95_ms"], new["p95_ms"]) > threshold:
+            regressions.append(f"{name}: p95 {old['p95_ms']} -> {new['p95_ms']} ms")
+        if new["errors"] > old["errors"]:
+            regressions.append(f"{name}: errors {old['errors']} -> {new['errors']}")
+    return lines, regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed p95 regression, percent")
+    args = parser.parse_args(argv)
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    if base.get("params") != head.get("params"):
+        print(f"warning: parameters differ: {base.get('params')} vs {head.get('params')}", file=sys.stderr)
+    print(f"{base.get('commit')} -> {head.get('commit')}")
+    lines, regressions = compare(base, head, args.threshold)
+    print("\n".join(lines))
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
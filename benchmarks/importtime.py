@@ -0,0 +1,123 @@
+"""
+Час холодного імпорту застосунку (``python -X importtime``).
+
+Кожен запуск — новий інтерпретатор, що імпортує `app.main`; звіт
+``-X importtime`` розбирається, і виводяться кумулятивний час імпорту
+застосунку (медіана та найкращий із запусків) та модулі з найбільшим
+власним часом. Завершується з кодом 1, якщо найкращий запуск перевищує
+бюджет або під час імпорту завантажилася якась із інтеграцій
+`LAZY_PACKAGES` (вони мають підтягуватися лише при першому використанні).
+
+Приклад::
+
+    python -m benchmarks.importtime --runs 7 --budget-ms 1500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+#: Корінь репозиторію: імпорт `app` у дочірньому процесі.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#: Пакети, що не мають завантажуватися під час імпорту застосунку.
+LAZY_PACKAGES = ("cloudinary", "smtplib", "passlib", "redis", "PIL")
+
+#: Бюджет кумулятивного часу імпорту `app.main` (найкращий із запусків), мс.
+#: Основну частину займає сам FastAPI/pydantic/SQLAlchemy (~0.7 с).
+BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", 1500))
+
+
+def parse_importtime(report: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Розбирає звіт ``-X importtime``.
+
+    Args:
+        report (str): Вивід stderr інтерпретатора.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Модуль -> (власний, кумулятивний) час, мкс.
+    """
+    times = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def import_times(module: str = "app.main") -> Dict[str, Tuple[int, int]]:
+    """
+    Імпортує модуль у новому інтерпретаторі з ``-X importtime``.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Модуль -> (власний, кумулятивний) час, мкс.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def loaded_modules(module: str = "app.main") -> Set[str]:
+    """
+    Повертає модулі, завантажені після імпорту `module` у новому інтерпретаторі.
+
+    Returns:
+        Set[str]: Назви з ``sys.modules``.
+    """
+    code = f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def eager_integrations(modules: Set[str]) -> List[str]:
+    """
+    Знаходить серед завантажених модулів інтеграції з `LAZY_PACKAGES`.
+
+    Returns:
+        List[str]: Відсортовані назви завантажених пакетів.
+    """
+    return sorted({name.split(".")[0] for name in modules} & set(LAZY_PACKAGES))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import time of the application.")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to measure")
+    parser.add_argument("--top", type=int, default=15, help="modules with the largest self time to list")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS, help="budget for the best run, ms")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals = [times[args.module][1] / 1000 for times in runs]
+    best = min(totals)
+    print(f"{args.module}: median {statistics.median(totals):.1f} ms, best {best:.1f} ms over {args.runs} runs")
+
+    fastest = runs[totals.index(best)]
+    print(f"\n{'module':50} {'self ms':>8} {'cumul ms':>9}")
+    for name, (own, cumulative) in sorted(fastest.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"{name:50} {own / 1000:8.1f} {cumulative / 1000:9.1f}")
+
+    eager = eager_integrations(loaded_modules(args.module))
+    failed = False
+    if eager:
+        print(f"\nFAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if best > args.budget_ms:
+        print(f"\nFAIL: {best:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
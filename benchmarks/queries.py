@@ -0,0 +1,107 @@
+"""
+Мікробенчмарк запитів гарячих шляхів `app.crud.crud`.
+
+Порівнює поточні функції (`lambda_stmt` з `app.crud.queries` та
+`Session.get`) з попередньою реалізацією через `db.query(...).filter(...)`,
+яка будує й компілює об’єкт Query при кожному виклику. Кожен виклик
+виконується в новій сесії, як запит API, тож identity map не допомагає
+і різниця — це вартість побудови та компіляції запиту.
+
+Приклад::
+
+    python -m benchmarks.queries --contacts 1000 --iterations 5000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+
+def legacy_lookups(models) -> Dict[str, Callable]:
+    """Попередня реалізація запитів (``db.query``) для порівняння."""
+    return {
+        "get_user_by_email": lambda db, email, user_id, contact_id: db.query(models.User).filter(models.User.email == email).first(),
+        "get_user_by_id": lambda db, email, user_id, contact_id: db.query(models.User).filter(models.User.id == user_id).first(),
+        "get_contacts": lambda db, email, user_id, contact_id: db.query(models.Contact).filter(
+            models.Contact.owner_id == user_id, models.Contact.deleted_at.is_(None),
+        ).all(),
+        "get_contact": lambda db, email, user_id, contact_id: db.query(models.Contact).filter(
+            models.Contact.id == contact_id, models.Contact.owner_id == user_id, models.Contact.deleted_at.is_(None),
+        ).first(),
+    }
+
+
+def current_lookups(crud) -> Dict[str, Callable]:
+    """Поточна реалізація запитів з `app.crud.crud`."""
+    return {
+        "get_user_by_email": lambda db, email, user_id, contact_id: crud.get_user_by_email(db, email),
+        "get_user_by_id": lambda db, email, user_id, contact_id: crud.get_user_by_id(db, user_id),
+        "get_contacts": lambda db, email, user_id, contact_id: crud.get_contacts(db, user_id),
+        "get_contact": lambda db, email, user_id, contact_id: crud.get_contact(db, contact_id, user_id),
+    }
+
+
+def measure(session_factory, lookup: Callable, args: List[tuple], iterations: int) -> float:
+    """
+    Вимірює середній час одного виклику в новій сесії.
+
+    Returns:
+        float: Мікросекунд на виклик.
+    """
+    start = time.perf_counter()
+    for i in range(iterations):
+        with session_factory() as db:
+            lookup(db, *args[i % len(args)])
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark legacy Query lookups against cached 2.0 statements.")
+    parser.add_argument("--users", type=int, default=20, help="seeded users")
+    parser.add_argument("--contacts", type=int, default=20, help="contacts per seeded user")
+    parser.add_argument("--iterations", type=int, default=5000, help="calls per lookup and implementation")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="queries-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    from sqlalchemy import insert, select
+
+    from app.crud import crud
+    from app.database.database import Base, SessionLocal, engine
+    from app.models import models
+
+    Base.metadata.create_all(bind=engine)
+    lookup_args = []
+    with SessionLocal() as db:
+        for u in range(args.users):
+            user = crud.create_user(db, f"bench{u}@example.com", "hashed")
+            db.execute(insert(models.Contact), [
+                {"name": f"Contact {i}", "email": f"c{u}-{i}@example.com", "owner_id": user.id}
+                for i in range(args.contacts)
+            ])
+            db.commit()
+            contact_id = db.scalar(select(models.Contact.id).where(models.Contact.owner_id == user.id).limit(1))
+            lookup_args.append((user.email, user.id, contact_id))
+
+    legacy, current = legacy_lookups(models), current_lookups(crud)
+    print(f"{'lookup':20} {'legacy us':>10} {'current us':>11} {'change':>8}")
+    for name in legacy:
+        # Прогрів: кеш компіляції двигуна та кеш lambda_stmt
+        for impl in (legacy[name], current[name]):
+            measure(SessionLocal, impl, lookup_args, 100)
+        before = measure(SessionLocal, legacy[name], lookup_args, args.iterations)
+        after = measure(SessionLocal, current[name], lookup_args, args.iterations)
+        print(f"{name:20} {before:10.1f} {after:11.1f} {(after - before) / before * 100:+7.1f}%")
+    engine.dispose()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,392 @@
+"""
+Навантажувальний бенчмарк гарячих шляхів API.
+
+Запускає застосунок у тому ж процесі (httpx + ASGITransport, без мережі)
+поверх локальної БД (файл SQLite або локальний PostgreSQL), fakeredis
+замість Redis, локального сховища або імітації Cloudinary із заданою
+затримкою та без відправлення листів (воркер черги листів вимкнено). Перед вимірюванням засіває користувачів із заданою кількістю
+контактів, потім для кожного сценарію виконує запити з заданою
+конкурентністю та записує p50/p95/p99, середню й максимальну затримку
+та req/s у JSON.
+
+Приклад::
+
+    python -m benchmarks.run --contacts 10000 --concurrency 16 --requests 500
+    python -m benchmarks.compare benchmarks/results/old.json benchmarks/results/new.json
+
+Клієнт і застосунок ділять один цикл подій, тож абсолютні числа нижчі,
+ніж з окремим навантажувачем; бенчмарк призначений для порівняння
+комітів між собою на одній машині.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List
+
+#: Сценарії у порядку виконання.
+SCENARIOS = ("login", "list", "list_by_name", "search", "get", "create", "update", "delete", "avatar")
+
+#: Пароль засіяних користувачів.
+PASSWORD = "benchmark-password"
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    Обчислює перцентиль методом найближчого рангу.
+
+    Args:
+        sorted_values (List[float]): Відсортовані значення.
+        q (float): Перцентиль від 0 до 100.
+
+    Returns:
+        float: Значення перцентиля (0.0 для порожнього списку).
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values) + 0.5 - 1e-9))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    """
+    Зводить результати одного сценарію.
+
+    Args:
+        latencies (List[float]): Тривалості успішних запитів, секунд.
+        errors (int): Кількість невдалих запитів.
+        elapsed (float): Загальна тривалість сценарію, секунд.
+
+    Returns:
+        Dict: Кількість запитів, помилки, req/s та затримки в мілісекундах.
+    """
+    values = sorted(latencies)
+    ms = lambda v: round(v * 1000, 3)
+    return {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "req_per_s": round((len(values) + errors) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "mean_ms": ms(sum(values) / len(values)) if values else 0.0,
+        "max_ms": ms(values[-1]) if values else 0.0,
+    }
+
+
+def configure_environment(args) -> str:
+    """
+    Налаштовує змінні середовища до імпорту застосунку.
+
+    Returns:
+        str: URL бази даних бенчмарку.
+    """
+    database_url = args.database_url or f"sqlite:///{os.path.join(args.workdir, 'bench.db')}"
+    os.environ.update({
+        "DATABASE_URL": database_url,
+        "USE_ASYNC_DB": "0" if args.sync else "1",
+        "MAIL_WORKER_ENABLED": "0",
+        "RATE_LIMIT_PER_MINUTE": "100000000",
+        "RATE_LIMIT_ROUTES": "",
+        "AVATAR_STORAGE": args.storage,
+        "AVATAR_LOCAL_DIR": os.path.join(args.workdir, "media"),
+        "IMAGE_POOL_KIND": "thread",
+    })
+    return database_url
+
+
+def install_fake_cloudinary(latency: float) -> None:
+    """
+    Підміняє виклики Cloudinary імітацією з фіксованою затримкою.
+
+    Args:
+        latency (float): Затримка одного виклику, секунд.
+    """
+    import cloudinary.uploader
+
+    def upload(file, public_id, **kwargs):
+        time.sleep(latency)
+        return {"secure_url": f"https://res.cloudinary.example/{public_id}.webp"}
+
+    def destroy(public_id, **kwargs):
+        time.sleep(latency)
+        return {"result": "ok"}
+
+    cloudinary.uploader.upload = upload
+    cloudinary.uploader.destroy = destroy
+
+
+def install_fake_redis() -> None:
+    """Підміняє клієнт Redis на fakeredis до імпорту модулів, що його використовують."""
+    import fakeredis
+
+    from app.redis_cache import redis_cache
+
+    redis_cache.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+
+
+def seed(users: int, contacts: int) -> List[Dict]:
+    """
+    Створює схему та засіває користувачів із контактами.
+
+    Args:
+        users (int): Кількість користувачів.
+        contacts (int): Кількість контактів кожного користувача.
+
+    Returns:
+        List[Dict]: Email та id засіяних користувачів.
+    """
+    from sqlalchemy import insert
+
+    from app.crud import crud
+    from app.database.database import Base, SessionLocal, engine
+    from app.models import models
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rnd = random.Random(42)
+    hashed = crud.get_password_hash(PASSWORD)
+    seeded = []
+    with SessionLocal() as db:
+        for u in range(users):
+            user = crud.create_user(db, f"bench{u}@example.com", hashed)
+            for start in range(0, contacts, 5000):
+                rows = [
+                    {
+                        "name": f"{rnd.choice('ABCDEFGHIJKLMNOPRSTUVWZ')}{rnd.randrange(10**6):06d} Contact",
+                        "email": f"c{u}-{i}@example.com",
+                        "phone": f"+380{rnd.randrange(10**9):09d}",
+                        "owner_id": user.id,
+                    }
+                    for i in range(start, min(start + 5000, contacts))
+                ]
+                db.execute(insert(models.Contact), rows)
+            db.commit()
+            seeded.append({"email": user.email, "id": user.id})
+    return seeded
+
+
+def avatar_images(count: int) -> List[bytes]:
+    """
+    Готує різні PNG-зображення для сценарію завантаження аватара.
+
+    Зображення відрізняються вмістом, тож кожне завантаження проходить
+    повну обробку, а не дедуплікацію за хешем.
+
+    Args:
+        count (int): Кількість зображень.
+
+    Returns:
+        List[bytes]: Закодовані зображення 512x512.
+    """
+    from PIL import Image
+
+    images = []
+    for i in range(count):
+        out = io.BytesIO()
+        Image.new("RGB", (512, 512), (i % 256, (i // 256) % 256, (i // 65536) % 256)).save(out, "PNG")
+        images.append(out.getvalue())
+    return images
+
+
+def build_scenarios(users: List[Dict], tokens: List[str], contact_ids: List[List[int]], avatars: int) -> Dict[str, Callable]:
+    """
+    Створює функції запитів для кожного сценарію.
+
+    Кожна функція приймає клієнта httpx та номер запиту і повертає відповідь.
+    """
+    images = avatar_images(avatars)
+    created: List[List[int]] = [[] for _ in users]
+
+    def auth(i):
+        return {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}
+
+    def owned(i):
+        ids = contact_ids[i % len(users)]
+        return ids[(i * 7919) % len(ids)]
+
+    async def login(client, i):
+        return await client.post("/auth/token", data={"username": users[i % len(users)]["email"], "password": PASSWORD})
+
+    async def list_(client, i):
+        return await client.get("/contacts/", params={"limit": 50}, headers=auth(i))
+
+    async def list_by_name(client, i):
+        return await client.get("/contacts/", params={"limit": 50, "sort": "name", "name": "A"}, headers=auth(i))
+
+    async def search(client, i):
+        return await client.get("/contacts/search", params={"q": f"{'ABCDE'[i % 5]}1"}, headers=auth(i))
+
+    async def get(client, i):
+        return await client.get(f"/contacts/{owned(i)}", headers=auth(i))
+
+    async def create(client, i):
+        response = await client.post(
+            "/contacts/", json={"name": f"New {i}", "email": f"new{i}@example.com"}, headers=auth(i)
+        )
+        if response.status_code == 201:
+            created[i % len(users)].append(response.json()["id"])
+        return response
+
+    async def update(client, i):
+        return await client.put(f"/contacts/{owned(i)}", json={"phone": f"+1{i:09d}"}, headers=auth(i))
+
+    async def delete(client, i):
+        ids = created[i % len(users)]
+        contact_id = ids.pop() if ids else owned(i)
+        return await client.delete(f"/contacts/{contact_id}", headers=auth(i))
+
+    async def avatar(client, i):
+        files = {"file": ("avatar.png", images[i % len(images)], "image/png")}
+        return await client.put("/contacts/0/avatar", files=files, headers=auth(i))
+
+    return {
+        "login": login, "list": list_, "list_by_name": list_by_name, "search": search, "get": get,
+        "create": create, "update": update, "delete": delete, "avatar": avatar,
+    }
+
+
+async def run_scenario(client, request: Callable[..., Awaitable], total: int, concurrency: int, offset: int = 0) -> Dict:
+    """
+    Виконує `total` запитів сценарію з `concurrency` паралельними воркерами.
+
+    Args:
+        client: Клієнт httpx.
+        request (Callable[..., Awaitable]): Функція запиту сценарію.
+        total (int): Кількість запитів.
+        concurrency (int): Кількість одночасних воркерів.
+        offset (int): Номер першого запиту (прогрів не повторює номери вимірювань).
+
+    Returns:
+        Dict: Результат `summarize`.
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(offset, offset + total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await request(client, i)
+                ok = response.status_code < 400
+            except Exception:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def git_commit() -> str:
+    """Повертає короткий хеш поточного коміту або "unknown"."""
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def main_async(args) -> Dict:
+    import httpx
+
+    from app.main import app
+    from app.models import models
+    from app.database.database import SessionLocal
+
+    users = seed(args.users, args.contacts)
+    with SessionLocal() as db:
+        contact_ids = [
+            [cid for (cid,) in db.query(models.Contact.id).filter(models.Contact.owner_id == u["id"]).limit(10000)]
+            for u in users
+        ]
+
+    transport = httpx.ASGITransport(app=app)
+    # Події запуску та зупинки застосунку: зупинка закриває пули потоків,
+    # інакше процес не завершиться після вимірювань
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+        tokens = []
+        for user in users:
+            response = await client.post("/auth/token", data={"username": user["email"], "password": PASSWORD})
+            response.raise_for_status()
+            tokens.append(response.json()["access_token"])
+        scenarios = build_scenarios(users, tokens, contact_ids, avatars=args.requests + args.warmup)
+        results = {}
+        for name in args.scenarios:
+            total = args.login_requests if name == "login" else args.requests
+            # Прогрів: перші запити заповнюють кеші та пул з’єднань
+            await run_scenario(client, scenarios[name], min(args.warmup, total), args.concurrency, offset=total)
+            results[name] = await run_scenario(client, scenarios[name], total, args.concurrency)
+            print(f"{name:<14} {results[name]['req_per_s']:>9.1f} req/s  p50 {results[name]['p50_ms']:>8.2f} ms"
+                  f"  p95 {results[name]['p95_ms']:>8.2f} ms  p99 {results[name]['p99_ms']:>8.2f} ms"
+                  f"  errors {results[name]['errors']}", file=sys.stderr)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the contacts API in-process.")
+    parser.add_argument("--users", type=int, default=1, help="seeded users")
+    parser.add_argument("--contacts", type=int, default=10000, help="contacts per seeded user (10..100000)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--login-requests", type=int, default=50, help="requests for the bcrypt-bound login scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--storage", choices=("local", "cloudinary"), default="local",
+                        help="avatar storage: local files or a mocked Cloudinary")
+    parser.add_argument("--cloudinary-latency", type=float, default=50.0, help="mocked Cloudinary call latency, ms")
+    parser.add_argument("--database-url", help="local database URL (default: a temporary SQLite file)")
+    parser.add_argument("--sync", action="store_true", help="use the synchronous Session path (USE_ASYNC_DB=0)")
+    parser.add_argument("--output", help="results JSON path (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--label", default="", help="free-form label stored with the results")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="contacts-bench-") as workdir:
+        args.workdir = workdir
+        database_url = configure_environment(args)
+        install_fake_redis()
+        if args.storage == "cloudinary":
+            install_fake_cloudinary(args.cloudinary_latency / 1000)
+        results = asyncio.run(main_async(args))
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "label": args.label,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": database_url.split(":", 1)[0],
+        "params": {
+            "users": args.users, "contacts": args.contacts, "concurrency": args.concurrency,
+            "requests": args.requests, "login_requests": args.login_requests, "sync": args.sync,
+            "storage": args.storage,
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(os.path.dirname(__file__), "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ import time
 import pytest
 import requests
 import io  # для BytesIO
-from unittest.mock import patch  # для моків
+from PIL import Image
 
 # --------------------------
 # Налаштування для Docker
@@ -15,15 +15,9 @@ MAILHOG_URL = "http://mailhog:8025" if DOCKERIZED else "http://127.0.0.1:8025"
 EMAIL = f"testuser{int(time.time())}@example.com"
 PASSWORD = "password123"
 
-# ---------------------------
-# Мок Cloudinary
-# ---------------------------
-@pytest.fixture(autouse=True)
-def mock_cloudinary_upload():
-    with patch("app.routes.contacts.upload_avatar_file") as mock_upload:
-        mock_upload.return_value = "http://cloudinary.fake/test_avatar.png"
-        yield mock_upload
-        print("Cloudinary upload mocked!")
+# Аватари вивантажує фоновий конвеєр сервера, а не цей процес, тож мок тут не діє:
+# сервер має працювати з AVATAR_STORAGE=local або з робочими ключами Cloudinary.
+AVATAR_JOB_TIMEOUT = 30
 
 # ---------------------------
 # Токен
@@ -60,7 +54,11 @@ def contact_id(headers):
 # ---------------------------
 @pytest.fixture(scope="module")
 def avatar_file():
-    return io.BytesIO(b"fake image data for testing")
+    # Справжнє зображення: сервер перевіряє формат і зменшує його до розмірів аватара
+    data = io.BytesIO()
+    Image.new("RGB", (300, 200), "navy").save(data, "PNG")
+    data.seek(0)
+    return data
 
 # ---------------------------
 # Тести
@@ -76,7 +74,16 @@ def test_create_contact(contact_id):
 def test_upload_avatar(headers, contact_id, avatar_file):
     files = {"file": ("test_avatar.png", avatar_file, "image/png")}
     resp = requests.put(f"{BASE_URL}/contacts/{contact_id}/avatar", files=files, headers=headers)
-    assert resp.status_code == 201
+    assert resp.status_code == 202
     data = resp.json()
-    assert "avatar_url" in data
-    assert data["avatar_url"] == "http://cloudinary.fake/test_avatar.png"
\ No newline at end of file
+    assert data["status_url"] == f"/contacts/avatar-jobs/{data['job_id']}"
+
+    # Завантаження у сховище відбувається у фоні — чекаємо завершення завдання
+    deadline = time.monotonic() + AVATAR_JOB_TIMEOUT
+    while True:
+        job = requests.get(f"{BASE_URL}/contacts/avatar-jobs/{data['job_id']}", headers=headers).json()
+        if job["status"] != "pending" or time.monotonic() > deadline:
+            break
+        time.sleep(0.5)
+    assert job["status"] == "done", job
+    assert set(job["urls"]) == {"256", "128", "64"}
@@ -1,16 +1,26 @@
+import os
+
+# Фоновий воркер листів у тестах не запускаємо — тести викликають його явно
+os.environ.setdefault("MAIL_WORKER_ENABLED", "0")
+os.environ.setdefault("RATE_LIMIT_STORAGE", "memory")
+
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from app.database.database import Base, get_db
 from app.main import app
 from fastapi.testclient import TestClient
-import os
 
 # Вибір URL для тестової БД
 DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///:memory:")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# StaticPool: одне з’єднання з in-memory SQLite для всіх потоків (маршрути виконують запити у threadpool)
+engine = create_engine(
+    DATABASE_URL,
+    **({"connect_args": {"check_same_thread": False}, "poolclass": StaticPool} if "sqlite" in DATABASE_URL else {}),
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_database():
@@ -28,6 +38,18 @@ def db_session():
     finally:
         session.close()
 
+@pytest.fixture(scope="function")
+def statements():
+    """Фікстура, що збирає SQL-оператори, виконані тестовою БД (для перевірки кількості запитів)."""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield captured
+    event.remove(engine, "before_cursor_execute", record)
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Фікстура для FastAPI клієнта з тестовою БД."""
@@ -40,3 +62,43 @@ def client(db_session):
     app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as c:
         yield c
+
+@pytest.fixture(scope="function")
+def auth_client(db_session):
+    """
+    Фікстура для FastAPI клієнта з тестовою БД та автентифікованим користувачем.
+
+    Подія startup не запускається (клієнт створюється без контекстного менеджера),
+    тож тести не потребують PostgreSQL, Redis чи SMTP.
+    """
+    from app.models import models
+    from app.rate_limit.rate_limit import limiter
+    from app.routes.auth import get_current_user
+
+    limiter.reset()
+    user = models.User(email="client@example.com", password="x")
+    db_session.add(user)
+    db_session.commit()
+
+    def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    client = TestClient(app)
+    client.user = user
+    yield client
+    app.dependency_overrides.clear()
+    db_session.query(models.Contact).filter(models.Contact.owner_id == user.id).delete()
+    db_session.delete(user)
+    db_session.commit()
+
+@pytest.fixture(scope="function")
+def create_contact(auth_client):
+    """Фікстура-фабрика: створює контакт користувача `auth_client` через API і повертає його JSON."""
+    def create(name: str) -> dict:
+        response = auth_client.post("/contacts/", json={"name": name, "email": f"{name.lower()}@example.com"})
+        assert response.status_code == 201
+        return response.json()
+
+    return create
@@ -0,0 +1,52 @@
+import unittest
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.crud import async_crud
+from app.database.database import Base, to_async_url
+from app.schemas import schemas
+
+pytest.importorskip("aiosqlite")
+
+
+class TestAsyncCrud(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session = async_sessionmaker(self.engine, expire_on_commit=False)()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.engine.dispose()
+
+    async def test_user_and_contact_roundtrip(self):
+        user = await async_crud.create_user(self.session, "async@example.com", "hashed", "async")
+        found = await async_crud.get_user_by_email(self.session, "async@example.com")
+        self.assertEqual(found.id, user.id)
+
+        contact = await async_crud.create_contact(
+            self.session, schemas.ContactCreate(name="Taras", email="taras@example.com"), user.id
+        )
+        items, cursor = await async_crud.get_contacts_page(self.session, user.id, limit=10)
+        self.assertEqual([c.id for c in items], [contact.id])
+        self.assertIsNone(cursor)
+
+        await async_crud.update_contact(self.session, contact, schemas.ContactUpdate(phone="123"))
+        self.assertEqual((await async_crud.get_contact(self.session, contact.id, user.id)).phone, "123")
+
+        await async_crud.delete_contact(self.session, contact)
+        self.assertIsNone(await async_crud.get_contact(self.session, contact.id, user.id))
+
+
+class TestAsyncUrl(unittest.TestCase):
+    def test_drivers_are_swapped(self):
+        self.assertEqual(
+            to_async_url("postgresql+psycopg2://u:p@db:5432/x"), "postgresql+asyncpg://u:p@db:5432/x"
+        )
+        self.assertEqual(to_async_url("postgresql://u:p@db/x"), "postgresql+asyncpg://u:p@db/x")
+        self.assertEqual(to_async_url("sqlite:///./test.db"), "sqlite+aiosqlite:///./test.db")
+
+
+if __name__ == '__main__':
+    unittest.main()
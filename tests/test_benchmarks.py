@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from benchmarks import compare, run
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert run.percentile(values, 50) == 50.0
+    assert run.percentile(values, 95) == 95.0
+    assert run.percentile(values, 99) == 99.0
+    assert run.percentile([7.0], 99) == 7.0
+    assert run.percentile([], 50) == 0.0
+
+
+def test_summarize_reports_milliseconds_and_rate():
+    summary = run.summarize([0.010, 0.020, 0.030, 0.040], errors=1, elapsed=0.5)
+    assert summary["requests"] == 5
+    assert summary["errors"] == 1
+    assert summary["req_per_s"] == 10.0
+    assert summary["p50_ms"] == 20.0
+    assert summary["max_ms"] == 40.0
+    assert summary["mean_ms"] == 25.0
+
+
+def report(p95, errors=0):
+    return {"results": {"list": {"req_per_s": 100.0, "p50_ms": 5.0, "p95_ms": p95, "p99_ms": 20.0, "errors": errors}}}
+
+
+@pytest.mark.parametrize(
+    "p95, errors, regressed",
+    [(10.5, 0, False), (12.0, 0, True), (10.0, 2, True)],
+)
+def test_compare_flags_p95_and_error_regressions(p95, errors, regressed):
+    _, regressions = compare.compare(report(10.0), report(p95, errors), threshold=10.0)
+    assert bool(regressions) is regressed
+
+
+def test_compare_cli_exit_code(tmp_path, capsys):
+    base, head = tmp_path / "base.json", tmp_path / "head.json"
+    base.write_text(json.dumps(report(10.0)))
+    head.write_text(json.dumps(report(20.0)))
+    assert compare.main([str(base), str(head)]) == 1
+    assert "REGRESSION list" in capsys.readouterr().out
+    assert compare.main([str(base), str(base)]) == 0
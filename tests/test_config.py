@@ -0,0 +1,31 @@
+import pytest
+
+from app.config import config
+from app.config.config import Settings, get_settings
+
+
+def test_settings_parse_types_and_defaults():
+    settings = Settings.from_env({
+        "SMTP_PORT": "2525",
+        "REPLICA_MAX_LAG": "2.5",
+        "DB_POOL_PRE_PING": "true",
+        "USE_ASYNC_DB": "0",
+        "DATABASE_REPLICA_URLS": "sqlite:///a.db, ,sqlite:///b.db",
+        "POSTGRES_HOST": "pg",
+        "REDIS_TTL": "60",
+        "PASSWORD_POOL_SIZE": "3",
+    })
+    assert (settings.SMTP_PORT, settings.REPLICA_MAX_LAG) == (2525, 2.5)
+    assert settings.DB_POOL_PRE_PING is True and settings.USE_ASYNC_DB is False
+    assert settings.DATABASE_REPLICA_URLS == ("sqlite:///a.db", "sqlite:///b.db")
+    assert settings.DATABASE_URL == "postgresql+psycopg2://postgres:postgres@pg:5432/postgres"
+    assert settings.USER_CACHE_TTL == 60
+    assert settings.PASSWORD_POOL_MAX_QUEUE == 12
+    assert Settings.from_env({"USER_CACHE_TTL": "5", "REDIS_TTL": "60"}).USER_CACHE_TTL == 5
+
+
+def test_module_attributes_read_cached_settings():
+    assert get_settings() is get_settings()
+    assert config.SECRET_KEY == get_settings().SECRET_KEY
+    with pytest.raises(AttributeError):
+        config.NOT_A_SETTING
@@ -0,0 +1,61 @@
+import pytest
+from app.crud import crud
+from app.models import models
+
+
+@pytest.fixture
+def owner(db_session):
+    user = models.User(email="pager@example.com", password="x")
+    db_session.add(user)
+    db_session.commit()
+    names = ["Olha", "Andrii", "Iryna", "Bohdan", "Andrii"]
+    db_session.add_all([
+        models.Contact(name=n, email=f"{n.lower()}{i}@example.com", phone=f"050{i}", owner_id=user.id)
+        for i, n in enumerate(names)
+    ])
+    db_session.commit()
+    yield user
+    db_session.query(models.Contact).filter(models.Contact.owner_id == user.id).delete()
+    db_session.delete(user)
+    db_session.commit()
+
+
+def test_pages_by_id_cover_all_contacts(db_session, owner):
+    seen, cursor = [], None
+    while True:
+        items, cursor = crud.get_contacts_page(db_session, owner.id, limit=2, after=cursor)
+        seen.extend(c.id for c in items)
+        if cursor is None:
+            break
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+
+def test_pages_by_name_are_stable_for_duplicates(db_session, owner):
+    first, cursor = crud.get_contacts_page(db_session, owner.id, limit=2, sort="name")
+    second, _ = crud.get_contacts_page(db_session, owner.id, limit=2, sort="name", after=cursor)
+    assert [c.name for c in first] == ["Andrii", "Andrii"]
+    assert [c.name for c in second] == ["Bohdan", "Iryna"]
+
+
+def test_filters_are_case_insensitive(db_session, owner):
+    items, cursor = crud.get_contacts_page(db_session, owner.id, name="andr")
+    assert {c.name for c in items} == {"Andrii"}
+    assert cursor is None
+    items, _ = crud.get_contacts_page(db_session, owner.id, phone="%")
+    assert items == []
+
+
+def test_cursor_for_other_sort_is_rejected(db_session, owner):
+    _, cursor = crud.get_contacts_page(db_session, owner.id, limit=1)
+    with pytest.raises(ValueError):
+        crud.get_contacts_page(db_session, owner.id, sort="name", after=cursor)
+    with pytest.raises(ValueError):
+        crud.get_contacts_page(db_session, owner.id, after="not-a-cursor")
+
+
+def test_search_puts_prefix_matches_first(db_session, owner):
+    results = crud.search_contacts(db_session, owner.id, "an")
+    assert [c.name for c in results][:3] == ["Andrii", "Andrii", "Bohdan"]
+    assert crud.search_contacts(db_session, owner.id, "iryna0@") == []
+    assert [c.name for c in crud.search_contacts(db_session, owner.id, "IRYNA2")] == ["Iryna"]
@@ -0,0 +1,54 @@
+"""Запити гарячих шляхів: lambda_stmt з кешем компіляції та Session.get."""
+
+from datetime import datetime
+
+from app.crud import crud, queries
+from app.models import models
+
+
+def add_contact(db_session, owner_id, name, **kwargs):
+    contact = models.Contact(name=name, email=f"{name.lower()}@example.com", owner_id=owner_id, **kwargs)
+    db_session.add(contact)
+    db_session.commit()
+    return contact
+
+
+def test_user_by_email_binds_each_call(auth_client, db_session):
+    other = crud.create_user(db_session, "other@example.com", "hashed")
+    try:
+        # Той самий закешований запит, але з новим значенням параметра
+        assert crud.get_user_by_email(db_session, "client@example.com").id == auth_client.user.id
+        assert crud.get_user_by_email(db_session, "other@example.com").id == other.id
+        assert crud.get_user_by_email(db_session, "missing@example.com") is None
+        assert str(queries.user_by_email("a")) == str(queries.user_by_email("b"))
+    finally:
+        db_session.delete(other)
+        db_session.commit()
+
+
+def test_get_contacts_skips_deleted(auth_client, db_session):
+    owner = auth_client.user.id
+    add_contact(db_session, owner, "Ann")
+    add_contact(db_session, owner, "Gone", deleted_at=datetime.utcnow())
+    assert [c.name for c in crud.get_contacts(db_session, owner)] == ["Ann"]
+    assert crud.get_contacts(db_session, owner + 1000) == []
+
+
+def test_get_contact_uses_identity_map(auth_client, db_session, statements):
+    contact = add_contact(db_session, auth_client.user.id, "Ann")
+    statements.clear()
+    assert crud.get_contact(db_session, contact.id, auth_client.user.id) is contact
+    assert crud.get_user_by_id(db_session, auth_client.user.id) is auth_client.user
+    assert statements == []
+
+    db_session.expunge(contact)
+    assert crud.get_contact(db_session, contact.id, auth_client.user.id).name == "Ann"
+    assert len(statements) == 1
+
+
+def test_get_contact_checks_owner_and_deleted(auth_client, db_session):
+    contact = add_contact(db_session, auth_client.user.id, "Ann")
+    assert crud.get_contact(db_session, contact.id, auth_client.user.id + 1000) is None
+    assert crud.get_contact(db_session, 999999, auth_client.user.id) is None
+    crud.delete_contact(db_session, contact)
+    assert crud.get_contact(db_session, contact.id, auth_client.user.id) is None
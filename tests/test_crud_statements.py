@@ -0,0 +1,65 @@
+"""Кількість SQL-операторів на операції запису: без повторного SELECT після коміту."""
+
+from app.crud import crud
+from app.models import models
+from app.schemas import schemas
+
+
+def verbs(statements):
+    return [s.split()[0] for s in statements]
+
+
+def test_create_user_is_single_insert(db_session, statements):
+    user = crud.create_user(db_session, "writer@example.com", "hashed", "writer")
+    try:
+        assert verbs(statements) == ["INSERT"]
+        assert "RETURNING" in statements[0]
+        statements.clear()
+        # Згенеровані БД значення вже завантажені — доступ до них не звертається до БД
+        assert user.id and user.created_at and user.is_verified is False
+        assert statements == []
+    finally:
+        db_session.delete(user)
+        db_session.commit()
+
+
+def test_user_updates_are_single_update(db_session, statements):
+    user = crud.create_user(db_session, "updater@example.com", "hashed", "updater")
+    try:
+        statements.clear()
+        user = crud.set_user_password(db_session, user, "new-hash")
+        user = crud.verify_user_email(db_session, user)
+        user = crud.update_user_avatar(db_session, user, "http://example.com/a.png")
+        assert verbs(statements) == ["UPDATE", "UPDATE", "UPDATE"]
+        assert all("RETURNING" in s for s in statements)
+        statements.clear()
+        assert (user.password, user.is_verified, user.avatar_url) == ("new-hash", True, "http://example.com/a.png")
+        assert statements == []
+    finally:
+        db_session.delete(user)
+        db_session.commit()
+
+
+def test_contact_writes_skip_refresh(auth_client, db_session, statements):
+    owner = auth_client.user.id
+    statements.clear()
+    contact = crud.create_contact(db_session, schemas.ContactCreate(name="Ann", email="ann@example.com"), owner)
+    # Версія списку контактів + INSERT ... RETURNING
+    assert verbs(statements) == ["UPDATE", "INSERT"]
+    statements.clear()
+
+    contact = crud.update_contact(db_session, contact, schemas.ContactUpdate(phone="555"))
+    assert verbs(statements) == ["UPDATE", "UPDATE"]
+    assert "RETURNING" in statements[-1]
+    statements.clear()
+    assert (contact.name, contact.phone, contact.owner_id) == ("Ann", "555", owner)
+    assert statements == []
+
+    db_session.expire_all()
+    assert db_session.get(models.Contact, contact.id).phone == "555"
+
+
+def test_create_contact_endpoint_statements(auth_client, statements):
+    resp = auth_client.post("/contacts/", json={"name": "Bob", "email": "bob@example.com"})
+    assert resp.status_code == 201
+    assert verbs(statements) == ["UPDATE", "INSERT"]
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.database import database
+from app.database.pool import InstrumentedQueuePool, PoolMetrics, instrument_engine
+from app.routes import admin
+
+
+@pytest.fixture
+def pool_engine(tmp_path, request):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.2,
+    )
+    yield engine, instrument_engine(engine, PoolMetrics(request.node.name))
+    engine.dispose()
+
+
+def test_pool_events_feed_metrics(pool_engine):
+    engine, metrics = pool_engine
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("select 1"))
+        second.execute(text("select 1"))
+        snapshot = metrics.snapshot(engine.pool)
+        assert (snapshot["in_use"], snapshot["checked_out"], snapshot["overflow"]) == (2, 2, 1)
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+    snapshot = metrics.snapshot(engine.pool)
+    assert snapshot["in_use"] == 0
+    assert (snapshot["checkouts"], snapshot["overflow_checkouts"], snapshot["timeouts"]) == (2, 1, 1)
+    assert snapshot["connects"] == 2
+    assert snapshot["checkout_wait_seconds"]["count"] == 3
+    assert snapshot["checkout_wait_seconds"]["max"] >= 0.2
+
+
+def test_wait_metrics_survive_dispose(pool_engine):
+    engine, metrics = pool_engine
+    engine.dispose()
+    with engine.connect():
+        pass
+    assert metrics.snapshot(engine.pool)["checkout_wait_seconds"]["count"] == 1
+
+
+def test_admin_pool_endpoint_requires_token(auth_client, monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "")
+    assert auth_client.get("/admin/pool").status_code == 404
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    assert auth_client.get("/admin/pool", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    response = auth_client.get("/admin/pool", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert set(response.json()["sync"]) >= {"in_use", "checkouts", "checkout_wait_seconds"}
+
+
+def test_password_pool_metrics_are_admin_only(auth_client, monkeypatch):
+    assert auth_client.get("/auth/password-pool").status_code == 404
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    assert auth_client.get("/admin/password-pool").status_code == 403
+    response = auth_client.get("/admin/password-pool", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert {"kind", "operations"} <= set(response.json())
+
+
+def test_pool_options_skip_sqlite():
+    assert database.pool_options("sqlite:///x.db") == {}
+    options = database.pool_options("postgresql+asyncpg://u:p@h/db", async_=True)
+    assert options["poolclass"].__name__ == "InstrumentedAsyncQueuePool"
+    assert options["pool_pre_ping"] is False
@@ -0,0 +1,140 @@
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.avatars import images
+from app.avatars.pipeline import AvatarPipeline
+from app.avatars.storage import AvatarStorage, LocalStorage
+from app.crud import crud
+from app.models import models
+from app.routes import contacts as contacts_routes
+
+
+def png_bytes(width=600, height=400):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(out, "PNG")
+    return out.getvalue()
+
+
+class CountingStorage(LocalStorage):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.saved = []
+
+    def save(self, key, data, content_type):
+        self.saved.append(key)
+        return super().save(key, data, content_type)
+
+
+class FailingStorage(AvatarStorage):
+    def save(self, key, data, content_type):
+        raise ConnectionError("storage down")
+
+
+@pytest.fixture
+def pipeline(auth_client, db_session, tmp_path, monkeypatch):
+    bind = db_session.get_bind()
+    pipeline = AvatarPipeline(
+        storage=CountingStorage(str(tmp_path), "/media"),
+        session_factory=lambda: Session(bind=bind, expire_on_commit=False),
+        pool_kind="thread",
+    )
+    monkeypatch.setattr(contacts_routes, "avatar_pipeline", pipeline)
+    yield pipeline
+    pipeline.shutdown()
+    db_session.query(models.AvatarJob).delete()
+    db_session.query(models.User).update({"avatar_hash": None})
+    db_session.query(models.AvatarBlob).delete()
+    db_session.commit()
+
+
+def upload(client, data, db_session):
+    response = client.put("/contacts/1/avatar", files={"file": ("a.png", data, "image/png")})
+    assert response.status_code == 202
+    db_session.expire_all()
+    return client.get(f"/contacts/avatar-jobs/{response.json()['job_id']}").json()
+
+
+def test_prepare_avatar_makes_square_webp_copies():
+    copies = images.prepare_avatar(png_bytes())
+    assert sorted(copies) == sorted(images.AVATAR_SIZES)
+    for size, data in copies.items():
+        with Image.open(io.BytesIO(data)) as img:
+            assert (img.format, img.size) == ("WEBP", (size, size))
+
+
+def test_prepare_avatar_rejects_non_images():
+    with pytest.raises(ValueError):
+        images.prepare_avatar(b"not an image")
+
+
+def test_upload_returns_job_and_updates_avatar(auth_client, db_session, pipeline, tmp_path):
+    job = upload(auth_client, png_bytes(), db_session)
+    assert job["status"] == "done"
+    digest = auth_client.user.avatar_hash
+    assert job["urls"]["256"] == f"/media/avatars/{digest}_256.webp"
+    assert (tmp_path / "avatars" / f"{digest}_64.webp").exists()
+    assert auth_client.user.avatar_url == job["urls"]["256"]
+
+
+def test_same_content_is_uploaded_once(auth_client, db_session, pipeline):
+    first = upload(auth_client, png_bytes(), db_session)
+    second = upload(auth_client, png_bytes(), db_session)
+    assert second["status"] == "done"
+    assert second["urls"] == first["urls"]
+    assert len(pipeline.storage.saved) == len(images.AVATAR_SIZES)
+    assert db_session.get(models.AvatarBlob, auth_client.user.avatar_hash).refcount == 1
+
+
+def test_replaced_avatar_is_garbage_collected(auth_client, db_session, pipeline, tmp_path):
+    upload(auth_client, png_bytes(), db_session)
+    old_hash = auth_client.user.avatar_hash
+    upload(auth_client, png_bytes(300, 300), db_session)
+    assert db_session.get(models.AvatarBlob, old_hash).refcount == 0
+    assert db_session.get(models.AvatarBlob, auth_client.user.avatar_hash).refcount == 1
+
+    assert asyncio.run(pipeline.collect_garbage(grace_seconds=3600)) == 0
+    assert asyncio.run(pipeline.collect_garbage(grace_seconds=-1)) == 1
+    db_session.expire_all()
+    assert db_session.get(models.AvatarBlob, old_hash) is None
+    assert not (tmp_path / "avatars" / f"{old_hash}_256.webp").exists()
+    assert (tmp_path / "avatars" / f"{auth_client.user.avatar_hash}_256.webp").exists()
+
+
+def test_invalid_image_is_rejected_before_job(auth_client, pipeline):
+    response = auth_client.put("/contacts/1/avatar", files={"file": ("a.png", b"garbage", "image/png")})
+    assert response.status_code == 400
+    assert auth_client.get("/contacts/avatar-jobs/unknown").status_code == 404
+
+
+def test_storage_failure_marks_job_failed(auth_client, db_session, pipeline):
+    pipeline._storage = FailingStorage()
+    job = upload(auth_client, png_bytes(), db_session)
+    assert (job["status"], job["error"]) == ("failed", "storage down")
+
+
+def test_jobs_finishing_together_keep_refcounts_consistent(auth_client, db_session, pipeline):
+    user_id, bind = auth_client.user.id, db_session.get_bind()
+    old, first_hash, second_hash = "0" * 64, "1" * 64, "2" * 64
+    crud.finish_avatar_job(db_session, crud.create_avatar_job(db_session, user_id).id, old, {256: "/old"})
+    jobs = [crud.create_avatar_job(db_session, user_id).id for _ in range(2)]
+
+    first, second = Session(bind=bind, expire_on_commit=False), Session(bind=bind, expire_on_commit=False)
+    try:
+        # Обидва завдання прочитали користувача (зі старим аватаром) до того, як інше завершилося
+        loaded = [first.get(models.User, user_id), second.get(models.User, user_id)]
+        assert {user.avatar_hash for user in loaded} == {old}
+        crud.finish_avatar_job(second, jobs[1], second_hash, {256: "/second"})
+        crud.finish_avatar_job(first, jobs[0], first_hash, {256: "/first"})
+    finally:
+        first.close()
+        second.close()
+
+    db_session.expire_all()
+    refcounts = dict(db_session.execute(select(models.AvatarBlob.hash, models.AvatarBlob.refcount)).all())
+    assert refcounts == {old: 0, second_hash: 0, first_hash: 1}
+    assert db_session.get(models.User, user_id).avatar_hash == first_hash
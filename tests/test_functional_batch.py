@@ -0,0 +1,68 @@
+from app.models import models
+
+
+def test_batch_applies_mixed_operations_in_one_transaction(auth_client, db_session, statements, create_contact):
+    create_contact("Keep")
+    change, drop = create_contact("Change")["id"], create_contact("Drop")["id"]
+    other = create_contact("Other")["id"]
+    statements.clear()
+
+    resp = auth_client.post("/contacts/batch", json={"operations": [
+        {"op": "create", "data": {"name": "New", "email": "new@example.com"}},
+        {"op": "update", "id": change, "data": {"phone": "555"}},
+        {"op": "update", "id": other, "data": {"name": "Renamed", "address": "Kyiv"}},
+        {"op": "delete", "id": drop},
+    ]})
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["committed"], data["applied"], data["failed"]) == (True, 4, 0)
+    assert [r["status"] for r in data["results"]] == [201, 200, 200, 204]
+    assert data["results"][0]["contact"]["name"] == "New"
+    assert data["results"][1]["contact"] == {
+        "id": change, "name": "Change", "email": "change@example.com", "phone": "555", "address": None,
+        "owner_id": auth_client.user.id,
+    }
+    assert data["results"][2]["contact"]["name"] == "Renamed"
+
+    # Перевірка належності, версія колекції, INSERT, UPDATE, видалення — без SELECT на кожен контакт
+    queries = [s.split()[0] for s in statements]
+    assert queries == ["SELECT", "UPDATE", "INSERT", "UPDATE", "UPDATE"]
+
+    db_session.expire_all()
+    names = {c.name for c in db_session.query(models.Contact).filter_by(owner_id=auth_client.user.id, deleted_at=None)}
+    assert names == {"Keep", "Change", "Renamed", "New"}
+
+
+def test_batch_reports_missing_and_duplicate_ids(auth_client, create_contact):
+    contact = create_contact("Ann")["id"]
+    resp = auth_client.post("/contacts/batch", json={"operations": [
+        {"op": "update", "id": contact, "data": {"phone": "1"}},
+        {"op": "delete", "id": contact},
+        {"op": "delete", "id": 999999},
+    ]})
+    statuses = [(r["status"], r["error"]) for r in resp.json()["results"]]
+    assert statuses[0] == (200, None)
+    assert statuses[1][0] == 409
+    assert statuses[2] == (404, "Not found")
+    assert auth_client.get(f"/contacts/{contact}").json()["phone"] == "1"
+
+
+def test_atomic_batch_applies_nothing_on_failure(auth_client, db_session, create_contact):
+    contact = create_contact("Ann")["id"]
+    resp = auth_client.post("/contacts/batch", json={"atomic": True, "operations": [
+        {"op": "create", "data": {"name": "New", "email": "new@example.com"}},
+        {"op": "update", "id": contact, "data": {"phone": "1"}},
+        {"op": "delete", "id": 999999},
+    ]})
+    data = resp.json()
+    assert (data["committed"], data["applied"], data["failed"]) == (False, 0, 3)
+    assert [r["status"] for r in data["results"]] == [424, 424, 404]
+    assert auth_client.get(f"/contacts/{contact}").json()["phone"] is None
+    assert db_session.query(models.Contact).filter_by(owner_id=auth_client.user.id).count() == 1
+
+
+def test_batch_rejects_invalid_operations(auth_client):
+    assert auth_client.post("/contacts/batch", json={"operations": []}).status_code == 422
+    bad = {"operations": [{"op": "update", "data": {"phone": "1"}}]}
+    assert auth_client.post("/contacts/batch", json=bad).status_code == 422
@@ -0,0 +1,60 @@
+import json
+
+from app.models import models
+
+
+def test_bulk_import_ndjson_reports_bad_rows(auth_client, db_session):
+    body = "\n".join([
+        json.dumps({"name": "Ann", "email": "ann@example.com"}),
+        json.dumps({"name": "Bob", "email": "not-an-email"}),
+        "{broken",
+        json.dumps({"name": "Cat", "email": "cat@example.com", "phone": "123"}),
+    ])
+    resp = auth_client.post("/contacts/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["inserted"], data["failed"]) == (2, 2)
+    assert [e["row"] for e in data["errors"]] == [2, 3]
+    names = {c.name for c in db_session.query(models.Contact).filter_by(owner_id=auth_client.user.id)}
+    assert names == {"Ann", "Cat"}
+
+
+def test_bulk_import_csv_and_export_roundtrip(auth_client):
+    body = "name,email,phone\nDan,dan@example.com,\nEve,eve@example.com,555\n"
+    resp = auth_client.post("/contacts/bulk", content=body, headers={"Content-Type": "text/csv"})
+    assert resp.json()["inserted"] == 2
+
+    export = auth_client.get("/contacts/export")
+    assert export.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in export.text.splitlines()]
+    assert [(r["name"], r["phone"]) for r in rows] == [("Dan", None), ("Eve", "555")]
+
+    csv_export = auth_client.get("/contacts/export", params={"format": "csv"})
+    assert csv_export.text.splitlines()[0] == "id,name,email,phone,address"
+    assert len(csv_export.text.splitlines()) == 3
+
+
+def test_bulk_import_rejects_unknown_content_type(auth_client):
+    resp = auth_client.post("/contacts/bulk", content="x", headers={"Content-Type": "text/plain"})
+    assert resp.status_code == 415
+
+
+def test_fast_and_ndjson_list_modes_match_default(auth_client):
+    body = "\n".join(json.dumps({"name": f"N{i}", "email": f"n{i}@example.com"}) for i in range(5))
+    auth_client.post("/contacts/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    default = auth_client.get("/contacts/", params={"limit": 3}).json()
+    fast = auth_client.get("/contacts/", params={"limit": 3, "fast": True}).json()
+    assert fast == default
+
+    stream = auth_client.get("/contacts/", headers={"Accept": "application/x-ndjson"})
+    assert stream.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in stream.text.splitlines()]
+    assert rows[:3] == default["items"]
+    assert len(rows) == 5
+
+    limited = auth_client.get("/contacts/", params={"limit": 2, "after": default["next_cursor"]},
+                              headers={"Accept": "application/x-ndjson"})
+    assert [json.loads(line)["name"] for line in limited.text.splitlines()] == ["N3", "N4"]
+    bad = auth_client.get("/contacts/", params={"after": "bad"}, headers={"Accept": "application/x-ndjson"})
+    assert bad.status_code == 400
@@ -0,0 +1,34 @@
+def test_changes_feed_reports_creates_updates_and_tombstones(auth_client, create_contact):
+    ann, bob = create_contact("Ann"), create_contact("Bob")
+    full = auth_client.get("/contacts/changes").json()
+    assert [c["contact"]["name"] for c in full["changes"]] == ["Ann", "Bob"]
+    assert full["has_more"] is False
+
+    token = full["next_token"]
+    assert auth_client.get("/contacts/changes", params={"since": token}).json()["changes"] == []
+
+    auth_client.put(f"/contacts/{ann['id']}", json={"phone": "555"})
+    auth_client.delete(f"/contacts/{bob['id']}")
+    delta = auth_client.get("/contacts/changes", params={"since": token}).json()
+    assert delta["changes"] == [
+        {"id": ann["id"], "deleted": False, "contact": {**ann, "phone": "555"}},
+        {"id": bob["id"], "deleted": True, "contact": None},
+    ]
+
+    assert auth_client.get(f"/contacts/{bob['id']}").status_code == 404
+    assert [c["name"] for c in auth_client.get("/contacts/").json()["items"]] == ["Ann"]
+
+
+def test_changes_feed_pages_inside_one_bulk_sequence(auth_client):
+    body = "name,email\n" + "".join(f"N{i},n{i}@example.com\n" for i in range(5))
+    auth_client.post("/contacts/bulk", content=body, headers={"Content-Type": "text/csv"})
+    seen, token = [], None
+    while True:
+        params = {"limit": 2, **({"since": token} if token else {})}
+        page = auth_client.get("/contacts/changes", params=params).json()
+        seen += [c["contact"]["name"] for c in page["changes"]]
+        token = page["next_token"]
+        if not page["has_more"]:
+            break
+    assert seen == [f"N{i}" for i in range(5)]
+    assert auth_client.get("/contacts/changes", params={"since": "garbage"}).status_code == 400
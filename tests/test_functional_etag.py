@@ -0,0 +1,38 @@
+def test_list_etag_short_circuits_until_collection_changes(auth_client, create_contact):
+    create_contact("Ann")
+    first = auth_client.get("/contacts/")
+    etag = first.headers["etag"]
+
+    cached = auth_client.get("/contacts/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    other_view = auth_client.get("/contacts/", params={"fast": True}, headers={"If-None-Match": etag})
+    assert other_view.status_code == 200
+
+    create_contact("Bob")
+    changed = auth_client.get("/contacts/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()["items"]) == 2
+
+
+def test_list_etag_changes_on_update_and_delete(auth_client, create_contact):
+    contact = create_contact("Cat")
+    etag = auth_client.get("/contacts/").headers["etag"]
+    auth_client.put(f"/contacts/{contact['id']}", json={"phone": "555"})
+    etag_after_update = auth_client.get("/contacts/").headers["etag"]
+    assert etag_after_update != etag
+    auth_client.delete(f"/contacts/{contact['id']}")
+    assert auth_client.get("/contacts/").headers["etag"] != etag_after_update
+
+
+def test_single_contact_etag(auth_client, create_contact):
+    contact = create_contact("Dan")
+    resp = auth_client.get(f"/contacts/{contact['id']}")
+    assert resp.json()["name"] == "Dan"
+    etag = resp.headers["etag"]
+    assert auth_client.get(f"/contacts/{contact['id']}", headers={"If-None-Match": etag}).status_code == 304
+    auth_client.put(f"/contacts/{contact['id']}", json={"name": "Daniel"})
+    assert auth_client.get(f"/contacts/{contact['id']}", headers={"If-None-Match": etag}).status_code == 200
+    assert auth_client.get("/contacts/999999").status_code == 404
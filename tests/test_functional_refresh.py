@@ -0,0 +1,94 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.crud import crud
+from app.database.database import get_db
+from app.main import app
+from app.models import models
+from app.redis_cache.revocation import RevocationList
+from app.routes import auth
+from app.utils import tokens
+
+EMAIL = "refresh@example.com"
+PASSWORD = "secret-password"
+
+
+@pytest.fixture
+def client(db_session, monkeypatch):
+    user = models.User(email=EMAIL, password=crud.get_password_hash(PASSWORD))
+    db_session.add(user)
+    db_session.commit()
+
+    def override_get_db():
+        yield db_session
+
+    monkeypatch.setattr(auth, "revocations", RevocationList(redis=None))
+    tokens.token_cache.clear()
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    db_session.query(models.User).filter(models.User.email == EMAIL).delete()
+    db_session.commit()
+
+
+def login(client):
+    response = client.post("/auth/token", data={"username": EMAIL, "password": PASSWORD})
+    assert response.status_code == 200
+    return response.json()
+
+
+def bearer(pair):
+    return {"Authorization": f"Bearer {pair['access_token']}"}
+
+
+def test_login_returns_rotating_token_pair(client):
+    pair = login(client)
+    assert pair["token_type"] == "bearer" and pair["expires_in"] > 0
+    assert client.get("/contacts/", headers=bearer(pair)).status_code == 200
+
+    rotated = client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]})
+    assert rotated.status_code == 200
+    new_pair = rotated.json()
+    assert new_pair["refresh_token"] != pair["refresh_token"]
+    assert client.get("/contacts/", headers=bearer(new_pair)).status_code == 200
+
+
+def test_refresh_token_is_not_an_access_token(client):
+    pair = login(client)
+    response = client.get("/contacts/", headers={"Authorization": f"Bearer {pair['refresh_token']}"})
+    assert response.status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": pair["access_token"]}).status_code == 401
+
+
+def test_refresh_token_reuse_revokes_the_session(client):
+    pair = login(client)
+    new_pair = client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]}).json()
+
+    reused = client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]})
+    assert reused.status_code == 401
+    # Уся сесія відкликана: і нові токени, отримані легітимним клієнтом
+    assert client.get("/contacts/", headers=bearer(new_pair)).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": new_pair["refresh_token"]}).status_code == 401
+
+
+def test_logout_revokes_only_its_session(client):
+    pair, other = login(client), login(client)
+    assert client.post("/auth/logout", headers=bearer(pair)).status_code == 200
+
+    assert client.get("/contacts/", headers=bearer(pair)).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]}).status_code == 401
+    assert client.get("/contacts/", headers=bearer(other)).status_code == 200
+
+
+def test_password_reset_revokes_existing_tokens(client):
+    # Вхід і скидання зазвичай потрапляють в одну секунду — такі токени теж відкликаються
+    pair = login(client)
+    reset_token = auth.create_token({"sub": EMAIL, "type": "reset"})
+
+    response = client.post("/auth/reset-password", json={"token": reset_token, "new_password": "new-password"})
+    assert response.status_code == 200
+    assert client.get("/contacts/", headers=bearer(pair)).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": pair["refresh_token"]}).status_code == 401
+
+    again = client.post("/auth/reset-password", json={"token": reset_token, "new_password": "other"})
+    assert again.status_code == 400
@@ -0,0 +1,49 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.crud import crud
+from app.database.database import get_db
+from app.main import app
+from app.models import models
+
+EMAIL = "register@example.com"
+
+
+@pytest.fixture
+def client(db_session):
+    def override_get_db():
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    db_session.rollback()
+    db_session.query(models.EmailOutbox).delete()
+    db_session.query(models.User).filter(models.User.email == EMAIL).delete()
+    db_session.commit()
+
+
+def test_register_queues_verification_email_with_the_user(client, db_session):
+    response = client.post("/auth/register", json={"email": EMAIL, "password": "secret-password"})
+    assert response.status_code == 200
+    message = db_session.query(models.EmailOutbox).one()
+    assert (message.to_email, message.subject, message.status) == (EMAIL, "Verify your email", "pending")
+
+
+def test_register_creates_no_user_when_email_cannot_be_queued(client, db_session, monkeypatch):
+    def broken_queue(db, to_email, token):
+        raise RuntimeError("outbox insert failed")
+
+    monkeypatch.setattr(crud.mailer, "queue_verification_email", broken_queue)
+    with pytest.raises(RuntimeError):
+        client.post("/auth/register", json={"email": EMAIL, "password": "secret-password"})
+    db_session.rollback()
+    assert db_session.query(models.User).filter(models.User.email == EMAIL).count() == 0
+
+
+def test_forgot_password_commits_reset_email(client, db_session):
+    db_session.add(models.User(email=EMAIL, password="x"))
+    db_session.commit()
+    assert client.post("/auth/forgot-password", json={"email": EMAIL}).status_code == 200
+    db_session.rollback()
+    assert db_session.query(models.EmailOutbox).one().subject == "Reset your password"
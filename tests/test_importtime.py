@@ -0,0 +1,29 @@
+from benchmarks import importtime
+
+from app.redis_cache.redis_cache import LazyRedis
+
+
+def test_parse_importtime_report():
+    report = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |     app.config.config\n"
+        "import time:       300 |        420 |   app.main\n"
+    )
+    assert importtime.parse_importtime(report) == {"app.config.config": (120, 120), "app.main": (300, 420)}
+
+
+def test_heavy_integrations_load_on_first_use():
+    assert importtime.eager_integrations(importtime.loaded_modules("app.main")) == []
+
+
+def test_app_import_time_within_budget():
+    best = min(importtime.import_times("app.main")["app.main"][1] for _ in range(3)) / 1000
+    assert best <= importtime.BUDGET_MS, f"import app.main took {best:.0f} ms"
+
+
+def test_lazy_redis_connects_on_first_access():
+    created = []
+    client = LazyRedis(lambda: created.append(1) or type("Client", (), {"ping": lambda self: "PONG"})())
+    assert created == []
+    assert client.ping() == client.ping() == "PONG"
+    assert created == [1]
@@ -0,0 +1,170 @@
+import smtplib
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.mailer import mailer
+from app.mailer.outbox import MailOutboxWorker
+from app.models import models
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+
+class CollectingHandler:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = CollectingHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield handler, controller
+    controller.stop()
+
+
+@pytest.fixture
+def outbox(db_session):
+    yield db_session
+    db_session.query(models.EmailOutbox).delete()
+    db_session.commit()
+
+
+def make_worker(db_session, factory):
+    return MailOutboxWorker(session_factory=lambda: db_session, smtp_factory=factory, batch_size=10)
+
+
+def test_batch_is_sent_over_one_connection(outbox, smtp_server):
+    handler, controller = smtp_server
+    connections = []
+
+    def factory():
+        connections.append(smtplib.SMTP(controller.hostname, controller.port))
+        return connections[-1]
+
+    mailer.queue_verification_email(outbox, "a@example.com", "tok")
+    mailer.queue_reset_email(outbox, "b@example.com", "tok")
+    outbox.commit()
+    worker = make_worker(outbox, factory)
+
+    assert worker.process_batch() == 2
+    worker.close()
+
+    assert len(connections) == 1
+    assert sorted(m.rcpt_tos[0] for m in handler.messages) == ["a@example.com", "b@example.com"]
+    statuses = {m.to_email: m.status for m in outbox.query(models.EmailOutbox)}
+    assert statuses == {"a@example.com": "sent", "b@example.com": "sent"}
+
+
+def test_failed_delivery_is_retried_with_backoff(outbox, smtp_server):
+    handler, controller = smtp_server
+    calls = []
+
+    def flaky_factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionRefusedError("smtp down")
+        return smtplib.SMTP(controller.hostname, controller.port)
+
+    mailer.queue_email(outbox, "c@example.com", "Hi", "Body")
+    outbox.commit()
+    worker = make_worker(outbox, flaky_factory)
+
+    assert worker.process_batch() == 1
+    item = outbox.query(models.EmailOutbox).one()
+    assert (item.status, item.attempts) == ("pending", 1)
+    assert item.next_attempt_at > datetime.utcnow()
+    assert worker.process_batch() == 0
+
+    outbox.query(models.EmailOutbox).update({"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)})
+    outbox.commit()
+    assert worker.process_batch() == 1
+    worker.close()
+    assert outbox.query(models.EmailOutbox).one().status == "sent"
+    assert len(handler.messages) == 1
+
+
+class FakeSMTP:
+    def __init__(self, fail_with=None):
+        self.fail_with = fail_with
+        self.sent = []
+        self.closed = False
+
+    def send_message(self, message):
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.sent.append(message["To"])
+
+    def close(self):
+        self.closed = True
+
+    def quit(self):
+        self.closed = True
+
+
+def test_connection_is_replaced_after_a_timeout(outbox):
+    connections = [FakeSMTP(fail_with=socket.timeout("timed out")), FakeSMTP()]
+    opened = []
+
+    def factory():
+        opened.append(connections[len(opened)])
+        return opened[-1]
+
+    mailer.queue_email(outbox, "f@example.com", "Hi", "Body")
+    mailer.queue_email(outbox, "g@example.com", "Hi", "Body")
+    outbox.commit()
+    worker = make_worker(outbox, factory)
+
+    assert worker.process_batch() == 2
+    worker.close()
+
+    assert len(opened) == 2
+    assert opened[0].closed and opened[0].sent == []
+    assert opened[1].sent == ["g@example.com"]
+    statuses = {m.to_email: m.status for m in outbox.query(models.EmailOutbox)}
+    assert statuses == {"f@example.com": "pending", "g@example.com": "sent"}
+    assert "timed out" in outbox.query(models.EmailOutbox).filter_by(to_email="f@example.com").one().last_error
+
+
+def test_smtp_is_used_outside_the_claim_transaction(outbox, smtp_server):
+    handler, controller = smtp_server
+    in_transaction = []
+
+    def factory():
+        in_transaction.append(outbox.in_transaction())
+        return smtplib.SMTP(controller.hostname, controller.port)
+
+    mailer.queue_email(outbox, "d@example.com", "Hi", "Body")
+    outbox.commit()
+    worker = make_worker(outbox, factory)
+    assert worker.process_batch() == 1
+    worker.close()
+    assert in_transaction == [False]
+    assert outbox.query(models.EmailOutbox).one().status == "sent"
+
+
+def test_claimed_email_returns_to_queue_after_lease(outbox):
+    mailer.queue_email(outbox, "e@example.com", "Hi", "Body")
+    outbox.commit()
+    worker = make_worker(outbox, factory=None)
+
+    claimed = worker.claim_batch()
+    assert [item.attempts for item in claimed] == [1]
+    # Воркер «впав» після того, як забрав лист: до кінця оренди його ніхто не бере
+    assert worker.claim_batch() == []
+
+    outbox.query(models.EmailOutbox).update({"next_attempt_at": datetime.utcnow() - timedelta(seconds=1)})
+    outbox.commit()
+    assert [item.attempts for item in worker.claim_batch()] == [2]
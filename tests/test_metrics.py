@@ -0,0 +1,72 @@
+import os
+
+from app.metrics import multiprocess
+from app.metrics.metrics import Registry, render_text
+
+
+def test_histogram_and_counter_render_prometheus_text():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    requests.labels("/a").inc()
+    requests.labels(route="/a").inc()
+    latency.labels().observe(0.05)
+    latency.labels().observe(0.5)
+
+    text = render_text(registry.collect())
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{route="/a"} 2.0' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert 'latency_seconds_count 2' in text
+
+
+def test_multiprocess_merge_sums_counters_and_drops_dead_gauges(tmp_path):
+    registry = Registry()
+    registry.counter("jobs_total", "Jobs.").labels().inc(3)
+    registry.gauge("busy", "Busy.").labels().inc(2)
+    registry.histogram("t_seconds", "T.", buckets=(1.0,)).labels().observe(0.5)
+    multiprocess.write_snapshot(str(tmp_path), registry, pid=os.getpid())
+    multiprocess.write_snapshot(str(tmp_path), registry, pid=2 ** 22 + 1)
+
+    merged = multiprocess.merge_snapshots(str(tmp_path))
+    assert merged["jobs_total"]["samples"] == [[{}, 6.0]]
+    assert merged["busy"]["samples"] == [[{}, 2.0]]
+    assert merged["t_seconds"]["samples"][0][1]["buckets"] == {"1.0": 2, "+Inf": 2}
+
+
+def test_restarted_worker_with_reused_pid_keeps_old_counters(tmp_path):
+    def snapshot(jobs, busy, started):
+        registry = Registry()
+        registry.counter("jobs_total", "Jobs.").labels().inc(jobs)
+        registry.gauge("busy", "Busy.").labels().inc(busy)
+        multiprocess.write_snapshot(str(tmp_path), registry, pid=os.getpid(), started=started)
+
+    snapshot(jobs=5, busy=3, started=1)  # завершений воркер
+    snapshot(jobs=1, busy=1, started=2)  # новий воркер отримав той самий PID
+
+    merged = multiprocess.merge_snapshots(str(tmp_path))
+    assert merged["jobs_total"]["samples"] == [[{}, 6.0]]
+    assert merged["busy"]["samples"] == [[{}, 1.0]]
+
+
+def test_clear_snapshots_removes_previous_run(tmp_path):
+    multiprocess.write_snapshot(str(tmp_path), Registry(), pid=123, started=1)
+    (tmp_path / "keep.txt").write_text("")
+    multiprocess.clear_snapshots(str(tmp_path))
+    assert os.listdir(tmp_path) == ["keep.txt"]
+    assert multiprocess.merge_snapshots(str(tmp_path)) == {}
+
+
+def test_requests_are_measured_per_route_with_db_queries(auth_client, db_session):
+    from app.metrics.middleware import instrument_queries
+
+    instrument_queries(db_session.get_bind())
+    auth_client.post("/contacts/", json={"name": "Ann", "email": "ann@example.com"})
+    auth_client.get("/contacts/")
+    text = auth_client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/contacts/",status="200"}' in text
+    assert 'http_request_duration_seconds_count{method="POST",route="/contacts/"}' in text
+    line = next(l for l in text.splitlines() if l.startswith('http_request_db_queries_sum{method="GET",route="/contacts/"}'))
+    assert float(line.split()[-1]) >= 2
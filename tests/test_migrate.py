@@ -0,0 +1,145 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, ForeignKey, Index, Integer, MetaData, String, Table, create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from app.database.database import get_db
+from app.database.migrate import add_column, add_index, migrate
+from app.main import app
+from app.models import models
+from app.rate_limit.rate_limit import limiter
+from app.routes.auth import get_current_user
+
+
+def test_migrate_creates_schema_and_is_idempotent(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    migrate(engine)
+    migrate(engine)
+    assert {"users", "contacts", "email_outbox"} <= set(inspect(engine).get_table_names())
+    engine.dispose()
+
+
+def test_add_column_and_index_upgrade_existing_table(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    old = MetaData()
+    Table("parents", old, Column("id", Integer, primary_key=True))
+    Table("items", old, Column("id", Integer, primary_key=True))
+    old.create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO items (id) VALUES (1)")
+
+    new = MetaData()
+    Table("parents", new, Column("id", Integer, primary_key=True))
+    items = Table(
+        "items", new,
+        Column("id", Integer, primary_key=True),
+        Column("version", Integer, nullable=False, server_default="0"),
+        Column("parent_id", Integer, ForeignKey("parents.id", ondelete="SET NULL")),
+        Column("name", String(20)),
+    )
+    index = Index("ix_items_version_id", items.c.version, items.c.id)
+    for attempt in range(2):
+        with engine.begin() as conn:
+            added = [add_column(conn, items.c[name]) for name in ("version", "parent_id", "name")]
+            add_index(conn, index)
+        assert added == [attempt == 0] * 3
+
+    insp = inspect(engine)
+    assert [c["name"] for c in insp.get_columns("items")] == ["id", "version", "parent_id", "name"]
+    assert insp.get_foreign_keys("items")[0]["referred_table"] == "parents"
+    assert "ix_items_version_id" in {i["name"] for i in insp.get_indexes("items")}
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT version FROM items").scalar() == 0
+    engine.dispose()
+
+
+def baseline_engine(tmp_path):
+    """База зі схемою до змін моделей: лише таблиці users і contacts у початковому вигляді."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(100) NOT NULL UNIQUE, "
+            "password VARCHAR(255) NOT NULL, username VARCHAR(50) UNIQUE, is_verified BOOLEAN, "
+            "avatar_url VARCHAR(255), created_at DATETIME)"
+        )
+        conn.exec_driver_sql(
+            "CREATE TABLE contacts (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, "
+            "email VARCHAR(100) NOT NULL, phone VARCHAR(20), address VARCHAR(255), "
+            "owner_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE)"
+        )
+        conn.exec_driver_sql("INSERT INTO users (id, email, password) VALUES (1, 'old@example.com', 'x')")
+        conn.exec_driver_sql("INSERT INTO contacts (name, email, owner_id) VALUES ('Ann', 'ann@example.com', 1)")
+    return engine
+
+
+def test_migrate_adds_contact_owner_indexes(tmp_path):
+    engine = baseline_engine(tmp_path)
+    migrate(engine)
+    with engine.connect() as conn:
+        names = set(conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+    assert {"ix_contacts_owner_id_id", "ix_contacts_owner_id_name_id", "ix_contacts_owner_id_email_lower"} <= names
+    engine.dispose()
+
+
+def test_migrate_adds_etag_columns(tmp_path):
+    engine = baseline_engine(tmp_path)
+    migrate(engine)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT contacts_version FROM users").scalar() == 0
+        assert conn.exec_driver_sql("SELECT updated_at FROM contacts").scalar() is None
+    engine.dispose()
+
+
+def test_migrate_adds_tombstone_columns(tmp_path):
+    engine = baseline_engine(tmp_path)
+    migrate(engine)
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT deleted_at, change_seq FROM contacts").one() == (None, 0)
+    assert "ix_contacts_owner_id_change_seq_id" in {i["name"] for i in inspect(engine).get_indexes("contacts")}
+    engine.dispose()
+
+
+def test_migrate_adds_avatar_hash_reference(tmp_path):
+    engine = baseline_engine(tmp_path)
+    migrate(engine)
+    insp = inspect(engine)
+    assert "avatar_hash" in {c["name"] for c in insp.get_columns("users")}
+    assert {(fk["referred_table"], tuple(fk["referred_columns"])) for fk in insp.get_foreign_keys("users")} == {
+        ("avatar_blobs", ("hash",)),
+    }
+    engine.dispose()
+
+
+def test_contact_routes_work_after_migrating_baseline_schema(tmp_path):
+    engine = baseline_engine(tmp_path)
+    migrate(engine)
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+    owner = db.get(models.User, 1)
+
+    def override_get_db():
+        yield db
+
+    limiter.reset()
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: owner
+    try:
+        client = TestClient(app)
+        listed = client.get("/contacts/")
+        assert listed.status_code == 200 and "ETag" in listed.headers
+        assert [c["name"] for c in listed.json()["items"]] == ["Ann"]
+        old_id = listed.json()["items"][0]["id"]
+
+        created = client.post("/contacts/", json={"name": "Bob", "email": "bob@example.com"})
+        assert created.status_code == 201
+        assert client.put(f"/contacts/{old_id}", json={"name": "Ann B", "email": "ann@example.com"}).status_code == 200
+        assert client.get(f"/contacts/{old_id}").json()["name"] == "Ann B"
+        assert client.get("/contacts/search", params={"q": "bob"}).json()[0]["name"] == "Bob"
+        assert client.delete(f"/contacts/{created.json()['id']}").status_code == 204
+
+        changes = client.get("/contacts/changes").json()["changes"]
+        assert {(c["id"], c["deleted"]) for c in changes} == {(old_id, False), (created.json()["id"], True)}
+        # Версія колекції змінилася — старий ETag більше не дає 304
+        assert client.get("/contacts/", headers={"If-None-Match": listed.headers["ETag"]}).status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+        db.close()
+        engine.dispose()
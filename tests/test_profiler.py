@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+
+from app.metrics import profiler
+from app.metrics.middleware import instrument_queries
+from app.routes import admin
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(profiler, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "secret")
+    profiler.profile_buffer.clear()
+    yield "secret"
+    profiler.profile_buffer.clear()
+
+
+def test_profile_token_is_signed_and_expires():
+    token = profiler.sign_profile_token(int(time.time()) + 60, "k")
+    assert profiler.verify_profile_token(token, "k")
+    assert not profiler.verify_profile_token(token, "other")
+    assert not profiler.verify_profile_token(profiler.sign_profile_token(int(time.time()) - 1, "k"), "k")
+    assert not profiler.verify_profile_token("garbage", "k")
+
+
+def test_signed_header_profiles_request(auth_client, db_session, admin_token):
+    instrument_queries(db_session.get_bind())
+    auth_client.get("/contacts/")
+    assert profiler.profile_buffer.list() == []
+
+    token = profiler.sign_profile_token(int(time.time()) + 60)
+    assert auth_client.get("/contacts/", headers={"X-Profile": token}).status_code == 200
+    auth_client.get("/contacts/", headers={"X-Profile": "1.forged"})
+
+    summaries = auth_client.get("/admin/profiles", headers={"X-Admin-Token": admin_token}).json()
+    assert [(s["path"], s["reason"], s["status"]) for s in summaries] == [("/contacts/", "header", 200)]
+    report = auth_client.get(f"/admin/profiles/{summaries[0]['id']}", headers={"X-Admin-Token": admin_token}).json()
+    assert report["sql_count"] >= 1
+    assert any("FROM contacts" in s["statement"] for s in report["sql"])
+    assert report["call_tree"]
+
+
+def test_sample_rate_profiles_without_header():
+    buffer = profiler.ProfileBuffer(maxlen=2)
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 204, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def noop(message):
+        pass
+
+    middleware = profiler.ProfilerMiddleware(app, sample_rate=1.0, buffer=buffer)
+    scope = {"type": "http", "method": "GET", "path": "/x", "headers": [], "query_string": b""}
+    for _ in range(3):
+        asyncio.run(middleware(scope, None, noop))
+    assert [r["id"] for r in buffer.list()] == [3, 2]
+    assert buffer.get(3)["status"] == 204
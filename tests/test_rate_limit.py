@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.rate_limit.rate_limit import RateLimiter, limiter, parse_route_limits
+
+
+class TestRateLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_local_buckets_allow_limit_then_reject(self):
+        rl = RateLimiter(default_per_minute=3)
+        results = [await rl.hit("contacts:create", 1) for _ in range(4)]
+        self.assertEqual([r.allowed for r in results], [True, True, True, False])
+        self.assertEqual([r.remaining for r in results], [2, 1, 0, 0])
+        self.assertAlmostEqual(results[-1].retry_after, 20, delta=0.5)
+        self.assertEqual(results[-1].headers()["Retry-After"], "20")
+        self.assertTrue((await rl.hit("contacts:create", 2)).allowed)
+
+    async def test_route_overrides(self):
+        rl = RateLimiter(default_per_minute=10, route_limits=parse_route_limits("contacts:bulk=5, a=1"))
+        self.assertEqual(rl.limit_for("contacts:bulk"), 5)
+        self.assertEqual(rl.limit_for("a"), 1)
+        self.assertEqual(rl.limit_for("contacts:create"), 10)
+
+    async def test_redis_script_result_is_used(self):
+        redis = MagicMock()
+        script = AsyncMock(return_value=[0, 0, 60000, 6000])
+        redis.register_script.return_value = script
+        result = await RateLimiter(redis=redis, default_per_minute=10).hit("contacts:create", 7)
+        script.assert_awaited_once_with(keys=["ratelimit:contacts:create:7"], args=[60000, 10])
+        self.assertFalse(result.allowed)
+        self.assertEqual(result.headers()["Retry-After"], "6")
+
+    async def test_falls_back_to_local_when_redis_fails(self):
+        redis = MagicMock()
+        script = AsyncMock(side_effect=ConnectionError("down"))
+        redis.register_script.return_value = script
+        rl = RateLimiter(redis=redis, default_per_minute=1)
+        self.assertTrue((await rl.hit("x", 1)).allowed)
+        self.assertFalse((await rl.hit("x", 1)).allowed)
+        self.assertEqual(script.await_count, 1)
+
+
+def test_create_contact_is_limited_per_user(auth_client):
+    per_minute = limiter.limit_for("contacts:create")
+    for i in range(per_minute):
+        response = auth_client.post("/contacts/", json={"name": f"C{i}", "email": f"c{i}@example.com"})
+        assert response.status_code == 201
+        assert response.headers["X-RateLimit-Remaining"] == str(per_minute - i - 1)
+    response = auth_client.post("/contacts/", json={"name": "Late", "email": "late@example.com"})
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too Many Requests"}
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.headers["X-RateLimit-Limit"] == str(per_minute)
@@ -0,0 +1,137 @@
+import asyncio
+import shutil
+
+import fakeredis
+import pytest
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.database import database
+from app.database.database import Base, get_db
+from app.database.replicas import PRIMARY, ReplicaSet, RoutingSession
+from app.main import app
+from app.models import models
+from app.rate_limit.rate_limit import limiter
+from app.routes.auth import get_current_user
+
+
+@pytest.fixture
+def cluster(tmp_path):
+    """Основна БД і дві «репліки» — копії її файлу SQLite (знімки на момент копіювання)."""
+    primary_path = tmp_path / "primary.db"
+    primary = create_engine(f"sqlite:///{primary_path}")
+    Base.metadata.create_all(primary)
+    with sessionmaker(bind=primary)() as db:
+        user = models.User(email="owner@example.com", password="x")
+        db.add(user)
+        db.flush()
+        db.add(models.Contact(name="Ann", email="ann@example.com", owner_id=user.id))
+        db.commit()
+    urls = []
+    for name in ("replica1.db", "replica2.db"):
+        shutil.copy(primary_path, tmp_path / name)
+        urls.append(f"sqlite:///{tmp_path / name}")
+    # Зміна після «реплікації»: її бачить лише основна БД
+    with primary.begin() as conn:
+        conn.execute(update(models.Contact).values(name="Ann (primary)"))
+    yield primary, urls
+    primary.dispose()
+
+
+def make_session(primary, replica_set):
+    return sessionmaker(class_=RoutingSession, replica_set=replica_set, bind=primary, expire_on_commit=False)()
+
+
+def contact_name(db):
+    return db.scalar(select(models.Contact.name))
+
+
+def test_reads_go_to_replica_and_writes_pin_session_to_primary(cluster):
+    primary, urls = cluster
+    replicas = ReplicaSet(urls[:1])
+    replicas.check()
+    db = make_session(primary, replicas)
+
+    assert contact_name(db) == "Ann"
+    db.execute(update(models.Contact).values(phone="555"))
+    # Після запису сесія читає свої зміни з основної БД
+    assert contact_name(db) == "Ann (primary)"
+    db.commit()
+    db.close()
+
+
+def test_primary_only_without_healthy_replicas(cluster, tmp_path):
+    primary, urls = cluster
+    # Репліки не перевірені — вважаються несправними
+    assert contact_name(make_session(primary, ReplicaSet(urls))) == "Ann (primary)"
+
+    lagging = ReplicaSet(urls, max_lag=1.0, lag_probe=lambda conn: 30.0)
+    lagging.check()
+    assert [r["healthy"] for r in lagging.snapshot()] == [False, False]
+    assert contact_name(make_session(primary, lagging)) == "Ann (primary)"
+
+    broken = ReplicaSet([f"sqlite:///{tmp_path}/missing/replica.db"])
+    broken.check()
+    assert broken.snapshot()[0]["lag"] is None
+    assert contact_name(make_session(primary, broken)) == "Ann (primary)"
+
+
+def test_round_robin_over_healthy_replicas(cluster):
+    primary, urls = cluster
+    replicas = ReplicaSet(urls)
+    replicas.check()
+    chosen = [replicas.choose().url for _ in range(4)]
+    assert chosen == [urls[0], urls[1], urls[0], urls[1]]
+
+    replicas.replicas[0].healthy = False
+    assert {replicas.choose().url for _ in range(3)} == {urls[1]}
+
+
+def test_pin_is_shared_between_workers(cluster):
+    primary, urls = cluster
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    worker1, worker2 = ReplicaSet(urls, redis=redis), ReplicaSet(urls, redis=redis)
+
+    async def scenario():
+        write = make_session(primary, worker1)
+        write.info[PRIMARY] = True
+        await worker1.bind_user(write, 1)
+
+        read_other_user = make_session(primary, worker2)
+        await worker2.bind_user(read_other_user, 2)
+        read_same_user = make_session(primary, worker2)
+        await worker2.bind_user(read_same_user, 1)
+        return read_other_user.info.get(PRIMARY), read_same_user.info.get(PRIMARY)
+
+    assert asyncio.run(scenario()) == (None, True)
+
+
+def test_api_reads_from_replica_until_own_write(cluster, monkeypatch):
+    primary, urls = cluster
+    replicas = ReplicaSet(urls[:1])
+    replicas.check()
+    monkeypatch.setattr(database, "RoutingSessionLocal", sessionmaker(
+        class_=RoutingSession, replica_set=replicas, bind=primary, expire_on_commit=False,
+    ))
+    with sessionmaker(bind=primary)() as db:
+        owner = db.scalar(select(models.User))
+
+    async def current_user(db=Depends(get_db)):
+        # Як `get_current_user`: маршрутизація з урахуванням read-your-writes
+        await replicas.bind_user(db, owner.id)
+        return owner
+
+    limiter.reset()
+    app.dependency_overrides[get_db] = database.get_sync_db
+    app.dependency_overrides[get_current_user] = current_user
+    try:
+        client = TestClient(app)
+        assert [c["name"] for c in client.get("/contacts/").json()["items"]] == ["Ann"]
+        assert client.post("/contacts/", json={"name": "Bob", "email": "bob@example.com"}).status_code == 201
+        names = [c["name"] for c in client.get("/contacts/").json()["items"]]
+        assert names == ["Ann (primary)", "Bob"]
+    finally:
+        app.dependency_overrides.clear()
+        replicas.replicas[0].engine.dispose()
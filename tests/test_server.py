@@ -0,0 +1,149 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from app import server
+
+#: Скрипт сервера з повільним маршрутом: два воркери `Supervisor` замість застосунку API.
+SLOW_SERVER = textwrap.dedent("""
+    import asyncio, sys
+    import uvicorn
+    from app.server import Supervisor
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        await asyncio.sleep(1.5)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"done"})
+
+    config = uvicorn.Config(app, port=int(sys.argv[1]), loop="uvloop", http="httptools",
+                            lifespan="off", timeout_graceful_shutdown=10)
+    Supervisor(config, workers=2, graceful_timeout=10).run()
+""")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_worker_count_defaults_to_cpus():
+    assert server.worker_count(3) == 3
+    assert server.worker_count(0) == server.cpu_count() >= 1
+
+
+def test_build_config_forces_fast_loop_and_lifespan():
+    config = server.build_config("127.0.0.1", 8000, graceful_timeout=12)
+    assert (config.loop, config.http, config.lifespan) == ("uvloop", "httptools", "on")
+    assert config.timeout_graceful_shutdown == 12
+    from app.main import app
+    assert config.app is app
+
+
+class FakeConfig:
+    host, port = "127.0.0.1", 0
+
+    def bind_socket(self):
+        return socket.socket()
+
+
+def test_signal_handlers_are_installed_before_workers_start(monkeypatch):
+    events = []
+    monkeypatch.setattr(server.signal, "signal", lambda signum, handler: events.append(("signal", signum)))
+    monkeypatch.setattr(server.gc, "freeze", lambda: None)
+    supervisor = server.Supervisor(FakeConfig(), workers=2)
+
+    def spawn():
+        events.append(("spawn",))
+        if len(events) == 3:
+            supervisor.stop()  # SIGTERM прийшов, поки створювалися воркери
+
+    monkeypatch.setattr(supervisor, "spawn", spawn)
+    supervisor.run()
+
+    assert events == [("signal", signal.SIGTERM), ("signal", signal.SIGINT), ("spawn",)]
+
+
+def test_sigkill_tolerates_worker_that_already_exited(monkeypatch):
+    monkeypatch.setattr(server.signal, "signal", lambda signum, handler: None)
+    monkeypatch.setattr(server.gc, "freeze", lambda: None)
+
+    def kill(pid, signum):
+        raise ProcessLookupError(pid)
+
+    monkeypatch.setattr(server.os, "kill", kill)
+    supervisor = server.Supervisor(FakeConfig(), workers=1)
+    supervisor.children = {12345: 0.0}
+    supervisor.deadline = 0.0
+    reaps = []
+
+    def reap():
+        # Воркер завершується між `_reap` і перевіркою дедлайну
+        reaps.append(1)
+        if len(reaps) > 1:
+            supervisor.children.clear()
+
+    monkeypatch.setattr(supervisor, "_reap", reap)
+    supervisor.run()
+
+    assert supervisor.children == {} and supervisor.deadline == float("inf")
+
+
+def test_metrics_directory_is_cleared_before_workers_start(monkeypatch, tmp_path):
+    monkeypatch.setattr(server.signal, "signal", lambda signum, handler: None)
+    monkeypatch.setattr(server.gc, "freeze", lambda: None)
+    stale = tmp_path / "123-1.json"
+    stale.write_text("{}")
+    supervisor = server.Supervisor(FakeConfig(), workers=1, metrics_dir=str(tmp_path))
+    seen = []
+    monkeypatch.setattr(supervisor, "spawn", lambda: seen.append(stale.exists()))
+    supervisor.run()
+    assert seen == [False]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork workers need os.fork")
+def test_sigterm_drains_in_flight_requests(tmp_path):
+    script = tmp_path / "slow_server.py"
+    script.write_text(SLOW_SERVER)
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, str(script), str(port)], cwd=os.getcwd(),
+                            env={**os.environ, "PYTHONPATH": os.getcwd()})
+    try:
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                assert time.monotonic() < deadline, "server did not start"
+                time.sleep(0.1)
+
+        result = {}
+
+        def request():
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=10) as resp:
+                result["status"], result["body"] = resp.status, resp.read()
+
+        thread = threading.Thread(target=request)
+        thread.start()
+        time.sleep(0.5)
+        proc.send_signal(signal.SIGTERM)
+        thread.join(10)
+
+        assert result == {"status": 200, "body": b"done"}
+        assert proc.wait(10) == 0
+        with pytest.raises(OSError):
+            socket.create_connection(("127.0.0.1", port), timeout=0.5)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
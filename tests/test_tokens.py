@@ -0,0 +1,102 @@
+import time
+from datetime import timedelta
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+from app.routes import auth
+from app.utils import tokens
+
+
+def pem(private_key) -> str:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+@pytest.fixture
+def keys(monkeypatch):
+    """Підставляє ключі застосунку та очищає кеш токенів."""
+    def use(signing_keys):
+        monkeypatch.setattr(tokens, "get_signing_keys", lambda: signing_keys)
+        return signing_keys
+
+    tokens.token_cache.clear()
+    yield use
+    tokens.token_cache.clear()
+
+
+def test_verified_token_is_served_from_cache(keys, monkeypatch):
+    keys(tokens.load_signing_keys("HS256", secret="s3cret"))
+    token = auth.create_token({"sub": "a@example.com"})
+    calls = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(tokens.jwt, "decode", lambda *a, **kw: calls.append(1) or real_decode(*a, **kw))
+
+    assert auth.decode_token(token)["sub"] == "a@example.com"
+    assert auth.decode_token(token)["sub"] == "a@example.com"
+    assert len(calls) == 1
+
+
+def test_invalid_token_is_not_cached(keys):
+    keys(tokens.load_signing_keys("HS256", secret="s3cret"))
+    forged = jwt.encode({"sub": "a@example.com"}, "other", algorithm="HS256")
+    for _ in range(2):
+        with pytest.raises(jwt.InvalidSignatureError):
+            auth.decode_token(forged)
+    assert len(tokens.token_cache) == 0
+
+
+def test_cache_entry_never_outlives_exp():
+    cache = tokens.TokenCache(maxsize=10, ttl=300)
+    cache.set("short", {"exp": time.time() + 0.05})
+    cache.set("expired", {"exp": time.time() - 1})
+    assert cache.get("short") is not None
+    assert cache.get("expired") is None
+    time.sleep(0.06)
+    assert cache.get("short") is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = tokens.TokenCache(maxsize=2, ttl=300)
+    cache.set("a", {"n": 1})
+    cache.set("b", {"n": 2})
+    cache.get("a")
+    cache.set("c", {"n": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1} and cache.get("c") == {"n": 3}
+
+
+@pytest.mark.parametrize(
+    "algorithm, private_key",
+    [
+        ("RS256", rsa.generate_private_key(public_exponent=65537, key_size=2048)),
+        ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+    ],
+)
+def test_asymmetric_tokens_verify_with_published_jwk(keys, algorithm, private_key):
+    signing_keys = keys(tokens.load_signing_keys(algorithm, private_key=pem(private_key)))
+    token = auth.create_token({"sub": "a@example.com"}, expires_delta=timedelta(minutes=5))
+
+    # Інший сервіс: лише опублікований JWK Set, без секретів
+    (jwk,) = tokens.jwks()["keys"]
+    assert "d" not in jwk
+    assert jwt.get_unverified_header(token)["kid"] == jwk["kid"] == signing_keys.kid
+    claims = jwt.decode(token, jwt.PyJWK(jwk).key, algorithms=[algorithm])
+    assert claims["sub"] == "a@example.com"
+    assert auth.decode_token(token)["sub"] == "a@example.com"
+
+
+def test_asymmetric_algorithm_requires_private_key():
+    with pytest.raises(RuntimeError):
+        tokens.load_signing_keys("RS256", private_key="")
+
+
+def test_jwks_endpoint_is_empty_for_hmac(auth_client, keys):
+    keys(tokens.load_signing_keys("HS256", secret="s3cret"))
+    response = auth_client.get("/auth/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}
+    assert "max-age" in response.headers["cache-control"]
@@ -0,0 +1,38 @@
+import asyncio
+import threading
+import unittest
+
+from app.utils.password_pool import PasswordPool, PasswordPoolSaturated
+
+
+class TestPasswordPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = PasswordPool(size=1, max_queue=1)
+
+    async def asyncTearDown(self):
+        self.pool.shutdown()
+
+    async def test_hash_and_verify(self):
+        hashed = await self.pool.hash("secret123")
+        self.assertTrue(await self.pool.verify("secret123", hashed))
+        self.assertFalse(await self.pool.verify("wrong", hashed))
+        metrics = self.pool.metrics()
+        self.assertEqual(metrics["operations"]["hash"]["count"], 1)
+        self.assertEqual(metrics["operations"]["verify"]["count"], 2)
+        self.assertGreater(metrics["operations"]["hash"]["avg_run_seconds"], 0)
+
+    async def test_rejects_when_queue_is_full(self):
+        release = threading.Event()
+        busy = [asyncio.create_task(self.pool._submit("hash", release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with self.assertRaises(PasswordPoolSaturated):
+            await self.pool.hash("secret123")
+        self.assertEqual(self.pool.metrics()["queued"], 1)
+        release.set()
+        await asyncio.gather(*busy)
+        self.assertEqual(self.pool.metrics()["rejected"], 1)
+        self.assertEqual(self.pool.metrics()["in_flight"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
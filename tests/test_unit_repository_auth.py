@@ -9,7 +9,7 @@ class TestRepositoryAuth(unittest.TestCase):
         self.user = models.User(id=1, email="test@example.com", password="hashed_pwd")
 
     def test_get_user_by_email(self):
-        self.db.query().filter().first.return_value = self.user
+        self.db.scalar.return_value = self.user
         result = crud.get_user_by_email(self.db, "test@example.com")
         self.assertEqual(result.email, "test@example.com")
 
@@ -19,9 +19,10 @@ class TestRepositoryAuth(unittest.TestCase):
         self.assertTrue(crud.verify_password(pwd, hashed))
 
     def test_create_user(self):
-        self.db.add = MagicMock()
         self.db.commit = MagicMock()
         self.db.refresh = MagicMock()
         user = crud.create_user(self.db, "user@example.com", "hashed_pass", "user1")
-        self.db.add.assert_called_once()
+        self.db.scalar.assert_called_once()
         self.db.commit.assert_called_once()
+        self.db.refresh.assert_not_called()
+        self.assertIs(user, self.db.scalar.return_value)
@@ -11,9 +11,12 @@ class TestRepositoryContacts(unittest.TestCase):
 
     def test_create_contact(self):
         contact_data = MagicMock()
+        contact_data.model_dump.return_value = {"first_name": "Ann"}
         contact = crud.create_contact(self.db, contact_data, self.user.id)
-        self.db.add.assert_called_once()
+        self.db.scalar.assert_called_once()
         self.db.commit.assert_called_once()
+        self.db.refresh.assert_not_called()
+        self.assertIs(contact, self.db.scalar.return_value)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,92 @@
+import asyncio
+import time
+import unittest
+
+from app.redis_cache.revocation import BloomFilter, RevocationList
+
+try:
+    import fakeredis
+except ImportError:  # pragma: no cover
+    fakeredis = None
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"jti-{i}")
+        self.assertTrue(all(f"jti-{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class TestLocalRevocationList(unittest.IsolatedAsyncioTestCase):
+    async def test_revoke_is_single_use_and_checked_without_redis(self):
+        revocations = RevocationList(redis=None)
+        claims = {"sub": "a@example.com", "jti": "j1", "sid": "s1", "iat": int(time.time())}
+        self.assertFalse(await revocations.is_revoked(claims))
+
+        self.assertTrue(await revocations.revoke("j1", time.time() + 60))
+        self.assertFalse(await revocations.revoke("j1", time.time() + 60))
+        self.assertTrue(await revocations.is_revoked(claims))
+        self.assertFalse(await revocations.is_revoked({**claims, "jti": "j2"}))
+
+    async def test_subject_cutoff_revokes_only_older_tokens(self):
+        revocations = RevocationList(redis=None)
+        await revocations.revoke_subject("a@example.com", cutoff=1000.0)
+        self.assertTrue(await revocations.is_revoked({"sub": "a@example.com", "iat": 999}))
+        self.assertFalse(await revocations.is_revoked({"sub": "a@example.com", "iat": 1000}))
+        self.assertFalse(await revocations.is_revoked({"sub": "b@example.com", "iat": 999}))
+
+    async def test_default_cutoff_revokes_tokens_from_the_same_second(self):
+        revocations = RevocationList(redis=None)
+        issued = int(time.time())
+        await revocations.revoke_subject("a@example.com")
+        self.assertTrue(await revocations.is_revoked({"sub": "a@example.com", "iat": issued}))
+        self.assertFalse(await revocations.is_revoked({"sub": "a@example.com", "iat": issued + 2}))
+
+    async def test_redis_error_degrades_to_local(self):
+        class BrokenRedis:
+            async def zadd(self, *args, **kwargs):
+                raise ConnectionError("down")
+
+        revocations = RevocationList(redis=BrokenRedis())
+        self.assertTrue(await revocations.revoke("j1", time.time() + 60))
+        self.assertTrue(await revocations.is_revoked({"jti": "j1"}))
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis is not installed")
+class TestSharedRevocationList(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        server = fakeredis.FakeServer()
+        self.worker_a = RevocationList(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+        self.worker_b = RevocationList(fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+
+    async def asyncTearDown(self):
+        await self.worker_b.stop()
+
+    async def wait_for(self, condition):
+        for _ in range(100):
+            if await condition():
+                return True
+            await asyncio.sleep(0.02)
+        return False
+
+    async def test_revocation_reaches_other_worker_without_redis_lookups(self):
+        await self.worker_a.revoke("old", time.time() + 60)
+        self.worker_b.start()
+        self.assertTrue(await self.wait_for(lambda: self.worker_b.is_revoked({"jti": "old"})))
+
+        await self.worker_a.revoke("new", time.time() + 60)
+        await self.worker_a.revoke_subject("a@example.com", cutoff=1000.0)
+        self.assertTrue(await self.wait_for(lambda: self.worker_b.is_revoked({"jti": "new"})))
+        self.assertTrue(await self.wait_for(lambda: self.worker_b.is_revoked({"sub": "a@example.com", "iat": 1})))
+
+        # Токени, яких немає у фільтрі Блума, перевіряються без звернень до Redis
+        self.worker_b.redis = None
+        self.assertFalse(await self.worker_b.is_revoked({"jti": "unrelated", "sid": "s"}))
+
+    async def test_refresh_token_can_be_claimed_once_across_workers(self):
+        expires_at = time.time() + 60
+        self.assertTrue(await self.worker_a.revoke("refresh-jti", expires_at))
+        self.assertFalse(await self.worker_b.revoke("refresh-jti", expires_at))
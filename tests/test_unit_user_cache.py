@@ -0,0 +1,70 @@
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.models import models
+from app.redis_cache import user_cache
+
+
+class TestUserCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        user_cache.clear_local()
+        self.user = models.User(
+            id=1,
+            email="test@example.com",
+            password="hashed_pwd",
+            username="tester",
+            is_verified=True,
+            avatar_url=None,
+            created_at=datetime(2024, 1, 1, 12, 0, 0),
+        )
+        self.redis = MagicMock()
+        self.redis.get = AsyncMock(return_value=None)
+        self.redis.delete = AsyncMock()
+        pipe = MagicMock()
+        pipe.execute = AsyncMock()
+        self.redis.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipe)
+        self.redis.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+        self.pipe = pipe
+        patcher = patch.object(user_cache, "redis_client", self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_snapshot_roundtrip_skips_password(self):
+        restored = user_cache.deserialize_user(user_cache.serialize_user(self.user))
+        self.assertEqual(restored.id, 1)
+        self.assertEqual(restored.email, "test@example.com")
+        self.assertEqual(restored.created_at, self.user.created_at)
+        self.assertIsNone(restored.password)
+
+    async def test_set_user_writes_both_keys(self):
+        await user_cache.set_user(self.user)
+        keys = [c.args[0] for c in self.pipe.set.call_args_list]
+        self.assertEqual(keys, ["user:email:test@example.com", "user:1"])
+
+    async def test_local_hit_skips_redis(self):
+        await user_cache.set_user(self.user)
+        cached = await user_cache.get_user("test@example.com")
+        self.assertEqual(cached.id, 1)
+        self.redis.get.assert_not_called()
+
+    async def test_lookup_by_id(self):
+        await user_cache.set_user(self.user)
+        cached = await user_cache.get_user_by_id(1)
+        self.assertEqual(cached.email, "test@example.com")
+
+    async def test_invalidate_drops_entry(self):
+        await user_cache.set_user(self.user)
+        await user_cache.invalidate_user(self.user)
+        self.assertIsNone(await user_cache.get_user("test@example.com"))
+        self.redis.delete.assert_awaited_once_with("user:email:test@example.com", "user:1")
+
+    async def test_redis_failure_falls_back_to_miss(self):
+        self.redis.get.side_effect = ConnectionError("redis is down")
+        self.assertIsNone(await user_cache.get_user("missing@example.com"))
+        self.assertIsNone(await user_cache.get_user("missing@example.com"))
+        self.redis.get.assert_awaited_once()
+
+
+if __name__ == '__main__':
+    unittest.main()